@@ -34,6 +34,9 @@ namespace OGameSim.Entities
         public uint Day { get; private set; }
         public Resources Resources { get; private set; }
 
+        // Bit i is set once the exploration reward of the points bucket i was claimed.
+        public ulong ClaimedExplorationRewards { get; internal set; }
+
         internal void AddResources(Resources resources)
         {
             Resources += resources;
@@ -1,6 +1,4 @@
 using System;
-using System.Collections.Frozen;
-using System.Collections.Generic;
 using System.Linq;
 using OGameSim.Entities;
 
@@ -21,39 +19,6 @@ namespace OGameSim.Production
         )
         { }
 
-        public sealed class ExplorationReward
-        {
-            public ExplorationReward(float value)
-            {
-                Value = value;
-            }
-
-            public bool Redeemed { get; private set; }
-
-            public bool TryClaim()
-            {
-                if (Redeemed)
-                {
-                    return false;
-                }
-
-                lock (this)
-                {
-                    if (Redeemed)
-                    {
-                        return false;
-                    }
-                    else
-                    {
-                        Redeemed = true;
-                        return true;
-                    }
-                }
-            }
-
-            public float Value { get; }
-        }
-
         public static PlayerStats GetPlayerStats(Player player)
         {
             var metalLevels = player.Planets.Select(x => (float)x.MetalMine.Level);
@@ -73,31 +38,41 @@ namespace OGameSim.Production
             );
         }
 
-        private static readonly FrozenDictionary<decimal, ExplorationReward> _rewards;
         private const int RewardDistribution = 5_000_000;
+        public const int ExplorationBucketCount = 300_000_000 / RewardDistribution;
+        private static readonly float[] _explorationRewards = CreateExplorationRewards();
 
-        static Foo()
+        private static float[] CreateExplorationRewards()
         {
             var maxValue = 25f;
+            var rewards = new float[ExplorationBucketCount];
 
-            var bucketCount = 300_000_000 / RewardDistribution;
-            var rewards = new Dictionary<decimal, ExplorationReward>();
-
-            for (int i = 0; i < bucketCount; i++)
+            for (int i = 0; i < ExplorationBucketCount; i++)
             {
-                var points = i * RewardDistribution;
-                var value = maxValue / bucketCount * i;
-                rewards.Add(points, new(value));
+                rewards[i] = maxValue / ExplorationBucketCount * i;
             }
 
-            _rewards = rewards.ToFrozenDictionary();
+            return rewards;
         }
 
+        // The reward of every bucket of points can be claimed once per episode,
+        // tracked in the bits of Player.ClaimedExplorationRewards.
         public static float GetExplorationReward(Player player)
         {
-            var bucket = Math.Floor(player.Points / RewardDistribution) * RewardDistribution;
-            var explorationReward = _rewards[bucket];
-            return explorationReward.TryClaim() ? explorationReward.Value : 0f;
+            var bucket = (int)Math.Floor(player.Points / RewardDistribution);
+            if (bucket >= ExplorationBucketCount)
+            {
+                return 0f;
+            }
+
+            var bit = 1UL << bucket;
+            if ((player.ClaimedExplorationRewards & bit) != 0)
+            {
+                return 0f;
+            }
+
+            player.ClaimedExplorationRewards |= bit;
+            return _explorationRewards[bucket];
         }
 
         public static (float, bool) ApplyAction(Player player, long action)
@@ -156,19 +131,129 @@ namespace OGameSim.Production
             return result;
         }
 
+        public static IUpgradable? GetUpgradable(Player player, long action)
+        {
+            var planetIndex = (int)(action / 3) - 1;
+            if (action == 0 || planetIndex > player.Planets.Count - 1)
+            {
+                return null;
+            }
+
+            if (action < 3)
+            {
+                return action == 1 ? player.Astrophysics : player.PlasmaTechnology;
+            }
+
+            var planet = player.Planets[planetIndex];
+            return (action % 3) switch
+            {
+                0 => planet.MetalMine,
+                1 => planet.CrystalMine,
+                _ => planet.DeuteriumSynthesizer,
+            };
+        }
+
+        // Proceeds to the first day the upgrade of the action is affordable. When
+        // that takes more than maxDays days the player only waits maxDays days and
+        // the wait is reported as exhausted.
+        public static (long Days, bool Exhausted) WaitUntilAffordable(
+            Player player,
+            long action,
+            long maxDays
+        )
+        {
+            var upgradable = GetUpgradable(player, action);
+            if (upgradable is null || player.Resources.CanSubtract(upgradable.UpgradeCost))
+            {
+                return (0, false);
+            }
+
+            var deficit =
+                upgradable.UpgradeCost.ConvertToMetalValue()
+                - player.Resources.ConvertToMetalValue();
+            var production = player.GetTodaysProduction().ConvertToMetalValue();
+            var days = (long)((deficit + production - 1) / production);
+
+            var exhausted = days > maxDays;
+            days = exhausted ? maxDays : days;
+
+            for (long day = 0; day < days; day++)
+            {
+                player.ProceedToNextDay();
+            }
+
+            return (days, exhausted);
+        }
+
+        public const int MaxPlanets = 20;
+        public const int ActionCount = 3 + 3 * MaxPlanets;
+        public const int StateSize = 5 + 6 * MaxPlanets;
+
+        public static unsafe void UpdateActionMask(
+            Player player,
+            IntPtr maskPointer,
+            bool requireAffordable
+        )
+        {
+            var mask = new Span<bool>(maskPointer.ToPointer(), ActionCount);
+            WriteActionMask(player, mask, requireAffordable);
+        }
+
+        public static void WriteActionMask(Player player, Span<bool> mask, bool requireAffordable)
+        {
+            bool IsAvailable(IUpgradable upgradable)
+            {
+                return !requireAffordable || player.Resources.CanSubtract(upgradable.UpgradeCost);
+            }
+
+            mask.Clear();
+
+            // Astrophysics is not available once the next level would need a planet
+            // that does not fit into the state anymore.
+            var planets = player.Planets;
+            var upgradedPlanetCount = Math.Ceiling((player.Astrophysics.Level + 1) / 2d) + 1;
+
+            mask[0] = true;
+            mask[1] = upgradedPlanetCount <= MaxPlanets && IsAvailable(player.Astrophysics);
+            mask[2] = IsAvailable(player.PlasmaTechnology);
+
+            for (var i = 0; i < planets.Count; i++)
+            {
+                mask[3 + 3 * i] = IsAvailable(planets[i].MetalMine);
+                mask[4 + 3 * i] = IsAvailable(planets[i].CrystalMine);
+                mask[5 + 3 * i] = IsAvailable(planets[i].DeuteriumSynthesizer);
+            }
+        }
+
         public static unsafe void UpdateState(Player player, IntPtr statePointer)
         {
-            var state = new Span<double>(statePointer.ToPointer(), 125);
+            var state = new Span<double>(statePointer.ToPointer(), StateSize);
+            Span<float> singleState = stackalloc float[StateSize];
 
+            var length = WriteState(player, singleState);
+            for (var i = 0; i < length; i++)
+            {
+                state[i] = singleState[i];
+            }
+        }
+
+        public static unsafe void UpdateStateSingle(Player player, IntPtr statePointer)
+        {
+            var state = new Span<float>(statePointer.ToPointer(), StateSize);
+            WriteState(player, state);
+        }
+
+        public static int WriteState(Player player, Span<float> state)
+        {
             var currentIndex = 0;
             var todaysProduction = player.GetTodaysProduction();
-            void SetStateValue(float value, Span<double> state)
+            void SetStateValue(float value, Span<float> state)
             {
                 state[currentIndex] = value;
                 currentIndex++;
             }
 
-            void AddResources(Resources resources, Span<double> state)
+            void AddResources(Resources resources, Span<float> state)
             {
                 SetStateValue(resources.ConvertToMetalValue(), state);
             }
@@ -203,6 +288,8 @@ namespace OGameSim.Production
                 AddResources(planet.DeuteriumSynthesizer.UpgradeCost, state);
                 AddResources(planet.DeuteriumSynthesizer.UpgradeIncreasePerDay, state);
             }
+
+            return currentIndex;
         }
     }
 }
@@ -0,0 +1,176 @@
+using System;
+using System.Collections.Generic;
+using OGameSim.Entities;
+
+namespace OGameSim.Production
+{
+    // Steps many players per call so that callers crossing an interop boundary
+    // pay for one call per vector step instead of several per player.
+    // Finished players are reset on their next step (gymnasium's NEXT_STEP autoreset).
+    public sealed class PlayerBatch
+    {
+        // episodic_length, points, astrophysics, plasma_technology and the
+        // max/mean/min mine levels of metal, crystal and deuterium.
+        public const int StatCount = 13;
+
+        private readonly Player[] _players;
+        private readonly uint[] _stepCounters;
+        private readonly bool[] _autoreset;
+
+        public PlayerBatch(int count, bool fastForward)
+        {
+            _players = new Player[count];
+            _stepCounters = new uint[count];
+            _autoreset = new bool[count];
+            FastForward = fastForward;
+
+            for (var i = 0; i < count; i++)
+            {
+                _players[i] = new();
+            }
+        }
+
+        public int Count => _players.Length;
+        public bool FastForward { get; }
+        public uint MaxSteps { get; set; } = 8000;
+        public IReadOnlyList<Player> Players => _players;
+
+        public unsafe void Reset(IntPtr statesPointer, IntPtr actionMasksPointer)
+        {
+            ResetInto(
+                new Span<float>(statesPointer.ToPointer(), Count * Foo.StateSize),
+                new Span<bool>(actionMasksPointer.ToPointer(), Count * Foo.ActionCount)
+            );
+        }
+
+        public unsafe int Step(
+            IntPtr actionsPointer,
+            IntPtr statesPointer,
+            IntPtr rewardsPointer,
+            IntPtr terminationsPointer,
+            IntPtr actionMasksPointer,
+            IntPtr skippedDaysPointer,
+            IntPtr statsPointer
+        )
+        {
+            return StepInto(
+                new ReadOnlySpan<long>(actionsPointer.ToPointer(), Count),
+                new Span<float>(statesPointer.ToPointer(), Count * Foo.StateSize),
+                new Span<float>(rewardsPointer.ToPointer(), Count),
+                new Span<bool>(terminationsPointer.ToPointer(), Count),
+                new Span<bool>(actionMasksPointer.ToPointer(), Count * Foo.ActionCount),
+                new Span<long>(skippedDaysPointer.ToPointer(), Count),
+                new Span<double>(statsPointer.ToPointer(), Count * StatCount)
+            );
+        }
+
+        public void ResetInto(Span<float> states, Span<bool> actionMasks)
+        {
+            for (var i = 0; i < Count; i++)
+            {
+                ResetPlayer(i, states, actionMasks);
+            }
+        }
+
+        // Returns the number of players that finished their episode. Only their
+        // rows of the stats are written.
+        public int StepInto(
+            ReadOnlySpan<long> actions,
+            Span<float> states,
+            Span<float> rewards,
+            Span<bool> terminations,
+            Span<bool> actionMasks,
+            Span<long> skippedDays,
+            Span<double> stats
+        )
+        {
+            var terminatedCount = 0;
+            for (var i = 0; i < Count; i++)
+            {
+                skippedDays[i] = 0;
+                if (_autoreset[i])
+                {
+                    ResetPlayer(i, states, actionMasks);
+                    rewards[i] = 0;
+                    terminations[i] = false;
+                    continue;
+                }
+
+                var player = _players[i];
+                var action = actions[i];
+                if (FastForward)
+                {
+                    // Leave room for the upgrade step.
+                    var (days, exhausted) = Foo.WaitUntilAffordable(
+                        player,
+                        action,
+                        (long)MaxSteps - _stepCounters[i]
+                    );
+                    _stepCounters[i] += (uint)days;
+                    skippedDays[i] = days;
+                    action = exhausted ? 0 : action;
+                }
+
+                var (reward, terminated) = Foo.ApplyAction(player, action);
+                Foo.WriteState(player, states.Slice(i * Foo.StateSize, Foo.StateSize));
+
+                _stepCounters[i]++;
+                terminated = terminated || _stepCounters[i] > MaxSteps;
+                if (terminated)
+                {
+                    WriteStats(i, stats.Slice(i * StatCount, StatCount));
+                    reward = 0;
+                    terminatedCount++;
+                }
+
+                rewards[i] = reward;
+                terminations[i] = terminated;
+                _autoreset[i] = terminated;
+                Foo.WriteActionMask(
+                    player,
+                    actionMasks.Slice(i * Foo.ActionCount, Foo.ActionCount),
+                    !FastForward
+                );
+            }
+
+            return terminatedCount;
+        }
+
+        private void ResetPlayer(int index, Span<float> states, Span<bool> actionMasks)
+        {
+            var player = new Player();
+            _players[index] = player;
+            _stepCounters[index] = 0;
+            _autoreset[index] = false;
+
+            var state = states.Slice(index * Foo.StateSize, Foo.StateSize);
+            state.Clear();
+            Foo.WriteState(player, state);
+            Foo.WriteActionMask(
+                player,
+                actionMasks.Slice(index * Foo.ActionCount, Foo.ActionCount),
+                !FastForward
+            );
+        }
+
+        private void WriteStats(int index, Span<double> stats)
+        {
+            var player = _players[index];
+            var playerStats = Foo.GetPlayerStats(player);
+
+            stats[0] = _stepCounters[index];
+            stats[1] = (double)player.Points;
+            stats[2] = player.Astrophysics.Level;
+            stats[3] = player.PlasmaTechnology.Level;
+            stats[4] = playerStats.MetalMax;
+            stats[5] = playerStats.MetalAverage;
+            stats[6] = playerStats.MetalMin;
+            stats[7] = playerStats.CrystalMax;
+            stats[8] = playerStats.CrystalAverage;
+            stats[9] = playerStats.CrystalMin;
+            stats[10] = playerStats.DeutMax;
+            stats[11] = playerStats.DeutAverage;
+            stats[12] = playerStats.DeutMin;
+        }
+    }
+}
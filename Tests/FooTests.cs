@@ -0,0 +1,174 @@
+using OGameSim.Entities;
+using OGameSim.Production;
+using Xunit;
+
+namespace Tests
+{
+    public sealed class FooTests
+    {
+        [Fact]
+        public void Wait_until_affordable_should_proceed_to_the_first_affordable_day()
+        {
+            // Setup
+            var subject = new Player();
+            var expected = new Player();
+            var expectedDays = 0;
+            while (!expected.Resources.CanSubtract(expected.PlasmaTechnology.UpgradeCost))
+            {
+                expected.ProceedToNextDay();
+                expectedDays++;
+            }
+
+            // Act
+            var (days, exhausted) = Foo.WaitUntilAffordable(subject, 2, 8000);
+
+            // Assert
+            Assert.Equal(expectedDays, days);
+            Assert.False(exhausted);
+            Assert.Equal(expected.Day, subject.Day);
+            Assert.Equal(expected.Resources, subject.Resources);
+        }
+
+        [Fact]
+        public void Wait_until_affordable_should_stop_after_max_days()
+        {
+            // Setup
+            var subject = new Player();
+
+            // Act
+            var (days, exhausted) = Foo.WaitUntilAffordable(subject, 2, 3);
+
+            // Assert
+            Assert.Equal(3, days);
+            Assert.True(exhausted);
+            Assert.Equal(3u, subject.Day);
+            Assert.False(subject.Resources.CanSubtract(subject.PlasmaTechnology.UpgradeCost));
+        }
+
+        [Theory]
+        [InlineData(0)]
+        [InlineData(6)]
+        public void Wait_until_affordable_should_not_wait_without_an_upgrade(long action)
+        {
+            // Setup
+            var subject = new Player();
+
+            // Act
+            var (days, exhausted) = Foo.WaitUntilAffordable(subject, action, 8000);
+
+            // Assert
+            Assert.Equal(0, days);
+            Assert.False(exhausted);
+            Assert.Equal(0u, subject.Day);
+        }
+
+        [Fact]
+        public void Action_mask_should_only_allow_affordable_upgrades()
+        {
+            // Setup
+            var subject = new Player();
+            for (var i = 0; i < 5; i++)
+            {
+                subject.ProceedToNextDay();
+            }
+
+            var mask = new bool[Foo.ActionCount];
+
+            // Act
+            Foo.WriteActionMask(subject, mask, true);
+
+            // Assert
+            Assert.True(mask[0]);
+            Assert.False(mask[1]);
+            Assert.False(mask[2]);
+            Assert.True(mask[3]);
+            Assert.True(mask[4]);
+            Assert.True(mask[5]);
+            Assert.DoesNotContain(true, mask[6..]);
+        }
+
+        [Fact]
+        public void Action_mask_should_allow_upgrades_of_existing_planets()
+        {
+            // Setup
+            var subject = new Player();
+            subject.Astrophysics.Upgrade();
+            var mask = new bool[Foo.ActionCount];
+
+            // Act
+            Foo.WriteActionMask(subject, mask, false);
+
+            // Assert
+            Assert.DoesNotContain(false, mask[..9]);
+            Assert.DoesNotContain(true, mask[9..]);
+        }
+
+        [Theory]
+        [InlineData(36, true)]
+        [InlineData(37, true)]
+        [InlineData(38, false)]
+        public void Action_mask_should_limit_planet_count(uint astrophysicsLevel, bool allowed)
+        {
+            // Setup
+            var subject = new Player();
+            for (var i = 0; i < astrophysicsLevel; i++)
+            {
+                subject.Astrophysics.Upgrade();
+            }
+
+            var mask = new bool[Foo.ActionCount];
+
+            // Act
+            Foo.WriteActionMask(subject, mask, false);
+
+            // Assert
+            Assert.Equal(allowed, mask[1]);
+        }
+
+        [Fact]
+        public void State_should_contain_player_and_existing_planets()
+        {
+            // Setup
+            var subject = new Player();
+            subject.ProceedToNextDay();
+            var state = new float[Foo.StateSize];
+
+            // Act
+            var length = Foo.WriteState(subject, state);
+
+            // Assert
+            Assert.Equal(11, length);
+            Assert.Equal(1440f, state[0]);
+            Assert.Equal(1440f, state[1]);
+            Assert.Equal(32000f, state[2]);
+            Assert.Equal(13000f, state[3]);
+            Assert.Equal(11f, state[4]);
+            Assert.Equal(90f, state[5]);
+            Assert.Equal(72f, state[6]);
+            Assert.DoesNotContain(state[11..], x => x != 0f);
+        }
+
+        [Fact]
+        public void Exploration_reward_should_be_claimed_once_per_player()
+        {
+            // Setup
+            var subject = new Player();
+            var other = new Player();
+            for (var i = 0; i < 5; i++)
+            {
+                subject.ProceedToNextDay();
+                other.ProceedToNextDay();
+            }
+
+            // Act
+            Foo.ApplyAction(subject, 3);
+            Foo.ApplyAction(subject, 4);
+
+            // Assert
+            Assert.Equal(1UL, subject.ClaimedExplorationRewards);
+            Assert.Equal(0UL, other.ClaimedExplorationRewards);
+            Assert.Equal(0f, Foo.GetExplorationReward(other));
+            Assert.Equal(1UL, other.ClaimedExplorationRewards);
+        }
+    }
+}
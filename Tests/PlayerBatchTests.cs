@@ -0,0 +1,112 @@
+using OGameSim.Production;
+using Xunit;
+
+namespace Tests
+{
+    public sealed class PlayerBatchTests
+    {
+        [Fact]
+        public void Step_should_apply_an_action_per_player()
+        {
+            // Setup
+            var subject = new PlayerBatch(2, false);
+            var states = new float[2 * Foo.StateSize];
+            var rewards = new float[2];
+            var terminations = new bool[2];
+            var actionMasks = new bool[2 * Foo.ActionCount];
+            var skippedDays = new long[2];
+            var stats = new double[2 * PlayerBatch.StatCount];
+            subject.ResetInto(states, actionMasks);
+
+            // Act
+            var terminatedCount = subject.StepInto(
+                new long[] { 0, 3 },
+                states,
+                rewards,
+                terminations,
+                actionMasks,
+                skippedDays,
+                stats
+            );
+
+            // Assert
+            Assert.Equal(0, terminatedCount);
+            Assert.Equal(0.1f, rewards[0]);
+            Assert.Equal(-0.1f, rewards[1]);
+            Assert.DoesNotContain(true, terminations);
+            Assert.Equal(1440f, states[0]);
+            Assert.Equal(0f, states[Foo.StateSize]);
+            Assert.True(actionMasks[3]);
+            Assert.False(actionMasks[Foo.ActionCount + 3]);
+        }
+
+        [Fact]
+        public void Step_should_wait_until_upgrade_is_affordable()
+        {
+            // Setup
+            var subject = new PlayerBatch(1, true);
+            var states = new float[Foo.StateSize];
+            var actionMasks = new bool[Foo.ActionCount];
+            var skippedDays = new long[1];
+            subject.ResetInto(states, actionMasks);
+
+            // Act
+            subject.StepInto(
+                new long[] { 3 },
+                states,
+                new float[1],
+                new bool[1],
+                actionMasks,
+                skippedDays,
+                new double[PlayerBatch.StatCount]
+            );
+
+            // Assert
+            Assert.Equal(1, skippedDays[0]);
+            Assert.Equal(1u, subject.Players[0].Planets[0].MetalMine.Level);
+            Assert.Equal(1350f, states[0]);
+            Assert.True(actionMasks[1]);
+        }
+
+        [Fact]
+        public void Step_should_report_stats_and_reset_finished_players()
+        {
+            // Setup
+            var subject = new PlayerBatch(1, false) { MaxSteps = 1 };
+            var states = new float[Foo.StateSize];
+            var rewards = new float[1];
+            var terminations = new bool[1];
+            var actionMasks = new bool[Foo.ActionCount];
+            var stats = new double[PlayerBatch.StatCount];
+            subject.ResetInto(states, actionMasks);
+
+            int Step()
+            {
+                return subject.StepInto(
+                    new long[] { 0 },
+                    states,
+                    rewards,
+                    terminations,
+                    actionMasks,
+                    new long[1],
+                    stats
+                );
+            }
+
+            // Act
+            Step();
+            var terminatedCount = Step();
+            var finalState = states[0];
+            var resetCount = Step();
+
+            // Assert
+            Assert.Equal(1, terminatedCount);
+            Assert.Equal(2880f, finalState);
+            Assert.Equal(2d, stats[0]);
+            Assert.Equal(0, resetCount);
+            Assert.Equal(0f, rewards[0]);
+            Assert.False(terminations[0]);
+            Assert.Equal(0f, states[0]);
+        }
+    }
+}
@@ -0,0 +1,59 @@
+import itertools
+import time
+from dataclasses import dataclass
+from typing import Tuple
+
+import numpy as np
+import tyro
+
+from ogame_env.envs.numpy_game import OBSERVATION_SIZE
+from ogame_env.players.greedy import play
+from ogame_env.tables import ECONOMY_SPEED, PLANET_MAX_TEMPERATURE
+from ogame_env.trajectories import TrajectoryRecorder
+
+
+@dataclass
+class Args:
+    num_envs: int = 1
+    """the number of players per game configuration"""
+    steps: int = 8000
+    """the number of steps (days and upgrades) per player"""
+    planet_max_temperature: Tuple[int, ...] = (PLANET_MAX_TEMPERATURE,)
+    """the max temperatures of the planets to sweep"""
+    economy_speed: Tuple[int, ...] = (ECONOMY_SPEED,)
+    """the economy speeds to sweep; all combinations with the temperatures are played in one engine"""
+    record_dir: str = ""
+    """if set, the trajectories of the first `record_envs` players are recorded into this directory"""
+    record_envs: int = 1
+    """the number of players to record"""
+
+
+if __name__ == "__main__":
+    args = tyro.cli(Args)
+
+    configurations = list(itertools.product(args.planet_max_temperature, args.economy_speed))
+    temperatures, speeds = np.repeat(np.array(configurations), args.num_envs, axis=0).T
+    num_envs = len(temperatures)
+
+    recorder = None
+    if args.record_dir:
+        recorder = TrajectoryRecorder(args.record_dir, np.arange(min(args.record_envs, num_envs)), OBSERVATION_SIZE)
+
+    start_time = time.time()
+    engine = play(num_envs, args.steps, temperatures, recorder, economy_speed=speeds)
+    if recorder is not None:
+        recorder.close()
+    duration = time.time() - start_time
+
+    for i, (temperature, speed) in enumerate(configurations):
+        players = slice(i * args.num_envs, (i + 1) * args.num_envs)
+        if len(configurations) > 1:
+            print(f"planet_max_temperature: {temperature}, economy_speed: {speed}")
+        points = engine.points[players] / 1000
+        print(f"points: {points.mean():,.3f} (min {points.min():,.3f}, max {points.max():,.3f})")
+        print(
+            f"astrophysics: {np.mean(engine.astrophysics[players]):.2f}, "
+            f"plasma_technology: {np.mean(engine.plasma_technology[players]):.2f}"
+        )
+        print(f"days: {np.mean(engine.day[players]):.2f}, steps: {np.mean(engine.step_counter[players]):.2f}")
+    print(f"SPS: {int(engine.step_counter.sum() / duration)}")
@@ -0,0 +1,82 @@
+import json
+import os
+import sys
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import tyro
+
+from benchmarks.envs import bench_env
+from benchmarks.results import compare, machine, result_key, run_isolated, same_machine
+from benchmarks.training_loop import PPO_BACKENDS, bench_ppo
+
+
+@dataclass
+class Args:
+    backends: List[str] = field(default_factory=lambda: ["numpy", "player_batch", "sharded", "tensor"])
+    """the env backends (`gridworld`, `numpy`, `player_batch`, `sharded`, `tensor`)"""
+    num_envs: List[int] = field(default_factory=lambda: [1000, 4000, 16000])
+    """the numbers of players per vector env to sweep"""
+    steps: int = 200
+    """the number of timed vector steps per env benchmark"""
+    warmup: int = 20
+    """the number of untimed vector steps before timing"""
+    num_workers: int = 2
+    """the number of worker processes of the `sharded` backend"""
+    ppo_iterations: int = 0
+    """if positive, also time this many PPO iterations with a random policy per backend and `num_envs`"""
+    ppo_num_steps: int = 25
+    """the number of steps per env per PPO rollout"""
+    output: str = "benchmark.json"
+    """the JSON file the results are written to"""
+    baseline: Optional[str] = "benchmarks/baseline.json"
+    """the JSON results of this machine to compare against, the run fails on regressions"""
+    tolerance: float = 0.25
+    """the fraction of its relative SPS a result may fall below the baseline"""
+
+
+if __name__ == "__main__":
+    args = tyro.cli(Args)
+
+    results = []
+    for backend in args.backends:
+        for num_envs in args.num_envs:
+            result = run_isolated(
+                bench_env,
+                backend=backend,
+                num_envs=num_envs,
+                steps=args.steps,
+                warmup=args.warmup,
+                num_workers=args.num_workers,
+            )
+            results.append({"mode": "env", "backend": backend, "num_envs": num_envs, **result})
+            print(f"{result_key(results[-1])}: {result['sps']:,.0f} SPS, {result['latency_ms']['mean']:.2f} ms/step")
+
+            if args.ppo_iterations > 0 and backend in PPO_BACKENDS:
+                result = run_isolated(
+                    bench_ppo,
+                    backend=backend,
+                    num_envs=num_envs,
+                    iterations=args.ppo_iterations,
+                    num_steps=args.ppo_num_steps,
+                    num_workers=args.num_workers,
+                )
+                results.append({"mode": "ppo", "backend": backend, "num_envs": num_envs, **result})
+                print(f"{result_key(results[-1])}: {result['sps']:,.0f} SPS")
+
+    with open(args.output, "w") as file:
+        json.dump({"machine": machine(), "results": results}, file, indent=2)
+
+    if args.baseline and not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}, create one on this machine with --output {args.baseline}")
+    elif args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        if not same_machine(baseline["machine"], machine()):
+            print(f"{args.baseline} was measured on another machine, regenerate it on this one")
+            sys.exit(1)
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"regression {regression}")
+        if regressions:
+            sys.exit(1)
@@ -0,0 +1,3 @@
+from benchmarks.envs import BACKENDS, bench_env
+from benchmarks.results import compare, run_isolated
+from benchmarks.training_loop import PPO_BACKENDS, bench_ppo
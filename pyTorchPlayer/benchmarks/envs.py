@@ -0,0 +1,92 @@
+"""Step throughput of the env backends.
+
+Every backend is stepped with random actions: valid actions drawn from the
+``action_mask`` info for the gymnasium vector envs and uniform actions for
+``TensorGameEnv``. Only the step calls are timed.
+"""
+
+import time
+
+import numpy as np
+
+BACKENDS = ("gridworld", "numpy", "player_batch", "sharded", "tensor")
+
+
+def make_env(backend: str, num_envs: int, num_workers: int = 2):
+    """Vector env of ``backend`` with ``num_envs`` players."""
+
+    if backend == "gridworld":
+        import gymnasium as gym
+
+        import ogame_env  # noqa: F401
+
+        return gym.vector.SyncVectorEnv([lambda: gym.make("ogame_env/GridWorld-v0") for _ in range(num_envs)])
+    if backend == "numpy":
+        from ogame_env.envs.numpy_game import NumpyGameVectorEnv
+
+        return NumpyGameVectorEnv(num_envs)
+    if backend == "player_batch":
+        from ogame_env.envs.player_batch import PlayerBatchVectorEnv
+
+        return PlayerBatchVectorEnv(num_envs)
+    if backend == "sharded":
+        from ogame_env.envs.sharded import ShardedVectorEnv
+
+        return ShardedVectorEnv(num_envs, num_workers)
+    if backend == "tensor":
+        from ogame_env.envs.tensor_game import TensorGameEnv
+
+        return TensorGameEnv(batch_size=num_envs)
+    raise ValueError(f"unknown backend {backend!r}, expected one of {BACKENDS}")
+
+
+def random_actions(action_mask: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """One uniformly drawn valid action per row of ``action_mask``."""
+
+    scores = rng.random(action_mask.shape)
+    scores[~action_mask] = -1.0
+    return scores.argmax(axis=1)
+
+
+def bench_env(backend: str, num_envs: int, steps: int = 200, warmup: int = 20, num_workers: int = 2, seed: int = 0):
+    """Time ``steps`` vector steps after ``warmup`` untimed ones.
+
+    Returns the steps per second and the latency of a vector step in
+    milliseconds.
+    """
+
+    env = make_env(backend, num_envs, num_workers)
+    rng = np.random.default_rng(seed)
+    latencies = np.zeros(steps)
+    try:
+        if backend == "tensor":
+            import torch
+
+            generator = torch.Generator(device=env.device).manual_seed(seed)
+            tensordict = env.reset()
+            for step in range(warmup + steps):
+                tensordict["action"] = torch.randint(0, 4, (num_envs,), generator=generator, device=env.device)
+                start = time.perf_counter()
+                _, tensordict = env.step_and_maybe_reset(tensordict)
+                if step >= warmup:
+                    latencies[step - warmup] = time.perf_counter() - start
+        else:
+            _, infos = env.reset(seed=seed)
+            for step in range(warmup + steps):
+                actions = random_actions(infos["action_mask"], rng)
+                start = time.perf_counter()
+                _, _, _, _, infos = env.step(actions)
+                if step >= warmup:
+                    latencies[step - warmup] = time.perf_counter() - start
+    finally:
+        env.close()
+
+    latencies *= 1000
+    return {
+        "sps": num_envs * steps / (latencies.sum() / 1000),
+        "latency_ms": {
+            "mean": float(latencies.mean()),
+            "p50": float(np.percentile(latencies, 50)),
+            "p95": float(np.percentile(latencies, 95)),
+        },
+    }
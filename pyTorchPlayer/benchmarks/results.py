@@ -0,0 +1,110 @@
+"""Running benchmarks in isolated processes and comparing them to a baseline."""
+
+import multiprocessing as mp
+import os
+import platform
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional
+
+# Backend whose SPS the other backends of a run are compared to.
+REFERENCE_BACKEND = "numpy"
+# Toy backends that are measured but not gated.
+UNGATED_BACKENDS = ("tensor",)
+# Fields of ``machine`` that must match for a baseline to gate a run.
+MACHINE_FIELDS = ("node", "processor", "cpu_count")
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident memory of this process plus its largest child in MiB."""
+
+    if resource is not None:
+        # ru_maxrss is in KiB on Linux and in bytes on macOS
+        scale = 1 / 2**20 if sys.platform == "darwin" else 1 / 2**10
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss + resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        return rss * scale
+
+    try:
+        import psutil
+    except ImportError:
+        return None
+    info = psutil.Process().memory_info()
+    return getattr(info, "peak_wset", info.rss) / 2**20
+
+
+def _measure(function: Callable, kwargs: dict) -> dict:
+    result = function(**kwargs)
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+def run_isolated(function: Callable, **kwargs) -> dict:
+    """Run a benchmark in a fresh spawned process.
+
+    Every measurement gets its own process, so peak memory is not inherited
+    from earlier benchmarks and the pythonnet backends load CoreCLR afresh.
+    """
+
+    with ProcessPoolExecutor(1, mp_context=mp.get_context("spawn")) as executor:
+        return executor.submit(_measure, function, kwargs).result()
+
+
+def machine() -> dict:
+    return {
+        "node": platform.node(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+    }
+
+
+def result_key(result: dict) -> str:
+    return f"{result['mode']}/{result['backend']}/{result['num_envs']}"
+
+
+def same_machine(first: dict, second: dict) -> bool:
+    return all(first.get(name) == second.get(name) for name in MACHINE_FIELDS)
+
+
+def compare(results: list, baseline: dict, tolerance: float) -> list:
+    """Regressions of ``results`` against the ``baseline`` results of the same machine.
+
+    Every backend is compared by its SPS relative to ``REFERENCE_BACKEND``
+    with the same mode and ``num_envs`` in the same run, so load and clock
+    speed of the machine cancel out; the reference backend itself by its
+    SPS. A result regresses if this is more than ``tolerance`` (a fraction)
+    below the baseline. ``UNGATED_BACKENDS`` are not compared.
+    """
+
+    def relative_sps(runs: list) -> dict:
+        sps = {result_key(result): result["sps"] for result in runs}
+        relative = {}
+        for result in runs:
+            if result["backend"] in UNGATED_BACKENDS:
+                continue
+            key = result_key(result)
+            if result["backend"] == REFERENCE_BACKEND:
+                relative[key] = (sps[key], "{:,.0f} SPS")
+                continue
+            reference = sps.get(result_key({**result, "backend": REFERENCE_BACKEND}))
+            if reference:
+                relative[key] = (sps[key] / reference, "{:.3f} x " + REFERENCE_BACKEND)
+        return relative
+
+    reference = relative_sps(baseline["results"])
+    regressions = []
+    for key, (value, template) in relative_sps(results).items():
+        base = reference.get(key)
+        if base is None:
+            continue
+        if value < base[0] * (1 - tolerance):
+            regressions.append(
+                f"{key}: {template.format(value)}, baseline {template.format(base[0])} ({value / base[0] - 1:+.1%})"
+            )
+    return regressions
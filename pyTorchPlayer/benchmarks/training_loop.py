@@ -0,0 +1,53 @@
+"""Throughput of the ``ppo.py`` training loop.
+
+Runs a fixed number of PPO iterations from a freshly initialized agent, i.e.
+a random policy, and reports the phase breakdown of ``PhaseProfiler``. The
+TensorBoard logs and checkpoints go to a temporary directory.
+"""
+
+import os
+import tempfile
+
+# ppo.py arguments selecting each env backend
+PPO_BACKENDS = {
+    "gridworld": {"env_id": "ogame_env/GridWorld-v0"},
+    "numpy": {"env_id": "ogame_env/NumpyGame-v0"},
+    "player_batch": {"shared_buffer": True},
+    "sharded": {"num_workers": 2},
+}
+
+
+def bench_ppo(backend: str, num_envs: int, iterations: int = 3, num_steps: int = 25, num_workers: int = 2):
+    """Time ``iterations`` PPO iterations on ``backend``.
+
+    The first iteration is included; pass more iterations to amortize it.
+    """
+
+    import ppo
+
+    if backend not in PPO_BACKENDS:
+        raise ValueError(f"ppo.py does not support backend {backend!r}, expected one of {tuple(PPO_BACKENDS)}")
+
+    overrides = dict(PPO_BACKENDS[backend])
+    if "num_workers" in overrides:
+        overrides["num_workers"] = num_workers
+
+    with tempfile.TemporaryDirectory() as directory:
+        args = ppo.Args(
+            track=False,
+            num_envs=num_envs,
+            num_steps=num_steps,
+            total_timesteps=iterations * num_envs * num_steps,
+            checkpoint_frequency=iterations + 1,
+            checkpoint_dir=os.path.join(directory, "checkpoints"),
+            run_dir=os.path.join(directory, "runs"),
+            **overrides,
+        )
+        summary = ppo.train(args)
+
+    profile = summary["profile"]
+    return {
+        "sps": profile["sps"],
+        "seconds_per_iteration": profile["seconds"] / profile["iterations"],
+        "phases": {name: phase["fraction"] for name, phase in profile["phases"].items()},
+    }
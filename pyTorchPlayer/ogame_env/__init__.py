@@ -1,6 +1,32 @@
+"""Env ids of the OGame simulation.
+
+Only the registrations are imported here; the backend of an id is imported
+by ``gym.make``/``gym.make_vec`` on first use. The pythonnet ids load CoreCLR
+and the ``Game`` assembly then, see ``ogame_env.envs.dotnet``.
+"""
+
 from gymnasium.envs.registration import register
 
+# pythonnet reference implementation, one C# player per env
 register(
     id="ogame_env/GridWorld-v0",
-    entry_point="ogame_env.envs:GridWorldEnv",
+    entry_point="ogame_env.envs.grid_world:GridWorldEnv",
+)
+
+# pythonnet players stepped with one .NET call per vector step
+register(
+    id="ogame_env/PlayerBatch-v0",
+    vector_entry_point="ogame_env.envs.player_batch:PlayerBatchVectorEnv",
+)
+
+# pure Python (NumPy) engine
+register(
+    id="ogame_env/NumpyGame-v0",
+    vector_entry_point="ogame_env.envs.numpy_game:NumpyGameVectorEnv",
+)
+
+# PyTorch tensor engine
+register(
+    id="ogame_env/TensorGame-v0",
+    vector_entry_point="ogame_env.envs.tensor_game:TensorGameVectorEnv",
 )
@@ -1 +1,18 @@
-from ogame_env.envs.grid_world import GridWorldEnv
+import importlib
+
+from ogame_env.envs.numpy_game import NumpyGameEngine, NumpyGameVectorEnv
+from ogame_env.envs.observation import ObservationEncoder
+from ogame_env.envs.snapshots import SnapshotStore
+
+# The pythonnet envs load CoreCLR on import, so they are only imported on
+# first access.
+_PYTHONNET_ENVS = {
+    "GridWorldEnv": "ogame_env.envs.grid_world",
+    "PlayerBatchVectorEnv": "ogame_env.envs.player_batch",
+}
+
+
+def __getattr__(name):
+    if name in _PYTHONNET_ENVS:
+        return getattr(importlib.import_module(_PYTHONNET_ENVS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
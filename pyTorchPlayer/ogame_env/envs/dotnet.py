@@ -0,0 +1,56 @@
+"""Loading of CoreCLR and the ``Game`` assembly for the pythonnet envs.
+
+Importing ``ogame_env`` loads nothing. The pythonnet envs call ``load_game``
+when their module is imported, which ``gym.make`` does on first use of their
+ids. The paths are read from the environment, so worker processes inherit
+them:
+
+- ``OGAME_GAME_ASSEMBLY``: the published ``Game`` assembly, by default
+  ``Game/bin/Release/net8.0/publish/Game`` of this checkout,
+- ``OGAME_RUNTIME_CONFIG``: the CoreCLR runtime config, by default
+  ``pyTorchPlayer/runtimeconfig.json``.
+
+``configure`` sets them from code before the first load.
+"""
+
+import os
+from typing import Optional
+
+ASSEMBLY_VARIABLE = "OGAME_GAME_ASSEMBLY"
+RUNTIME_CONFIG_VARIABLE = "OGAME_RUNTIME_CONFIG"
+
+_PLAYER_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_ASSEMBLY = os.path.join(
+    os.path.dirname(_PLAYER_DIR), "Game", "bin", "Release", "net8.0", "publish", "Game"
+)
+DEFAULT_RUNTIME_CONFIG = os.path.join(_PLAYER_DIR, "runtimeconfig.json")
+
+_loaded = False
+
+
+def configure(assembly: Optional[str] = None, runtime_config: Optional[str] = None):
+    """Set the paths used by ``load_game`` in this process and its children."""
+
+    if _loaded:
+        raise RuntimeError("the Game assembly is already loaded")
+    if assembly:
+        os.environ[ASSEMBLY_VARIABLE] = assembly
+    if runtime_config:
+        os.environ[RUNTIME_CONFIG_VARIABLE] = runtime_config
+
+
+def load_game():
+    """Load CoreCLR and the ``Game`` assembly once per process."""
+
+    global _loaded
+    if _loaded:
+        return
+
+    from pythonnet import load
+
+    load("coreclr", runtime_config=os.environ.get(RUNTIME_CONFIG_VARIABLE, DEFAULT_RUNTIME_CONFIG))
+
+    import clr
+
+    clr.AddReference(os.environ.get(ASSEMBLY_VARIABLE, DEFAULT_ASSEMBLY))
+    _loaded = True
@@ -8,12 +8,10 @@ from gymnasium import logger, spaces
 from gymnasium.envs.classic_control import utils
 from gymnasium.error import DependencyNotInstalled
 
-from pythonnet import load
+from ogame_env.envs.dotnet import load_game
+from ogame_env.envs.numpy_game import ACTION_MODES
 
-load("coreclr", runtime_config="./pyTorchPlayer/runtimeconfig.json")
-
-import clr
-clr.AddReference("C:/Code/gpolcode/OGameSim/Game/bin/Release/net8.0/publish/Game")
+load_game()
 
 from OGameSim.Entities import *
 from OGameSim.Production import *
@@ -29,16 +27,32 @@ class GridWorldEnv(gym.Env[np.ndarray, Union[int, np.ndarray]]):
         "render_fps": 50,
     }
 
-    def __init__(self, render_mode: Optional[str] = None):
+    def __init__(
+        self,
+        render_mode: Optional[str] = None,
+        action_mode: str = "step",
+        state: Optional[np.ndarray] = None,
+    ):
+        # "fast_forward" waits until an unaffordable upgrade is affordable
+        # within a single step, see NumpyGameEngine.
+        if action_mode not in ACTION_MODES:
+            raise ValueError(f"Unknown action mode {action_mode!r}, expected one of {ACTION_MODES}")
+        self.action_mode = action_mode
         self.player = Player()
-        self.state = np.zeros(125)
+        self.state = np.zeros(125) if state is None else state
+        self.actionMask = np.zeros(63, dtype=bool)
         self.updateState()
 
         self.action_space = spaces.Discrete(63)
-        self.observation_space = spaces.Box(low=0.0, high=np.full((125,), np.inf), shape=(125,), dtype=np.float64)
+        self.observation_space = spaces.Box(low=0.0, high=np.full((125,), np.inf), shape=(125,), dtype=self.state.dtype)
 
     def step(self, action):
-        result = Foo.ApplyAction(self.player, action.item())
+        action = action.item()
+        skippedDays, exhausted = 0, False
+        if self.action_mode == "fast_forward":
+            skippedDays, exhausted = self.fastForward(action)
+
+        result = Foo.ApplyAction(self.player, 0 if exhausted else action)
         reward = result.Item1
         terminated = result.Item2
         self.updateState()
@@ -69,6 +83,11 @@ class GridWorldEnv(gym.Env[np.ndarray, Union[int, np.ndarray]]):
             }
             reward = 0.0
 
+        if self.action_mode == "fast_forward":
+            infos["skipped_days"] = skippedDays
+
+        infos["action_mask"] = self.getActionMask()
+
         return self.state, reward, terminated, False, infos
 
     def reset(
@@ -83,10 +102,31 @@ class GridWorldEnv(gym.Env[np.ndarray, Union[int, np.ndarray]]):
         self.state.fill(0)
         self.updateState()
 
-        return self.state, {}
+        return self.state, {"action_mask": self.getActionMask()}
+
+    def fastForward(self, action):
+        # Leave room for the upgrade step, otherwise wait until the episode ends.
+        result = Foo.WaitUntilAffordable(self.player, action, self.maxSteps - self.stepCounter)
+        days, exhausted = result.Item1, result.Item2
+        self.stepCounter += days
+
+        return days, exhausted
+
+    def getActionMask(self):
+        ptr = self.actionMask.ctypes.data_as(ctypes.POINTER(ctypes.c_bool))
+        net_ptr = IntPtr(ctypes.addressof(ptr.contents))
+
+        Foo.UpdateActionMask(self.player, net_ptr, self.action_mode == "step")
+        return self.actionMask.copy()
 
     def updateState(self):
         # Convert to .NET IntPtr
+        if self.state.dtype == np.float32:
+            ptr = self.state.ctypes.data_as(ctypes.POINTER(ctypes.c_float))
+            net_ptr = IntPtr(ctypes.addressof(ptr.contents))
+            Foo.UpdateStateSingle(self.player, net_ptr)
+            return
+
         ptr = self.state.ctypes.data_as(ctypes.POINTER(ctypes.c_double))
         net_ptr = IntPtr(ctypes.addressof(ptr.contents))
 
@@ -0,0 +1,627 @@
+"""Vectorized NumPy reimplementation of the OGameSim player simulation.
+
+The C# ``Game`` assembly is the reference implementation. This module mirrors
+the rules of ``Player``, ``MetalMine``, ``CrystalMine``, ``DeuteriumSynthesizer``,
+``PlasmaTechnology``, ``Astrophysics`` and ``Foo.ApplyAction`` for ``N`` players
+at once. All players are stored as struct-of-arrays and every step is a handful
+of batched NumPy operations, so there is no per-env Python or interop work.
+
+Resources and points are kept as ``int64`` so the integer semantics of the C#
+``ulong``/``decimal`` arithmetic are reproduced exactly. Points are stored in
+thousandths (``Player.Points * 1000``), which is the raw amount of resources
+spent.
+"""
+
+import copy
+from typing import Optional
+
+import numpy as np
+
+import gymnasium as gym
+from gymnasium import spaces
+from gymnasium.vector.utils import batch_space
+
+from ogame_env.envs.observation import ObservationEncoder
+from ogame_env.tables import (
+    ASTROPHYSICS,
+    ECONOMY_SPEED,
+    MAX_LEVEL,
+    PLANET_MAX_TEMPERATURE,
+    PLASMA_TECHNOLOGY,
+    RESOURCE_WEIGHTS,
+    get_tables,
+    stack_tables,
+)
+
+MAX_PLANETS = 20
+NUM_ACTIONS = 3 + 3 * MAX_PLANETS
+OBSERVATION_SIZE = 5 + 6 * MAX_PLANETS
+
+ACTION_MODES = ("step", "fast_forward")
+
+# Exploration rewards of ``Foo.GetExplorationReward``.
+REWARD_DISTRIBUTION = 5_000_000
+EXPLORATION_BUCKETS = 300_000_000 // REWARD_DISTRIBUTION
+EXPLORATION_REWARDS = (
+    np.float32(25.0) / np.float32(EXPLORATION_BUCKETS) * np.arange(EXPLORATION_BUCKETS, dtype=np.float32)
+)
+
+FINAL_INFO_KEYS = (
+    "episodic_length",
+    "points",
+    "astrophysics",
+    "plasma_technology",
+    "metal_max",
+    "metal_mean",
+    "metal_min",
+    "crystal_max",
+    "crystal_mean",
+    "crystal_min",
+    "deut_max",
+    "deut_mean",
+    "deut_min",
+)
+
+# Per-player arrays of NumpyGameEngine, including the derived caches.
+PLAYER_ARRAYS = (
+    "astrophysics",
+    "plasma_technology",
+    "mine_levels",
+    "resources",
+    "points",
+    "day",
+    "step_counter",
+    "skipped_days",
+    "mine_production",
+    "mine_values",
+    "exploration_claimed",
+    "max_steps",
+    "planet_max_temperature",
+    "resource_weights",
+    "economy_speed",
+    "config",
+)
+
+# Fixed-size record of a player's state, see ``NumpyGameEngine.snapshot``.
+SNAPSHOT_DTYPE = np.dtype(
+    [
+        ("astrophysics", np.int64),
+        ("plasma_technology", np.int64),
+        ("mine_levels", np.int64, (MAX_PLANETS, 3)),
+        ("resources", np.int64, (3,)),
+        ("points", np.int64),
+        ("day", np.int64),
+        ("step_counter", np.int64),
+        ("mine_production", np.int64, (3,)),
+        ("exploration_claimed", np.uint64),
+    ]
+)
+
+
+class NumpyGameEngine:
+    """Struct-of-arrays simulation of ``num_envs`` independent players.
+
+    State arrays
+    ------------
+    astrophysics, plasma_technology: ``(N,)``
+        Research levels.
+    mine_levels: ``(N, MAX_PLANETS, 3)``
+        Metal, crystal and deuterium levels per planet. Planets that do not
+        exist yet keep level 0 and are ignored.
+    resources: ``(N, 3)``
+        Stored metal, crystal and deuterium.
+    points: ``(N,)``
+        ``Player.Points`` in thousandths.
+    day, step_counter: ``(N,)``
+        Simulated day and number of env steps of the current episode.
+
+    ``mine_production`` (summed over planets, without plasma) and ``mine_values``
+    (metal value of upgrade cost and production increase per mine) are derived
+    from the levels and updated incrementally, since a step changes at most one
+    mine or planet per player.
+
+    Levels are bounded by the tables: mines stop at ``MAX_LEVEL - 1`` and
+    research at ``MAX_LEVEL``, further upgrades fail without cost.
+
+    ``exploration_claimed`` holds the exploration reward buckets claimed in the
+    current episode of every player as a bitset, like
+    ``Player.ClaimedExplorationRewards``.
+
+    Game parameters
+    ---------------
+    max_steps, planet_max_temperature, economy_speed: ``(N,)``
+        Episode length, max temperature of every planet and the factor of all
+        mine productions.
+    resource_weights: ``(N, 3)``
+        Metal value of a unit of metal, crystal and deuterium. The metal
+        weight is 1, since remaining resources are converted to metal.
+
+    The parameters are given as scalars or per-env arrays, so one engine can
+    simulate many game configurations at once. Every distinct configuration
+    gets its own level tables, stacked along the leading axis of ``tables``
+    and selected per player by ``config``.
+
+    With ``action_mode="fast_forward"`` an upgrade that is not affordable yet
+    does not fail. Instead the player waits the number of days its current
+    production needs to afford it, and the upgrade is applied in the same
+    step. The waited days count towards ``max_steps`` like the
+    ``ProceedToNextDay`` steps they replace and are reported in
+    ``skipped_days``. If the episode ends before the upgrade is affordable, the
+    player waits until the end instead.
+    """
+
+    def __init__(
+        self,
+        num_envs: int,
+        max_steps=8000,
+        planet_max_temperature=PLANET_MAX_TEMPERATURE,
+        action_mode: str = "step",
+        resource_weights=RESOURCE_WEIGHTS,
+        economy_speed=ECONOMY_SPEED,
+    ):
+        if action_mode not in ACTION_MODES:
+            raise ValueError(f"Unknown action mode {action_mode!r}, expected one of {ACTION_MODES}")
+
+        self.num_envs = num_envs
+        self.action_mode = action_mode
+
+        def per_env(value, shape=()):
+            return np.broadcast_to(np.asarray(value, dtype=np.int64), (num_envs,) + shape).copy()
+
+        self.max_steps = per_env(max_steps)
+        self.planet_max_temperature = per_env(planet_max_temperature)
+        self.resource_weights = per_env(resource_weights, (3,))
+        self.economy_speed = per_env(economy_speed)
+        if np.any(self.resource_weights[:, 0] != 1):
+            raise ValueError("the metal resource weight must be 1")
+        if np.any(self.economy_speed < 1):
+            raise ValueError("the economy speed must be at least 1")
+
+        parameters = np.column_stack([self.planet_max_temperature, self.resource_weights, self.economy_speed])
+        configurations, config = np.unique(parameters, axis=0, return_inverse=True)
+        self.config = config.reshape(num_envs)
+        # Lookups use a scalar index while all players share one configuration.
+        self._table_config = 0 if len(configurations) == 1 else self.config
+        self.tables = stack_tables(
+            [
+                get_tables(int(temperature), tuple(int(weight) for weight in weights), int(speed))
+                for temperature, *weights, speed in configurations
+            ]
+        )
+        self._base_production = self.tables.production[:, :, 0]
+        self._base_mine_values = np.stack(
+            [self.tables.cost_value[:, :3, 0], self.tables.production_increase_value[:, :, 0]], axis=-1
+        )
+
+        self.astrophysics = np.zeros(num_envs, dtype=np.int64)
+        self.plasma_technology = np.zeros(num_envs, dtype=np.int64)
+        self.mine_levels = np.zeros((num_envs, MAX_PLANETS, 3), dtype=np.int64)
+        self.resources = np.zeros((num_envs, 3), dtype=np.int64)
+        self.points = np.zeros(num_envs, dtype=np.int64)
+        self.day = np.zeros(num_envs, dtype=np.int64)
+        self.step_counter = np.zeros(num_envs, dtype=np.int64)
+        self.skipped_days = np.zeros(num_envs, dtype=np.int64)
+        self.exploration_claimed = np.zeros(num_envs, dtype=np.uint64)
+
+        self.mine_production = np.zeros((num_envs, 3), dtype=np.int64)
+        self.mine_values = np.zeros((num_envs, MAX_PLANETS, 3, 2), dtype=np.int64)
+
+        self._env_index = np.arange(num_envs)
+        self._planet_index = np.arange(MAX_PLANETS)
+        self.reset()
+
+    def reset(self, mask: Optional[np.ndarray] = None):
+        """Reset all players, or only those selected by the boolean ``mask``."""
+
+        index = slice(None) if mask is None else mask
+        self.astrophysics[index] = 0
+        self.plasma_technology[index] = 0
+        self.mine_levels[index] = 0
+        self.resources[index] = 0
+        self.points[index] = 0
+        self.day[index] = 0
+        self.step_counter[index] = 0
+        self.skipped_days[index] = 0
+        self.exploration_claimed[index] = 0
+
+        self.mine_production[index] = self._base_production[self.config[index]]
+        self.mine_values[index] = 0
+        self.mine_values[index, 0] = self._base_mine_values[self.config[index]]
+
+    def take(self, index: np.ndarray) -> "NumpyGameEngine":
+        """New engine with copies of the players and their game parameters at the integer ``index``.
+
+        Tables and settings are shared with this engine.
+        """
+
+        engine = copy.copy(self)
+        for name in PLAYER_ARRAYS:
+            setattr(engine, name, getattr(self, name)[index])
+
+        engine.num_envs = len(index)
+        if np.ndim(self._table_config):
+            engine._table_config = engine.config
+        engine._env_index = np.arange(engine.num_envs)
+        return engine
+
+    def snapshot(self, index=slice(None)) -> np.ndarray:
+        """``SNAPSHOT_DTYPE`` records of the players at ``index``.
+
+        A record holds the full state of a player, including the exploration
+        reward buckets claimed so far in its episode. On ``restore`` the mine
+        production, upgrade costs and production increases are derived from
+        the levels and the game parameters of the restored env.
+        """
+
+        records = np.empty(self.num_envs, dtype=SNAPSHOT_DTYPE)[index]
+        for name in SNAPSHOT_DTYPE.names:
+            records[name] = getattr(self, name)[index]
+        return records
+
+    def restore(self, records: np.ndarray, index=slice(None)):
+        """Overwrite the players at ``index`` with the ``SNAPSHOT_DTYPE`` ``records``."""
+
+        for name in SNAPSHOT_DTYPE.names:
+            getattr(self, name)[index] = records[name]
+        self.skipped_days[index] = 0
+
+        # Production, upgrade cost and production increase of the mines of existing planets.
+        levels = self.mine_levels[index]
+        config = self.config[index][:, None, None]
+        kinds = np.arange(3)
+        planets = self.planet_mask()[index]
+        production = np.where(planets[..., None], self.tables.production[config, kinds, levels], 0)
+        self.mine_production[index] = production.sum(axis=1)
+
+        mine_values = np.stack(
+            [
+                self.tables.cost_value[config, kinds, levels],
+                self.tables.production_increase_value[config, kinds, levels],
+            ],
+            axis=-1,
+        )
+        mine_values[~planets] = 0
+        self.mine_values[index] = mine_values
+
+    def planet_count(self) -> np.ndarray:
+        return np.minimum((self.astrophysics + 1) // 2 + 1, MAX_PLANETS)
+
+    def planet_mask(self) -> np.ndarray:
+        return self._planet_index < self.planet_count()[:, None]
+
+    def write_action_mask(self, out: np.ndarray):
+        """Write ``Foo.UpdateActionMask`` into ``out`` of shape ``(N, 63)``.
+
+        Upgrades of nonexistent planets are masked, as is astrophysics once its
+        next level would need more than ``MAX_PLANETS`` planets. In ``"step"``
+        mode unaffordable upgrades are masked too. Upgrades past the level
+        tables, which ``step`` rejects, are masked as well.
+        """
+
+        out[:, 0] = True
+        out[:, 1] = (self.astrophysics + 2) // 2 + 1 <= MAX_PLANETS
+        out[:, 2] = self.plasma_technology < MAX_LEVEL
+        out[:, 3:] = np.repeat(self.planet_mask(), 3, axis=1)
+        out[:, 3:] &= self.mine_levels.reshape(self.num_envs, -1) < MAX_LEVEL - 1
+
+        if self.action_mode == "step":
+            resources_value = self.resources_value()
+            astro_level = np.minimum(self.astrophysics, MAX_LEVEL - 1)
+            plasma_level = np.minimum(self.plasma_technology, MAX_LEVEL - 1)
+            out[:, 1] &= self.tables.cost_value[self._table_config, ASTROPHYSICS, astro_level] <= resources_value
+            out[:, 2] &= self.tables.cost_value[self._table_config, PLASMA_TECHNOLOGY, plasma_level] <= resources_value
+            out[:, 3:] &= self.mine_values[..., 0].reshape(self.num_envs, -1) <= resources_value[:, None]
+
+    def metal_value(self, resources: np.ndarray) -> np.ndarray:
+        """``Resources.ConvertToMetalValue`` of ``(N, 3)`` resources with the weights of every player."""
+
+        return np.einsum("ij,ij->i", resources, self.resource_weights)
+
+    def resources_value(self) -> np.ndarray:
+        return self.metal_value(self.resources)
+
+    def todays_production(self) -> np.ndarray:
+        """``Player.GetTodaysProduction`` for every player, shape ``(N, 3)``."""
+
+        plasma_modifier = self.tables.plasma_modifier[self._table_config, np.minimum(self.plasma_technology, MAX_LEVEL)]
+        return self.mine_production + self.mine_production * plasma_modifier // 10000
+
+    def step(self, actions: np.ndarray):
+        """Apply one ``Foo.ApplyAction`` per player.
+
+        Returns ``(rewards, terminated)`` where rewards are ``float32`` values
+        exactly as returned by the reference implementation.
+        """
+
+        actions = np.asarray(actions, dtype=np.int64)
+        n = self._env_index
+
+        planet_count = self.planet_count()
+        planet_index = actions // 3 - 1
+        planet = np.clip(planet_index, 0, MAX_PLANETS - 1)
+        kind = actions % 3
+        upgradable = np.where(actions == 1, ASTROPHYSICS, np.where(actions == 2, PLASMA_TECHNOLOGY, kind))
+        level = np.where(
+            actions == 1,
+            self.astrophysics,
+            np.where(actions == 2, self.plasma_technology, self.mine_levels[n, planet, kind]),
+        )
+
+        # Upgrades past the level tables fail like upgrades of nonexistent planets.
+        in_tables = level < np.where(actions > 2, MAX_LEVEL - 1, MAX_LEVEL)
+        valid = (planet_index < planet_count) & ((actions == 0) | in_tables)
+        level = np.minimum(level, MAX_LEVEL - 1)
+        cost_value = self.tables.cost_value[self._table_config, upgradable, level]
+
+        resources_value = self.resources_value()
+        self.skipped_days[:] = 0
+        if self.action_mode == "fast_forward":
+            waiting = valid & (actions != 0) & (resources_value < cost_value)
+            exhausted = self._fast_forward(waiting, cost_value - resources_value)
+            actions = np.where(exhausted, 0, actions)
+            resources_value = self.resources_value()
+
+        proceed = valid & (actions == 0)
+        upgrade = valid & (actions != 0)
+        upgraded = upgrade & (resources_value >= cost_value)
+
+        # Player.TrySpendResources converts the remaining resources to metal.
+        gained_points = np.where(upgraded, self.tables.cost_points[self._table_config, upgradable, level], 0)
+        self.resources[upgraded] = 0
+        self.resources[upgraded, 0] = resources_value[upgraded] - cost_value[upgraded]
+        self.points += gained_points
+
+        self.plasma_technology += upgraded & (actions == 2)
+        self._upgrade_astrophysics(upgraded & (actions == 1), planet_count)
+        self._upgrade_mines(n[upgraded & (actions > 2)], planet, kind)
+
+        self.resources[proceed] += self.todays_production()[proceed]
+        self.day += proceed
+
+        rewards = np.full(self.num_envs, -0.1, dtype=np.float32)
+        rewards[proceed] = np.float32(0.1)
+        upgrade_reward = np.log10(
+            ((gained_points / 1000).astype(np.float32) + np.float32(1)).astype(np.float64)
+        ).astype(np.float32)
+        rewards = np.where(upgraded, upgrade_reward + self._claim_exploration(upgraded), rewards)
+
+        self.step_counter += 1
+        terminated = self.step_counter > self.max_steps
+        rewards[terminated] = 0.0
+
+        return rewards, terminated
+
+    def _fast_forward(self, waiting: np.ndarray, deficit: np.ndarray) -> np.ndarray:
+        """Advance ``waiting`` players until they can pay ``deficit`` more.
+
+        Returns the players whose episode ends first. They wait until the last
+        day but one, so that the current step proceeds to the last day.
+        """
+
+        production = self.todays_production()
+        production_value = self.metal_value(production)
+        days = np.where(waiting, -(-deficit // production_value), 0)
+
+        # Days that still leave room for the upgrade step in this episode.
+        remaining = self.max_steps - self.step_counter
+        exhausted = days > remaining
+        days = np.where(exhausted, remaining, days)
+
+        self.resources += days[:, None] * production
+        self.day += days
+        self.step_counter += days
+        self.skipped_days[:] = days
+
+        return exhausted
+
+    def _upgrade_astrophysics(self, upgraded: np.ndarray, planet_count: np.ndarray):
+        self.astrophysics += upgraded
+
+        # Every odd astrophysics level colonizes a new planet with level 0 mines.
+        colonized = upgraded & (self.planet_count() > planet_count)
+        env = np.flatnonzero(colonized)
+        self.mine_production[env] += self._base_production[self.config[env]]
+        self.mine_values[env, planet_count[env]] = self._base_mine_values[self.config[env]]
+
+    def _upgrade_mines(self, env: np.ndarray, planet: np.ndarray, kind: np.ndarray):
+        planet = planet[env]
+        kind = kind[env]
+        level = self.mine_levels[env, planet, kind]
+        config = self.config[env]
+
+        self.mine_production[env, kind] += self.tables.production_increase[config, kind, level]
+        level += 1
+        self.mine_levels[env, planet, kind] = level
+        self.mine_values[env, planet, kind, 0] = self.tables.cost_value[config, kind, level]
+        self.mine_values[env, planet, kind, 1] = self.tables.production_increase_value[config, kind, level]
+
+    def _claim_exploration(self, upgraded: np.ndarray) -> np.ndarray:
+        """Claim the exploration bucket of the new points for each upgrade.
+
+        Every player gets the value of a bucket the first time it reaches the
+        bucket in an episode.
+        """
+
+        bucket = self.points // (REWARD_DISTRIBUTION * 1000)
+        in_range = bucket < EXPLORATION_BUCKETS
+        bucket = np.minimum(bucket, EXPLORATION_BUCKETS - 1)
+        bit = np.left_shift(np.uint64(1), bucket.astype(np.uint64))
+
+        claimed = upgraded & in_range & ((self.exploration_claimed & bit) == 0)
+        self.exploration_claimed |= np.where(claimed, bit, np.uint64(0))
+        return np.where(claimed, EXPLORATION_REWARDS[bucket], np.float32(0))
+
+    def write_observation(self, out: np.ndarray):
+        """Write the ``Foo.UpdateState`` observation into ``out`` of shape ``(N, 125)``.
+
+        Values are rounded through ``float32`` like ``SetStateValue``.
+        """
+
+        todays_production = self.todays_production()
+        plasma_increase = todays_production * self.tables.plasma_modifier[self._table_config, 1] // 10000
+        astro_level = np.minimum(self.astrophysics, MAX_LEVEL - 1)
+        plasma_level = np.minimum(self.plasma_technology, MAX_LEVEL - 1)
+
+        out[:, 0] = self.resources_value().astype(np.float32)
+        out[:, 1] = self.metal_value(todays_production).astype(np.float32)
+        out[:, 2] = self.tables.cost_value[self._table_config, ASTROPHYSICS, astro_level].astype(np.float32)
+        out[:, 3] = self.tables.cost_value[self._table_config, PLASMA_TECHNOLOGY, plasma_level].astype(np.float32)
+        out[:, 4] = self.metal_value(plasma_increase).astype(np.float32)
+        out[:, 5:] = self.mine_values.reshape(self.num_envs, -1).astype(np.float32)
+
+    def final_info(self, mask: np.ndarray) -> dict:
+        """``final_info`` statistics of the players selected by ``mask``."""
+
+        planet_mask = self.planet_mask()[mask]
+        levels = self.mine_levels[mask].astype(np.float32)
+        planet_count = planet_mask.sum(axis=1)[:, None]
+
+        level_max = np.where(planet_mask[:, :, None], levels, -np.inf).max(axis=1)
+        level_min = np.where(planet_mask[:, :, None], levels, np.inf).min(axis=1)
+        level_mean = (np.where(planet_mask[:, :, None], levels, 0).sum(axis=1, dtype=np.float64) / planet_count).astype(
+            np.float32
+        )
+
+        info = {
+            "episodic_length": self.step_counter[mask].astype(np.float64),
+            "points": self.points[mask] / 1000,
+            "astrophysics": self.astrophysics[mask].astype(np.float64),
+            "plasma_technology": self.plasma_technology[mask].astype(np.float64),
+        }
+        for kind, name in enumerate(("metal", "crystal", "deut")):
+            info[f"{name}_max"] = level_max[:, kind].astype(np.float64)
+            info[f"{name}_mean"] = level_mean[:, kind].astype(np.float64)
+            info[f"{name}_min"] = level_min[:, kind].astype(np.float64)
+
+        return info
+
+
+class NumpyGameVectorEnv(gym.vector.VectorEnv):
+    """Drop-in replacement for ``SyncVectorEnv`` over ``GridWorldEnv`` instances.
+
+    Observations, rewards, terminations and ``final_info`` match the
+    pythonnet environment, including the ``NEXT_STEP`` autoreset behaviour of
+    gymnasium's vector envs. Observations are float32 (the pythonnet values
+    are float32 as well) and can be encoded in place by an
+    ``observation_encoder``.
+
+    With ``start_states`` (``SNAPSHOT_DTYPE`` records or a ``SnapshotStore``)
+    every episode starts from a randomly drawn record instead of day 0. The
+    step counter of the record is kept, so the episode ends after the steps
+    the record had left. ``reset(options={"start_states": ...})`` replaces
+    them, ``None`` goes back to day 0.
+
+    ``max_steps``, ``planet_max_temperature``, ``resource_weights`` and
+    ``economy_speed`` can differ per env, see ``NumpyGameEngine``.
+    """
+
+    metadata = {
+        "render_modes": [],
+        "autoreset_mode": gym.vector.AutoresetMode.NEXT_STEP,
+    }
+
+    def __init__(
+        self,
+        num_envs: int,
+        max_steps=8000,
+        action_mode: str = "step",
+        copy: bool = True,
+        observation_encoder: Optional[ObservationEncoder] = None,
+        start_states=None,
+        render_mode: Optional[str] = None,
+        planet_max_temperature=PLANET_MAX_TEMPERATURE,
+        resource_weights=RESOURCE_WEIGHTS,
+        economy_speed=ECONOMY_SPEED,
+    ):
+        self.num_envs = num_envs
+        self.copy = copy
+        self.render_mode = render_mode
+        self.observation_encoder = observation_encoder
+        self.start_states = start_states
+        self.engine = NumpyGameEngine(
+            num_envs,
+            max_steps=max_steps,
+            planet_max_temperature=planet_max_temperature,
+            action_mode=action_mode,
+            resource_weights=resource_weights,
+            economy_speed=economy_speed,
+        )
+
+        self.single_action_space = spaces.Discrete(NUM_ACTIONS)
+        if observation_encoder is not None:
+            self.single_observation_space = observation_encoder.observation_space()
+        else:
+            self.single_observation_space = spaces.Box(
+                low=0.0, high=np.full((OBSERVATION_SIZE,), np.inf), shape=(OBSERVATION_SIZE,), dtype=np.float32
+            )
+        self.action_space = batch_space(self.single_action_space, num_envs)
+        self.observation_space = batch_space(self.single_observation_space, num_envs)
+
+        self._observations = np.zeros((num_envs, OBSERVATION_SIZE), dtype=np.float32)
+        self._action_masks = np.zeros((num_envs, NUM_ACTIONS), dtype=bool)
+        self._autoreset_envs = np.zeros(num_envs, dtype=bool)
+
+    def reset(self, *, seed: Optional[int] = None, options: Optional[dict] = None):
+        super().reset(seed=seed)
+        if options is not None and "start_states" in options:
+            self.start_states = options["start_states"]
+        self._reset_players(np.ones(self.num_envs, dtype=bool))
+        self._write_observations()
+        self._autoreset_envs[:] = False
+
+        return self._get_observations(), self._get_infos()
+
+    def step(self, actions):
+        autoreset = self._autoreset_envs
+        rewards, terminated = self.engine.step(np.where(autoreset, 0, actions))
+
+        # Envs that finished in the previous step are reset instead of stepped.
+        if autoreset.any():
+            self._reset_players(autoreset)
+            rewards[autoreset] = 0.0
+            terminated[autoreset] = False
+
+        self._write_observations()
+
+        infos = self._get_infos()
+        if self.engine.action_mode == "fast_forward":
+            infos["skipped_days"] = self.engine.skipped_days.copy()
+            infos["_skipped_days"] = np.ones(self.num_envs, dtype=bool)
+
+        if terminated.any():
+            final_info = {}
+            for key, value in self.engine.final_info(terminated).items():
+                final_info[key] = np.zeros(self.num_envs, dtype=np.float64)
+                final_info[key][terminated] = value
+                final_info[f"_{key}"] = terminated.copy()
+            infos["final_info"] = final_info
+            infos["_final_info"] = terminated.copy()
+
+        self._autoreset_envs = terminated.copy()
+        truncated = np.zeros(self.num_envs, dtype=bool)
+
+        return self._get_observations(), rewards.astype(np.float64), terminated, truncated, infos
+
+    def _get_infos(self):
+        self.engine.write_action_mask(self._action_masks)
+        return {"action_mask": self._action_masks.copy(), "_action_mask": np.ones(self.num_envs, dtype=bool)}
+
+    def _reset_players(self, mask: np.ndarray):
+        self.engine.reset(mask)
+        if self.start_states is None:
+            return
+
+        count = int(np.count_nonzero(mask))
+        if isinstance(self.start_states, np.ndarray):
+            records = self.start_states[self.np_random.integers(len(self.start_states), size=count)]
+        else:
+            records = self.start_states.sample(self.np_random, count)
+        self.engine.restore(records, mask)
+
+    def _write_observations(self):
+        self.engine.write_observation(self._observations)
+        if self.observation_encoder is not None:
+            self.observation_encoder.encode(self._observations)
+
+    def _get_observations(self):
+        return self._observations.copy() if self.copy else self._observations
@@ -0,0 +1,112 @@
+"""In-place float32 observation encoding for the batched envs.
+
+The raw observation holds metal values of resources, production and upgrade
+costs that span many orders of magnitude. ``ObservationEncoder`` transforms a
+float32 batch of observations in place, right after the engine wrote it:
+
+- ``"identity"`` keeps the raw values,
+- ``"log"`` applies ``log1p`` (all raw values are non-negative),
+- ``"scale"`` multiplies by ``scale``, a scalar or one factor per feature.
+
+With ``normalize`` the transformed values are standardized with running mean
+and variance that are updated with every batch, i.e. across all envs at
+once, and clipped to ``[-clip, clip]``. The statistics are float64 and can be
+saved and restored with ``state_dict``/``load_state_dict``.
+"""
+
+from typing import Optional, Union
+
+import numpy as np
+
+from gymnasium import spaces
+
+TRANSFORMS = ("identity", "log", "scale")
+
+
+class ObservationEncoder:
+    def __init__(
+        self,
+        size: int,
+        transform: str = "identity",
+        scale: Union[float, np.ndarray] = 1.0,
+        normalize: bool = False,
+        clip: float = 10.0,
+        epsilon: float = 1e-8,
+    ):
+        if transform not in TRANSFORMS:
+            raise ValueError(f"transform must be one of {TRANSFORMS}, got {transform!r}")
+
+        self.size = size
+        self.transform = transform
+        self.scale = np.broadcast_to(np.asarray(scale, dtype=np.float32), (size,)).copy()
+        self.normalize = normalize
+        self.clip = clip
+        self.epsilon = epsilon
+        # Freeze the statistics, e.g. for evaluation.
+        self.update_stats = True
+
+        self.mean = np.zeros(size, dtype=np.float64)
+        self.var = np.ones(size, dtype=np.float64)
+        self.count = 0
+
+        self._std = np.ones(size, dtype=np.float32)
+        self._mean = np.zeros(size, dtype=np.float32)
+
+    @property
+    def identity(self) -> bool:
+        return self.transform == "identity" and not self.normalize
+
+    def observation_space(self) -> spaces.Box:
+        """Space of a single encoded observation."""
+
+        low, high = (-self.clip, self.clip) if self.normalize else (0.0, np.inf)
+        return spaces.Box(low=low, high=high, shape=(self.size,), dtype=np.float32)
+
+    def encode(self, observations: np.ndarray, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """Encode the float32 ``observations`` of shape ``(N, size)`` in place.
+
+        Only rows selected by ``mask`` update the running statistics, all
+        rows are encoded.
+        """
+
+        if self.transform == "log":
+            np.log1p(observations, out=observations)
+        elif self.transform == "scale":
+            observations *= self.scale
+
+        if self.normalize:
+            if self.update_stats:
+                self._update(observations if mask is None else observations[mask])
+            observations -= self._mean
+            observations /= self._std
+            np.clip(observations, -self.clip, self.clip, out=observations)
+
+        return observations
+
+    def _update(self, batch: np.ndarray):
+        if len(batch) == 0:
+            return
+
+        # Chan et al. parallel update of mean and variance with a whole batch.
+        batch_mean = batch.mean(axis=0, dtype=np.float64)
+        batch_var = batch.var(axis=0, dtype=np.float64)
+        batch_count = len(batch)
+
+        total = self.count + batch_count
+        delta = batch_mean - self.mean
+        self.mean = self.mean + delta * batch_count / total
+        self.var = (self.var * self.count + batch_var * batch_count + delta**2 * self.count * batch_count / total) / total
+        self.count = total
+
+        self._mean[:] = self.mean
+        self._std[:] = np.sqrt(self.var + self.epsilon)
+
+    def state_dict(self) -> dict:
+        return {"mean": self.mean.copy(), "var": self.var.copy(), "count": self.count}
+
+    def load_state_dict(self, state: dict):
+        self.mean = np.asarray(state["mean"], dtype=np.float64).copy()
+        self.var = np.asarray(state["var"], dtype=np.float64).copy()
+        self.count = state["count"]
+        self._mean[:] = self.mean
+        self._std[:] = np.sqrt(self.var + self.epsilon)
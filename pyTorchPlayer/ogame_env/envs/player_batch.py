@@ -0,0 +1,144 @@
+"""Vector env stepping all pythonnet players with one .NET call per step.
+
+``GridWorldEnv`` crosses the Python/.NET boundary several times per env and
+step (``Foo.ApplyAction``, ``Foo.UpdateState``, the action mask and the
+episode statistics). ``PlayerBatchVectorEnv`` owns a ``PlayerBatch`` of
+players instead: ``PlayerBatch.Step`` applies the int64 action array and
+writes observations, rewards, terminations, action masks and the statistics
+of finished episodes into the buffers below, so the interop cost of a vector
+step does not depend on ``num_envs``.
+
+Observations, rewards, terminations and action masks can be supplied by the
+caller, e.g. views of shared or pinned memory. An ``observation_encoder``
+encodes the observations in place after every step. The returned arrays are
+overwritten by the next ``step``/``reset``; copy them if they need to
+outlive it.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+import gymnasium as gym
+from gymnasium import spaces
+from gymnasium.vector.utils import batch_space
+
+from ogame_env.envs.dotnet import load_game
+from ogame_env.envs.numpy_game import ACTION_MODES, FINAL_INFO_KEYS, NUM_ACTIONS, OBSERVATION_SIZE
+from ogame_env.envs.observation import ObservationEncoder
+
+load_game()
+
+from OGameSim.Production import PlayerBatch
+from System import IntPtr
+
+
+def _buffer(array: Optional[np.ndarray], shape: tuple, dtype, name: str) -> np.ndarray:
+    if array is None:
+        return np.zeros(shape, dtype=dtype)
+    if array.shape != shape or array.dtype != dtype:
+        raise ValueError(f"{name} must be a {np.dtype(dtype)} array of shape {shape}")
+    if not array.flags.c_contiguous:
+        raise ValueError(f"{name} must be C-contiguous")
+    return array
+
+
+def _pointer(array: np.ndarray) -> IntPtr:
+    return IntPtr(array.ctypes.data)
+
+
+class PlayerBatchVectorEnv(gym.vector.VectorEnv):
+    metadata = {
+        "render_modes": [],
+        "autoreset_mode": gym.vector.AutoresetMode.NEXT_STEP,
+    }
+
+    def __init__(
+        self,
+        num_envs: int,
+        action_mode: str = "step",
+        max_steps: int = 8000,
+        observations: Optional[np.ndarray] = None,
+        rewards: Optional[np.ndarray] = None,
+        terminations: Optional[np.ndarray] = None,
+        action_masks: Optional[np.ndarray] = None,
+        observation_encoder: Optional[ObservationEncoder] = None,
+        render_mode: Optional[str] = None,
+    ):
+        if action_mode not in ACTION_MODES:
+            raise ValueError(f"Unknown action mode {action_mode!r}, expected one of {ACTION_MODES}")
+
+        self.num_envs = num_envs
+        self.action_mode = action_mode
+        self.render_mode = render_mode
+        self.observation_encoder = observation_encoder
+
+        self.observations = _buffer(observations, (num_envs, OBSERVATION_SIZE), np.float32, "observations")
+        self.rewards = _buffer(rewards, (num_envs,), np.float32, "rewards")
+        self.terminations = _buffer(terminations, (num_envs,), np.bool_, "terminations")
+        self.action_masks = _buffer(action_masks, (num_envs, NUM_ACTIONS), np.bool_, "action_masks")
+        self.truncations = np.zeros(num_envs, dtype=bool)
+        self.actions = np.zeros(num_envs, dtype=np.int64)
+        self.skipped_days = np.zeros(num_envs, dtype=np.int64)
+        self.stats = np.zeros((num_envs, len(FINAL_INFO_KEYS)), dtype=np.float64)
+
+        self.batch = PlayerBatch(num_envs, action_mode == "fast_forward")
+        self.batch.MaxSteps = max_steps
+        self._step_pointers = [
+            _pointer(buffer)
+            for buffer in (
+                self.actions,
+                self.observations,
+                self.rewards,
+                self.terminations,
+                self.action_masks,
+                self.skipped_days,
+                self.stats,
+            )
+        ]
+        self._reset_pointers = [_pointer(self.observations), _pointer(self.action_masks)]
+
+        self.single_action_space = spaces.Discrete(NUM_ACTIONS)
+        if observation_encoder is not None:
+            self.single_observation_space = observation_encoder.observation_space()
+        else:
+            self.single_observation_space = spaces.Box(
+                low=0.0, high=np.full((OBSERVATION_SIZE,), np.inf), shape=(OBSERVATION_SIZE,), dtype=np.float32
+            )
+        self.action_space = batch_space(self.single_action_space, num_envs)
+        self.observation_space = batch_space(self.single_observation_space, num_envs)
+
+    def reset(self, *, seed: Optional[int] = None, options: Optional[dict] = None):
+        super().reset(seed=seed)
+        self.batch.Reset(*self._reset_pointers)
+        if self.observation_encoder is not None:
+            self.observation_encoder.encode(self.observations)
+        self.rewards.fill(0)
+        self.terminations.fill(False)
+
+        return self.observations, self._get_infos()
+
+    def step(self, actions):
+        self.actions[:] = actions
+        terminated_count = self.batch.Step(*self._step_pointers)
+        if self.observation_encoder is not None:
+            self.observation_encoder.encode(self.observations)
+
+        infos = self._get_infos()
+        if self.action_mode == "fast_forward":
+            infos["skipped_days"] = self.skipped_days.copy()
+            infos["_skipped_days"] = np.ones(self.num_envs, dtype=bool)
+
+        if terminated_count > 0:
+            terminated = self.terminations.copy()
+            final_info = {}
+            for index, key in enumerate(FINAL_INFO_KEYS):
+                final_info[key] = np.where(terminated, self.stats[:, index], 0.0)
+                final_info[f"_{key}"] = terminated
+            infos["final_info"] = final_info
+            infos["_final_info"] = terminated
+
+        return self.observations, self.rewards, self.terminations, self.truncations, infos
+
+    def _get_infos(self):
+        return {"action_mask": self.action_masks, "_action_mask": np.ones(self.num_envs, dtype=bool)}
@@ -0,0 +1,212 @@
+"""Vector env that steps shards of pythonnet envs in worker processes.
+
+``SyncVectorEnv`` steps every ``GridWorldEnv`` on a single core. This vector env
+spawns ``num_workers`` processes, each loading the CoreCLR runtime once and
+stepping a contiguous shard of the players with a :class:`PlayerBatchVectorEnv`
+that writes observations, rewards, terminations and action masks straight
+into shared memory. Actions are read from shared memory as well; the pipes
+to the workers only carry the commands and the (usually empty) per-step
+infos.
+
+Workers are started with the ``spawn`` method so that no runtime state is
+inherited from the parent process.
+"""
+
+import multiprocessing as mp
+import traceback
+from multiprocessing import shared_memory
+from typing import Optional
+
+import numpy as np
+
+import gymnasium as gym
+from gymnasium import spaces
+from gymnasium.vector.utils import batch_space
+
+from ogame_env.envs.numpy_game import ACTION_MODES
+from ogame_env.envs.observation import ObservationEncoder
+
+_BUFFERS = {
+    "actions": ((), np.int64),
+    "observations": ((125,), np.float32),
+    "rewards": ((), np.float32),
+    "terminations": ((), np.bool_),
+    "truncations": ((), np.bool_),
+    "action_masks": ((63,), np.bool_),
+}
+
+
+def _attach_buffers(memories: dict, num_envs: int) -> dict:
+    return {
+        name: np.ndarray((num_envs,) + shape, dtype=dtype, buffer=memories[name].buf)
+        for name, (shape, dtype) in _BUFFERS.items()
+    }
+
+
+def _worker(pipe, memory_names: dict, num_envs: int, shard: slice, action_mode: str, max_steps: int):
+    from ogame_env.envs.player_batch import PlayerBatchVectorEnv
+
+    memories = {name: shared_memory.SharedMemory(name=memory_name) for name, memory_name in memory_names.items()}
+    buffers = _attach_buffers(memories, num_envs)
+
+    try:
+        env = PlayerBatchVectorEnv(
+            shard.stop - shard.start,
+            action_mode=action_mode,
+            max_steps=max_steps,
+            observations=buffers["observations"][shard],
+            rewards=buffers["rewards"][shard],
+            terminations=buffers["terminations"][shard],
+            action_masks=buffers["action_masks"][shard],
+        )
+
+        while True:
+            command = pipe.recv()
+            if command == "step":
+                _, _, _, _, infos = env.step(buffers["actions"][shard])
+            elif command == "reset":
+                _, infos = env.reset()
+            elif command == "close":
+                env.close()
+                pipe.send(None)
+                break
+            else:
+                raise ValueError(f"Unknown command {command!r}")
+
+            # The action masks are already in the shared buffer.
+            infos.pop("action_mask")
+            infos.pop("_action_mask")
+            pipe.send((True, infos))
+    except KeyboardInterrupt:
+        pass
+    except Exception:
+        pipe.send((False, traceback.format_exc()))
+    finally:
+        for memory in memories.values():
+            memory.close()
+
+
+def _merge_infos(infos: dict, shard_infos: dict, shard: slice, num_envs: int) -> dict:
+    for key, value in shard_infos.items():
+        if isinstance(value, dict):
+            infos[key] = _merge_infos(infos.get(key, {}), value, shard, num_envs)
+            continue
+
+        if key not in infos:
+            infos[key] = np.zeros((num_envs,) + value.shape[1:], dtype=value.dtype)
+        infos[key][shard] = value
+
+    return infos
+
+
+class ShardedVectorEnv(gym.vector.VectorEnv):
+    """``num_envs`` pythonnet players split evenly across ``num_workers`` processes.
+
+    Like :class:`PlayerBatchVectorEnv`, the returned arrays are views of the
+    shared buffers and are overwritten by the next step. An
+    ``observation_encoder`` runs in this process over the observations of all
+    workers, so normalization statistics cover every env.
+    """
+
+    metadata = {
+        "render_modes": [],
+        "autoreset_mode": gym.vector.AutoresetMode.NEXT_STEP,
+    }
+
+    def __init__(
+        self,
+        num_envs: int,
+        num_workers: int,
+        action_mode: str = "step",
+        max_steps: int = 8000,
+        observation_encoder: Optional[ObservationEncoder] = None,
+        render_mode: Optional[str] = None,
+    ):
+        # Checked here, the workers would only fail after the shared memory exists.
+        if action_mode not in ACTION_MODES:
+            raise ValueError(f"Unknown action mode {action_mode!r}, expected one of {ACTION_MODES}")
+
+        self.num_envs = num_envs
+        self.num_workers = min(num_workers, num_envs)
+        self.render_mode = render_mode
+        self.observation_encoder = observation_encoder
+
+        self._memories = {}
+        for name, (shape, dtype) in _BUFFERS.items():
+            size = int(np.prod((num_envs,) + shape)) * np.dtype(dtype).itemsize
+            self._memories[name] = shared_memory.SharedMemory(create=True, size=size)
+        buffers = _attach_buffers(self._memories, num_envs)
+        for name, buffer in buffers.items():
+            buffer.fill(0)
+            setattr(self, name, buffer)
+
+        bounds = np.linspace(0, num_envs, self.num_workers + 1).astype(int).tolist()
+        self._shards = [slice(start, stop) for start, stop in zip(bounds[:-1], bounds[1:])]
+
+        context = mp.get_context("spawn")
+        memory_names = {name: memory.name for name, memory in self._memories.items()}
+        self._pipes = []
+        self._processes = []
+        for shard in self._shards:
+            parent_pipe, child_pipe = context.Pipe()
+            process = context.Process(
+                target=_worker,
+                args=(child_pipe, memory_names, num_envs, shard, action_mode, max_steps),
+                daemon=True,
+            )
+            process.start()
+            child_pipe.close()
+            self._pipes.append(parent_pipe)
+            self._processes.append(process)
+
+        self.single_action_space = spaces.Discrete(63)
+        if observation_encoder is not None:
+            self.single_observation_space = observation_encoder.observation_space()
+        else:
+            self.single_observation_space = spaces.Box(
+                low=0.0, high=np.full((125,), np.inf), shape=(125,), dtype=np.float32
+            )
+        self.action_space = batch_space(self.single_action_space, num_envs)
+        self.observation_space = batch_space(self.single_observation_space, num_envs)
+
+    def reset(self, *, seed: Optional[int] = None, options: Optional[dict] = None):
+        super().reset(seed=seed)
+        infos = self._run("reset")
+        self._encode_observations()
+        return self.observations, infos
+
+    def step(self, actions):
+        self.actions[:] = actions
+        infos = self._run("step")
+        self._encode_observations()
+        return self.observations, self.rewards, self.terminations, self.truncations, infos
+
+    def _encode_observations(self):
+        if self.observation_encoder is not None:
+            self.observation_encoder.encode(self.observations)
+
+    def _run(self, command: str) -> dict:
+        for pipe in self._pipes:
+            pipe.send(command)
+
+        infos = {}
+        for pipe, shard in zip(self._pipes, self._shards):
+            success, result = pipe.recv()
+            if not success:
+                raise RuntimeError(f"Worker for envs {shard.start}..{shard.stop - 1} failed:\n{result}")
+            infos = _merge_infos(infos, result, shard, self.num_envs)
+
+        infos["action_mask"] = self.action_masks
+        infos["_action_mask"] = np.ones(self.num_envs, dtype=bool)
+        return infos
+
+    def close_extras(self, **kwargs):
+        for pipe, process in zip(self._pipes, self._processes):
+            if process.is_alive():
+                pipe.send("close")
+                pipe.recv()
+            process.join()
+
+        for memory in self._memories.values():
+            memory.close()
+            memory.unlink()
@@ -0,0 +1,83 @@
+"""Memory-mapped store of ``SNAPSHOT_DTYPE`` player records.
+
+The store is a ``.npy`` file of ``capacity`` fixed-size records opened with
+``np.memmap``, so it can be larger than memory and shared by the processes of
+a run. Appends beyond the capacity overwrite the oldest records. Unused
+records have ``day == -1``. The number of records and the next record to
+write are kept in ``<path>.json``, so a reopened store that has wrapped
+around continues at its oldest record.
+"""
+
+import json
+import os
+from typing import Optional
+
+import numpy as np
+
+from ogame_env.envs.numpy_game import SNAPSHOT_DTYPE
+
+
+class SnapshotStore:
+    def __init__(self, path: str, capacity: Optional[int] = None, mode: str = "r+"):
+        """Open the store at ``path``, or create an empty one with ``capacity`` records.
+
+        ``mode`` is the ``np.memmap`` mode of an existing store, ``"r"`` for
+        read-only access.
+        """
+
+        self.path = path
+        self._cursor_path = path + ".json"
+        if capacity is not None:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._records = np.lib.format.open_memmap(path, mode="w+", dtype=SNAPSHOT_DTYPE, shape=(capacity,))
+            self._records["day"] = -1
+            self.capacity = capacity
+            self._size = 0
+            # next record to write
+            self._next = 0
+            self._write_cursor()
+        else:
+            self._records = np.lib.format.open_memmap(path, mode=mode)
+            if self._records.dtype != SNAPSHOT_DTYPE:
+                raise ValueError(f"{path} does not hold SNAPSHOT_DTYPE records")
+            self.capacity = len(self._records)
+            try:
+                with open(self._cursor_path) as file:
+                    cursor = json.load(file)
+                self._size, self._next = cursor["size"], cursor["next"]
+            except FileNotFoundError:
+                # Without a cursor file the store is assumed not to have wrapped around.
+                self._size = int(np.count_nonzero(self._records["day"] >= 0))
+                self._next = self._size % self.capacity
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def records(self) -> np.ndarray:
+        """Memory-mapped view of the stored records."""
+
+        return self._records[: self._size]
+
+    def append(self, records: np.ndarray):
+        records = records[-self.capacity :]
+        rows = (self._next + np.arange(len(records))) % self.capacity
+        self._records[rows] = records
+        self._next = (self._next + len(records)) % self.capacity
+        self._size = min(self._size + len(records), self.capacity)
+        self._write_cursor()
+
+    def sample(self, rng: np.random.Generator, count: int) -> np.ndarray:
+        """``count`` records drawn uniformly with replacement."""
+
+        if self._size == 0:
+            raise ValueError(f"snapshot store {self.path} is empty")
+        return self._records[rng.integers(self._size, size=count)]
+
+    def flush(self):
+        self._records.flush()
+
+    def _write_cursor(self):
+        with open(self._cursor_path + ".tmp", "w") as file:
+            json.dump({"size": self._size, "next": self._next}, file)
+        os.replace(self._cursor_path + ".tmp", self._cursor_path)
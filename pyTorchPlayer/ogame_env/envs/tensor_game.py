@@ -1,12 +1,18 @@
 """TorchRL tensor environment and GPU planning helpers.
 
 The environment stores all state in PyTorch tensors so it can live entirely on
-GPU memory. To scale to many colonies, keep a batch dimension in ``state`` or
-use the :func:`batch_plan` helper to pick upgrades for multiple colonies at
-once.
+GPU memory. ``TensorGameEnv`` carries a batch dimension, so thousands of
+colonies are stepped at once with masked tensor ops and no host syncs. The
+:func:`batch_plan` helper picks upgrades for multiple colonies at once.
 """
 
+import gymnasium as gym
+import numpy as np
 import torch
+import torch.nn.functional as F
+from gymnasium import spaces
+from gymnasium.vector.utils import batch_space
+from tensordict import TensorDict
 from torchrl.data import DiscreteTensorSpec, UnboundedContinuousTensorSpec
 from torchrl.envs.common import EnvBase
 from typing import Optional
@@ -21,88 +27,175 @@ class TensorGameEnv(EnvBase):
     the corresponding resource. All state and updates are handled with PyTorch
     tensors so the logic can run on CPU or GPU.
 
+    ``batch_size`` colonies are simulated in parallel. ``state`` has shape
+    ``(batch_size, 6)`` and every colony keeps its own ``day`` counter. Actions
+    are applied with masks instead of Python branches and ``done`` is computed
+    on the device, so a step never synchronizes with the host. Colonies that
+    finished are reset individually through the ``"_reset"`` entry that torchrl
+    collectors pass to :meth:`reset`. Without ``batch_size`` the environment is
+    unbatched.
+
     Example
     -------
     Below is a minimal sketch of how upgrade decisions could be computed purely
     with tensor ops on the chosen device. The snippet selects the affordable mine
-    with the best payback ratio (lower is better)::
+    with the best payback ratio (lower is better) for every colony::
 
         device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        env = TensorGameEnv(device=device)
-        costs = torch.tensor([100.0, 100.0, 100.0], device=device)
-        resources = env.state[:3]
-        production = env.state[3:]
-
-        payback = costs / production                       # cost per extra unit
-        affordable = resources >= costs                    # which upgrades we can buy
-        masked = torch.where(affordable, payback, torch.tensor(float("inf"), device=device))
-        action = masked.argmin() + 1                       # 1..3 -> upgrade ids
-
-    This strategy runs entirely on the GPU when ``device="cuda"`` and can be
-    extended to more elaborate heuristics (priority weights, probabilistic
-    sampling, batch environments, etc.).
+        env = TensorGameEnv(batch_size=4096, device=device)
+        tensordict = env.reset()
+        costs = torch.full((4096, 3), 100.0, device=device)
+        resources = env.state[:, :3]
+        production = env.state[:, 3:]
+
+        action = batch_plan(resources, production, costs) + 1  # 1..3 -> upgrade ids
+        tensordict = env.step(tensordict.set("action", action))
+
+    ``batch_plan`` returns the cheapest mine even if none is affordable, in which
+    case the step is penalized. Replace the ``+ 1`` with a masked choice of 0 to
+    wait instead.
     """
 
-    def __init__(self, max_days: int = 100, device: Optional[torch.device] = None):
-        super().__init__(device=device)
+    upgrade_cost = 100.0
+    penalty = -0.1
+
+    def __init__(self, max_days: int = 100, batch_size: Optional[int] = None, device: Optional[torch.device] = None):
+        batch_shape = torch.Size([] if batch_size is None else [batch_size])
+        super().__init__(device=device, batch_size=batch_shape)
         self.max_days = max_days
         # state = [metal, crystal, deut, metal_prod, crystal_prod, deut_prod]
-        self.state = torch.zeros(6, device=self.device)
+        self.state = torch.zeros(batch_shape + (6,), device=self.device)
+        self.day = torch.zeros(batch_shape, dtype=torch.int64, device=self.device)
 
-        self.observation_spec = UnboundedContinuousTensorSpec(shape=torch.Size([6]))
-        self.action_spec = DiscreteTensorSpec(4)  # 0: wait, 1-3: upgrade mines
-        self.reward_spec = UnboundedContinuousTensorSpec(shape=torch.Size([]))
-        self.done_spec = DiscreteTensorSpec(2, dtype=torch.bool)
+        self.observation_spec = UnboundedContinuousTensorSpec(shape=batch_shape + (6,), device=self.device)
+        self.action_spec = DiscreteTensorSpec(4, shape=batch_shape, device=self.device)  # 0: wait, 1-3: upgrade mines
+        self.reward_spec = UnboundedContinuousTensorSpec(shape=batch_shape + (1,), device=self.device)
+        self.done_spec = DiscreteTensorSpec(2, shape=batch_shape + (1,), dtype=torch.bool, device=self.device)
 
     def _reset(self, tensordict):
-        self.day = 0
-        self.state.zero_()
-        # base production per resource
-        self.state[3:] = torch.tensor([1.0, 1.0, 1.0], device=self.device)
+        reset = None if tensordict is None else tensordict.get("_reset", None)
+        if reset is None:
+            reset = torch.ones(self.batch_size, dtype=torch.bool, device=self.device)
+        else:
+            reset = reset.reshape(self.batch_size)
 
-        tensordict.set("observation", self.state.clone())
-        tensordict.set("reward", torch.zeros((), dtype=torch.float32, device=self.device))
-        tensordict.set("done", torch.zeros((), dtype=torch.bool, device=self.device))
-        return tensordict
+        # base production per resource
+        initial = torch.tensor([0.0, 0.0, 0.0, 1.0, 1.0, 1.0], device=self.device)
+        self.state.copy_(torch.where(reset.unsqueeze(-1), initial, self.state))
+        self.day.masked_fill_(reset, 0)
+
+        return TensorDict(
+            {
+                "observation": self.state.clone(),
+                "done": self.day.unsqueeze(-1) >= self.max_days,
+                "terminated": self.day.unsqueeze(-1) >= self.max_days,
+            },
+            batch_size=self.batch_size,
+            device=self.device,
+        )
 
     def _step(self, tensordict):
-        action = int(tensordict.get("action").item())
-        cost = torch.tensor(100.0, device=self.device)
-        resources = self.state[:3]
-        production = self.state[3:]
-        reward = torch.zeros((), device=self.device)
-
-        if action == 1:  # upgrade metal mine
-            can = resources[0] >= cost
-            resources[0] = torch.where(can, resources[0] - cost, resources[0])
-            production[0] = torch.where(can, production[0] + 1.0, production[0])
-            reward = torch.where(can, reward, torch.tensor(-0.1, device=self.device))
-        elif action == 2:  # upgrade crystal mine
-            can = resources[1] >= cost
-            resources[1] = torch.where(can, resources[1] - cost, resources[1])
-            production[1] = torch.where(can, production[1] + 1.0, production[1])
-            reward = torch.where(can, reward, torch.tensor(-0.1, device=self.device))
-        elif action == 3:  # upgrade deuterium synthesizer
-            can = resources[2] >= cost
-            resources[2] = torch.where(can, resources[2] - cost, resources[2])
-            production[2] = torch.where(can, production[2] + 1.0, production[2])
-            reward = torch.where(can, reward, torch.tensor(-0.1, device=self.device))
+        action = tensordict.get("action").reshape(self.batch_size).long()
+        resources = self.state[..., :3]
+        production = self.state[..., 3:]
+
+        # upgrade[..., i] is True where the action selects mine i
+        upgrade = F.one_hot(action, 4)[..., 1:].bool()
+        can = upgrade & (resources >= self.upgrade_cost)
+        resources.sub_(can * self.upgrade_cost)
+        production.add_(can.to(production.dtype))
+        failed = (action > 0) & ~can.any(dim=-1)
+        reward = failed * self.penalty
 
         # end of day production
-        resources += production
-        self.day += 1
-        reward = reward + resources.sum()
-        done = self.day >= self.max_days
-
-        tensordict.set("observation", self.state.clone())
-        tensordict.set("reward", reward.to(torch.float32))
-        tensordict.set("done", torch.tensor(done, dtype=torch.bool, device=self.device))
-        return tensordict
+        resources.add_(production)
+        self.day.add_(1)
+        reward = reward + resources.sum(dim=-1)
+        done = (self.day >= self.max_days).unsqueeze(-1)
+
+        return TensorDict(
+            {
+                "observation": self.state.clone(),
+                "reward": reward.to(torch.float32).unsqueeze(-1),
+                "done": done,
+                "terminated": done.clone(),
+            },
+            batch_size=self.batch_size,
+            device=self.device,
+        )
 
     def _set_seed(self, seed: Optional[int]) -> Optional[int]:
         return seed
 
 
+class TensorGameVectorEnv(gym.vector.VectorEnv):
+    """Gymnasium vector env over a batched ``TensorGameEnv``.
+
+    Registered as ``ogame_env/TensorGame-v0``. Actions, observations and
+    rewards are NumPy arrays; colonies that finish are reset in the same step.
+    ``action_mode`` and ``observation_encoder`` are accepted like by the other
+    vector envs, but only ``"step"`` and no encoder are supported.
+    """
+
+    metadata = {
+        "render_modes": [],
+        "autoreset_mode": gym.vector.AutoresetMode.SAME_STEP,
+    }
+
+    def __init__(
+        self,
+        num_envs: int,
+        max_days: int = 100,
+        device: Optional[torch.device] = None,
+        action_mode: str = "step",
+        observation_encoder=None,
+    ):
+        if action_mode != "step":
+            raise ValueError(f"TensorGameVectorEnv only supports action_mode 'step', got {action_mode!r}")
+        if observation_encoder is not None:
+            raise ValueError("TensorGameVectorEnv does not support an observation encoder")
+
+        self.env = TensorGameEnv(max_days, batch_size=num_envs, device=device)
+        self.num_envs = num_envs
+
+        self.single_observation_space = spaces.Box(low=0.0, high=np.inf, shape=(6,), dtype=np.float32)
+        self.single_action_space = spaces.Discrete(4)
+        self.observation_space = batch_space(self.single_observation_space, num_envs)
+        self.action_space = batch_space(self.single_action_space, num_envs)
+        self._tensordict = None
+
+    def reset(self, *, seed: Optional[int] = None, options: Optional[dict] = None):
+        super().reset(seed=seed)
+        self._tensordict = self.env.reset()
+        observations = self._tensordict["observation"].cpu().numpy()
+        return observations, self._action_mask_info(observations)
+
+    def step(self, actions):
+        self._tensordict.set("action", torch.as_tensor(actions, device=self.env.device))
+        result, self._tensordict = self.env.step_and_maybe_reset(self._tensordict)
+
+        terminated = result["next", "terminated"].reshape(self.num_envs).cpu().numpy()
+        observations = self._tensordict["observation"].cpu().numpy()
+        infos = self._action_mask_info(observations)
+        if terminated.any():
+            infos["final_obs"] = result["next", "observation"].cpu().numpy()
+            infos["_final_obs"] = terminated
+        return (
+            observations,
+            result["next", "reward"].reshape(self.num_envs).cpu().numpy().astype(np.float64),
+            terminated,
+            np.zeros(self.num_envs, dtype=bool),
+            infos,
+        )
+
+    def _action_mask_info(self, observations: np.ndarray) -> dict:
+        """Waiting and the affordable upgrades, like the ``"step"`` mode of the other envs."""
+
+        action_mask = np.ones((self.num_envs, 4), dtype=bool)
+        action_mask[:, 1:] = observations[:, :3] >= self.env.upgrade_cost
+        return {"action_mask": action_mask, "_action_mask": np.ones(self.num_envs, dtype=bool)}
+
+
 # ---------------------------------------------------------------------------
 # Example helper functions
 # ---------------------------------------------------------------------------
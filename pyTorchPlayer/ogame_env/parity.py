@@ -0,0 +1,205 @@
+"""Golden traces of the pythonnet ``GridWorldEnv`` and their replay on other engines.
+
+``record`` plays ``num_traces`` episodes of ``GridWorldEnv`` with seeded
+random actions, by default until they terminate, and keeps the actions and, after the reset and every step,
+the observation, reward, termination and ``Player.Points`` (the C#
+``decimal``, stored exactly in thousandths). ``replay`` steps an engine
+through the recorded actions of all traces of a file at once and reports
+the first divergence of every trace.
+
+Files are compressed ``.npz`` archives with time-major arrays:
+
+- ``actions``: ``(T, S)`` uint8,
+- ``observations``: ``(T + 1, S, 125)`` float32 bits, each step XORed with
+  the previous one so unchanged values compress to nothing,
+- ``rewards``: ``(T, S)`` float32, ``terminated``: ``(T, S)`` bool,
+- ``points``: ``(T + 1, S)`` int64 thousandths,
+- ``lengths``: ``(S,)`` steps of every trace; traces stop at their
+  termination, later actions are padding,
+- ``action_mode`` and ``max_steps``.
+
+An engine is a class constructed with ``(num_envs, max_steps=...,
+action_mode=...)`` with ``step(actions) -> (rewards, terminated)``,
+``write_observation(out)`` and ``points`` in thousandths, like
+``NumpyGameEngine``.
+"""
+
+import decimal
+import importlib
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+
+from ogame_env.envs.numpy_game import NUM_ACTIONS, OBSERVATION_SIZE
+
+ENGINES = {
+    "numpy": "ogame_env.envs.numpy_game:NumpyGameEngine",
+}
+
+FIELDS = ("observation", "reward", "terminated", "points")
+
+
+@dataclass
+class Divergence:
+    trace: int
+    """index of the trace in its file"""
+    step: int
+    """number of steps taken when the engine diverged, 0 for the reset"""
+    field: str
+    """first of ``FIELDS`` that differs"""
+    expected: np.ndarray
+    actual: np.ndarray
+
+
+def load_engine(name: str):
+    """Engine class of an ``ENGINES`` name or a ``module:class`` path."""
+
+    module, _, attribute = ENGINES.get(name, name).partition(":")
+    return getattr(importlib.import_module(module), attribute)
+
+
+def _points(player) -> int:
+    from System.Globalization import CultureInfo
+
+    thousandths = decimal.Decimal(player.Points.ToString(CultureInfo.InvariantCulture)) * 1000
+    if thousandths != thousandths.to_integral_value():
+        raise ValueError(f"points {thousandths / 1000} are not a multiple of 0.001")
+    return int(thousandths)
+
+
+def record(
+    path: str,
+    num_traces: int = 32,
+    steps: Optional[int] = None,
+    seed: int = 1,
+    action_mode: str = "step",
+    upgrade_probability: float = 0.5,
+    invalid_probability: float = 0.05,
+):
+    """Record ``num_traces`` traces of up to ``steps`` steps into ``path``.
+
+    ``steps`` defaults to ``GridWorldEnv.maxSteps + 1``, after which every
+    episode has terminated. Recording stops once all traces terminated.
+
+    Every step a trace proceeds to the next day, upgrades something allowed
+    by the action mask with probability ``upgrade_probability`` or takes
+    any action, including unaffordable and unavailable upgrades, with
+    probability ``invalid_probability``.
+    """
+
+    from ogame_env.envs.grid_world import GridWorldEnv
+
+    rng = np.random.default_rng(seed)
+    envs = [
+        GridWorldEnv(action_mode=action_mode, state=np.zeros(OBSERVATION_SIZE, dtype=np.float32))
+        for _ in range(num_traces)
+    ]
+    if steps is None:
+        steps = envs[0].maxSteps + 1
+
+    actions = np.zeros((steps, num_traces), dtype=np.uint8)
+    observations = np.zeros((steps + 1, num_traces, OBSERVATION_SIZE), dtype=np.float32)
+    rewards = np.zeros((steps, num_traces), dtype=np.float32)
+    terminated = np.zeros((steps, num_traces), dtype=bool)
+    points = np.zeros((steps + 1, num_traces), dtype=np.int64)
+    lengths = np.full(num_traces, steps, dtype=np.int64)
+
+    action_masks = np.zeros((num_traces, NUM_ACTIONS), dtype=bool)
+    for i, env in enumerate(envs):
+        observations[0, i], infos = env.reset()
+        action_masks[i] = infos["action_mask"]
+
+    for t in range(steps):
+        if (lengths < steps).all():
+            break
+
+        draw = rng.random(num_traces)
+        valid = np.where(action_masks, rng.random(action_masks.shape), -1.0).argmax(axis=1)
+        actions[t] = np.where(draw < upgrade_probability, valid, 0)
+        invalid = draw >= 1 - invalid_probability
+        actions[t, invalid] = rng.integers(NUM_ACTIONS, size=np.count_nonzero(invalid))
+
+        # Envs are stepped in index order like a SyncVectorEnv.
+        for i, env in enumerate(envs):
+            if lengths[i] < steps:
+                continue
+            observation, reward, done, _, infos = env.step(actions[t, i])
+            observations[t + 1, i] = observation
+            rewards[t, i] = reward
+            terminated[t, i] = done
+            points[t + 1, i] = _points(env.player)
+            action_masks[i] = infos["action_mask"]
+            if done:
+                lengths[i] = t + 1
+
+    # Drop the steps after the last trace terminated.
+    steps = int(lengths.max())
+    bits = observations[: steps + 1].view(np.uint32)
+    bits[1:] ^= bits[:-1].copy()
+    np.savez_compressed(
+        path,
+        actions=actions[:steps],
+        observations=bits,
+        rewards=rewards[:steps],
+        terminated=terminated[:steps],
+        points=points[: steps + 1],
+        lengths=lengths,
+        action_mode=action_mode,
+        max_steps=envs[0].maxSteps,
+    )
+
+
+def replay(path: str, engine: str = "numpy") -> List[Divergence]:
+    """First divergence of every trace of ``path`` that ``engine`` does not reproduce."""
+
+    with np.load(path) as trace:
+        trace = dict(trace)
+    steps, num_traces = trace["actions"].shape
+    lengths = trace["lengths"]
+
+    game = load_engine(engine)(
+        num_traces, max_steps=int(trace["max_steps"]), action_mode=str(trace["action_mode"])
+    )
+    observations = np.zeros((num_traces, OBSERVATION_SIZE), dtype=np.float32)
+    expected_bits = np.zeros((num_traces, OBSERVATION_SIZE), dtype=np.uint32)
+    expected_observations = expected_bits.view(np.float32)
+
+    divergences: List[Optional[Divergence]] = [None] * num_traces
+    live = np.ones(num_traces, dtype=bool)
+
+    def compare(t: int, values: dict):
+        checked = live & (lengths >= t)
+        for field in FIELDS:
+            if field not in values:
+                continue
+            expected, actual = values[field]
+            equal = expected == actual
+            if equal.ndim > 1:
+                equal = equal.all(axis=1)
+            for i in np.flatnonzero(checked & ~equal):
+                divergences[i] = Divergence(int(i), t, field, np.copy(expected[i]), np.copy(actual[i]))
+                live[i] = checked[i] = False
+
+    expected_bits ^= trace["observations"][0]
+    game.write_observation(observations)
+    compare(0, {"observation": (expected_observations, observations), "points": (trace["points"][0], game.points)})
+
+    for t in range(steps):
+        if not (live & (lengths > t)).any():
+            break
+
+        rewards, terminated = game.step(trace["actions"][t].astype(np.int64))
+        expected_bits ^= trace["observations"][t + 1]
+        game.write_observation(observations)
+        compare(
+            t + 1,
+            {
+                "observation": (expected_observations, observations),
+                "reward": (trace["rewards"][t], rewards),
+                "terminated": (trace["terminated"][t], terminated),
+                "points": (trace["points"][t + 1], game.points),
+            },
+        )
+
+    return [divergence for divergence in divergences if divergence is not None]
@@ -0,0 +1,3 @@
+from ogame_env.players.beam_search import BeamSearchPlanner
+from ogame_env.players.greedy import GreedyRoiPlayer
+from ogame_env.players.payback_heap import PaybackHeapPlayer
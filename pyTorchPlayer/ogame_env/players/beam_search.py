@@ -0,0 +1,253 @@
+"""Beam search over upgrade sequences.
+
+The search is synchronized on the step counter: every step, each node of the
+beam is expanded into one child per choice and the ``width`` best children
+form the next beam. A node is a player state of a ``NumpyGameEngine``
+together with the astrophysics upgrade its ``GreedyRoiPlayer`` may still be
+playing. Its choices are
+
+- the decision of the greedy payback player (which may start an
+  astrophysics upgrade including the mines of the new planet), and
+- every other affordable upgrade and proceeding to the next day, unless the
+  node is still playing a bought astrophysics upgrade.
+
+Children are ranked by the optimistic score
+
+    points + resources value + production value * remaining steps
+
+i.e. the points the node would reach if it turned its stock and the current
+production of the remaining steps into points without spending further steps.
+Points, resources and production are all counted in thousandths of a point
+per unit of metal value, so the terms add up. The child following the greedy
+player from the start is always kept, so the result is never worse than the
+greedy player's.
+
+Equivalent children are merged before the selection. Two states are
+equivalent if they have the same research levels, the same multiset of
+planets (planet order is ignored), the same resources, step counter and
+pending upgrades; their points follow from the levels. States are compared by
+a 64-bit hash. All children of one beam have the same step counter, so the
+transposition table only needs to cover one step.
+
+Like ``greedy.play`` the search plays ``steps`` decisions and completes an
+astrophysics upgrade bought at the end, so points are comparable to the value
+to beat in the README. The expansion and scoring of the children can be
+spread over a process pool; only scores and hashes are sent back and the
+selected children are stepped again in the main process.
+"""
+
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from ogame_env.envs.numpy_game import NUM_ACTIONS, NumpyGameEngine
+from ogame_env.players.greedy import GreedyRoiPlayer
+from ogame_env.tables import PLANET_MAX_TEMPERATURE
+
+_FNV_OFFSET = np.uint64(0xCBF29CE484222325)
+_FNV_PRIME = np.uint64(0x100000001B3)
+
+
+@dataclass
+class BeamSearchResult:
+    points: float
+    """points of the best leaf"""
+    actions: np.ndarray
+    """engine actions (``"step"`` mode) leading to the best leaf"""
+    expanded: int
+    """number of children stepped while searching"""
+
+
+def state_hash(player: GreedyRoiPlayer) -> np.ndarray:
+    """64-bit hash of every node, ignoring the order of the planets."""
+
+    engine = player.engine
+    levels = engine.mine_levels
+    planets = np.sort((levels[..., 0] << 12) | (levels[..., 1] << 6) | levels[..., 2], axis=1)
+    columns = np.column_stack(
+        [
+            engine.astrophysics,
+            engine.plasma_technology,
+            engine.step_counter,
+            engine.resources,
+            planets,
+            player.pending_astrophysics,
+            player.pending_mines,
+            player.colonized_planet,
+        ]
+    ).astype(np.uint64)
+
+    # FNV-1a over the 64-bit words of every row.
+    hashes = np.full(engine.num_envs, _FNV_OFFSET)
+    with np.errstate(over="ignore"):
+        for column in columns.T:
+            hashes = (hashes ^ column) * _FNV_PRIME
+    return hashes
+
+
+def optimistic_points(engine: NumpyGameEngine, steps: int) -> np.ndarray:
+    """Score of the nodes in thousandths of a point, see the module docstring."""
+
+    remaining = np.maximum(steps - engine.step_counter, 0)
+    production_value = engine.metal_value(engine.todays_production())
+    return engine.points + engine.resources_value() + production_value * remaining
+
+
+def _branches(player: GreedyRoiPlayer, steps: int):
+    """Parent, action and whether it follows the greedy player for every child."""
+
+    engine = player.engine
+    nodes = np.arange(engine.num_envs)
+    playing = engine.step_counter < steps
+    deciding = playing & ~player.pending()
+
+    greedy = player.take(nodes)
+    greedy_actions = greedy.act(playing)
+    colonizing = deciding & greedy.pending()
+
+    action_mask = np.zeros((engine.num_envs, NUM_ACTIONS), dtype=bool)
+    engine.write_action_mask(action_mask)
+    action_mask &= deciding[:, None]
+    # Buying astrophysics alone differs from the greedy astrophysics upgrade.
+    action_mask[nodes[~colonizing], greedy_actions[~colonizing]] = False
+    parents, actions = np.nonzero(action_mask)
+
+    return (
+        np.concatenate([nodes, parents]),
+        np.concatenate([greedy_actions, actions]),
+        np.concatenate([np.ones(len(nodes), dtype=bool), np.zeros(len(parents), dtype=bool)]),
+    )
+
+
+def _children(player: GreedyRoiPlayer, steps: int, parents: np.ndarray, actions: np.ndarray, greedy: np.ndarray):
+    """Step the children of ``player``'s nodes."""
+
+    children = player.take(parents)
+    playing = children.engine.step_counter < steps
+    # Other children are deciding nodes, so the greedy player leaves them alone.
+    greedy_actions = children.act(greedy & playing)
+    children.engine.step(np.where(greedy, greedy_actions, actions))
+    return children
+
+
+def _expand(player: GreedyRoiPlayer, steps: int):
+    """Expand every node of ``player``.
+
+    Returns parent, action, greedy flag, leaf flag, points, score and hash of
+    every child.
+    """
+
+    parents, actions, greedy = _branches(player, steps)
+    children = _children(player, steps, parents, actions, greedy)
+    engine = children.engine
+    leaves = (engine.step_counter >= steps) & ~children.pending()
+
+    return (
+        parents,
+        actions,
+        greedy,
+        leaves,
+        engine.points,
+        optimistic_points(engine, steps),
+        state_hash(children),
+    )
+
+
+class BeamSearchPlanner:
+    def __init__(
+        self,
+        width: int = 64,
+        steps: int = 8000,
+        planet_max_temperature: int = PLANET_MAX_TEMPERATURE,
+        num_workers: int = 0,
+    ):
+        self.width = width
+        self.steps = steps
+        self.planet_max_temperature = planet_max_temperature
+        self.num_workers = num_workers
+
+    def plan(self) -> BeamSearchResult:
+        engine = NumpyGameEngine(
+            1, max_steps=np.iinfo(np.int64).max, planet_max_temperature=self.planet_max_temperature
+        )
+        beam = GreedyRoiPlayer(engine)
+        # Index of the node following the greedy player from the start.
+        incumbent = 0
+
+        # Parent index and action of every beam node per step, to rebuild the plan.
+        history = []
+        best_points, best_leaf = -1, None
+        expanded = 0
+
+        executor = None
+        if self.num_workers > 0:
+            executor = ProcessPoolExecutor(self.num_workers, mp_context=mp.get_context("spawn"))
+
+        try:
+            while beam.engine.num_envs > 0:
+                parents, actions, greedy, leaves, points, scores, hashes = self._expand(beam, executor)
+                expanded += len(parents)
+
+                leaf_index = np.flatnonzero(leaves)
+                if leaf_index.size and points[leaf_index].max() > best_points:
+                    leaf = leaf_index[np.argmax(points[leaf_index])]
+                    best_points = points[leaf]
+                    best_leaf = (len(history), parents[leaf], actions[leaf])
+
+                incumbent_child = None
+                if incumbent is not None:
+                    incumbent_child = np.flatnonzero((parents == incumbent) & greedy)[0]
+                    if leaves[incumbent_child]:
+                        incumbent_child = None
+
+                # Transposition table of this step: keep one child per state.
+                live = np.flatnonzero(~leaves)
+                _, first = np.unique(hashes[live], return_index=True)
+                live = live[first]
+
+                if live.size > self.width:
+                    live = live[np.argpartition(-scores[live], self.width - 1)[: self.width]]
+                live = live[np.argsort(-scores[live], kind="stable")]
+
+                incumbent = None
+                if incumbent_child is not None:
+                    # A merged duplicate of the incumbent continues its path.
+                    kept = np.flatnonzero(hashes[live] == hashes[incumbent_child])
+                    if kept.size == 0:
+                        live[-1] = incumbent_child
+                        kept = np.array([live.size - 1])
+                    incumbent = kept[0]
+
+                history.append((parents[live], actions[live]))
+                beam = _children(beam, self.steps, parents[live], actions[live], greedy[live])
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        return BeamSearchResult(best_points / 1000, self._rebuild(history, best_leaf), expanded)
+
+    def _expand(self, beam: GreedyRoiPlayer, executor: Optional[ProcessPoolExecutor]):
+        if executor is None or beam.engine.num_envs < 2 * self.num_workers:
+            return _expand(beam, self.steps)
+
+        chunks = np.array_split(np.arange(beam.engine.num_envs), self.num_workers)
+        results = list(
+            executor.map(_expand, [beam.take(chunk) for chunk in chunks], [self.steps] * len(chunks))
+        )
+        parents = np.concatenate([chunk[result[0]] for chunk, result in zip(chunks, results)])
+        return (parents,) + tuple(np.concatenate([result[i] for result in results]) for i in range(1, 7))
+
+    @staticmethod
+    def _rebuild(history: list, leaf: Optional[tuple]) -> np.ndarray:
+        if leaf is None:
+            return np.zeros(0, dtype=np.int64)
+
+        step, parent, action = leaf
+        actions = [action]
+        for parents, beam_actions in reversed(history[:step]):
+            actions.append(beam_actions[parent])
+            parent = parents[parent]
+        return np.array(actions[::-1], dtype=np.int64)
@@ -0,0 +1,264 @@
+"""Vectorized port of the payback heuristic in ``ConsolePlayer/Program.cs``.
+
+Every step each player ranks all upgrades by payback, the metal value of the
+cost divided by the metal value of the daily production gained:
+
+- mines: ``UpgradeCost`` over ``UpgradeIncreasePerDay``,
+- plasma technology: the gain of the upgraded plasma modifier on the current
+  mine production,
+- astrophysics: two levels (the first one colonizes a new planet) plus
+  rebuilding the mines of the first planet on the new planet, over the
+  production of the first planet.
+
+The player buys the upgrade with the shortest payback if it is affordable and
+otherwise proceeds to the next day. Buying astrophysics queues the two
+astrophysics levels and the mine upgrades of the new planet, which are
+played in the following steps before the next decision, so every upgrade
+costs a step like in ``Program.cs``.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+from ogame_env.envs.numpy_game import MAX_PLANETS, NUM_ACTIONS, OBSERVATION_SIZE, NumpyGameEngine
+from ogame_env.tables import (
+    ASTROPHYSICS,
+    ECONOMY_SPEED,
+    MAX_LEVEL,
+    PLANET_MAX_TEMPERATURE,
+    PLASMA_TECHNOLOGY,
+    RESOURCE_WEIGHTS,
+)
+
+# Candidate order of Program.cs: the mines planet by planet, plasma technology,
+# astrophysics. Ties go to the first candidate like ``MinBy``.
+PLASMA_CANDIDATE = 3 * MAX_PLANETS
+ASTROPHYSICS_CANDIDATE = PLASMA_CANDIDATE + 1
+
+
+class GreedyRoiPlayer:
+    """Greedy payback policy for all players of ``engine``."""
+
+    def __init__(self, engine: NumpyGameEngine):
+        self.engine = engine
+        num_envs = engine.num_envs
+
+        # Astrophysics levels and mine levels of the new planet still to buy.
+        self.pending_astrophysics = np.zeros(num_envs, dtype=np.int64)
+        self.pending_mines = np.zeros((num_envs, 3), dtype=np.int64)
+        self.colonized_planet = np.zeros(num_envs, dtype=np.int64)
+
+    def reset(self, mask: Optional[np.ndarray] = None):
+        index = slice(None) if mask is None else mask
+        self.pending_astrophysics[index] = 0
+        self.pending_mines[index] = 0
+        self.colonized_planet[index] = 0
+
+    def take(self, index: np.ndarray) -> "GreedyRoiPlayer":
+        """New player for copies of the players at the integer ``index``."""
+
+        player = GreedyRoiPlayer(self.engine.take(index))
+        player.pending_astrophysics = self.pending_astrophysics[index]
+        player.pending_mines = self.pending_mines[index]
+        player.colonized_planet = self.colonized_planet[index]
+        return player
+
+    def pending(self) -> np.ndarray:
+        """Players that are still playing a bought astrophysics upgrade."""
+
+        return (self.pending_astrophysics > 0) | self.pending_mines.any(axis=1)
+
+    def astrophysics_cost(self) -> np.ndarray:
+        """Metal value of two astrophysics levels plus the mines of the first planet."""
+
+        engine = self.engine
+        tables = engine.tables
+        config = engine.config
+        level = np.minimum(engine.astrophysics, MAX_LEVEL - 2)
+        first_planet = engine.mine_levels[:, 0]
+
+        mines_cost = tables.cumulative_cost_value[config[:, None], np.arange(3), first_planet].sum(axis=1)
+        return (
+            tables.cost_value[config, ASTROPHYSICS, level]
+            + tables.cost_value[config, ASTROPHYSICS, level + 1]
+            + mines_cost
+        )
+
+    def upgrade_costs(self) -> np.ndarray:
+        """Metal value of every candidate's cost, shape ``(N, 3 * MAX_PLANETS + 2)``."""
+
+        engine = self.engine
+        costs = np.empty((engine.num_envs, ASTROPHYSICS_CANDIDATE + 1), dtype=np.int64)
+        costs[:, :PLASMA_CANDIDATE] = engine.mine_values[..., 0].reshape(engine.num_envs, -1)
+        costs[:, PLASMA_CANDIDATE] = engine.tables.cost_value[
+            engine.config, PLASMA_TECHNOLOGY, np.minimum(engine.plasma_technology, MAX_LEVEL - 1)
+        ]
+        costs[:, ASTROPHYSICS_CANDIDATE] = self.astrophysics_cost()
+        return costs
+
+    def production_gains(self) -> np.ndarray:
+        """Metal value of every candidate's daily production gain."""
+
+        engine = self.engine
+        tables = engine.tables
+        gains = np.empty((engine.num_envs, ASTROPHYSICS_CANDIDATE + 1), dtype=np.int64)
+        gains[:, :PLASMA_CANDIDATE] = engine.mine_values[..., 1].reshape(engine.num_envs, -1)
+
+        config = engine.config
+        plasma_level = np.minimum(engine.plasma_technology, MAX_LEVEL - 1)
+        current = engine.mine_production * tables.plasma_modifier[config, plasma_level] // 10000
+        upgraded = engine.mine_production * tables.plasma_modifier[config, plasma_level + 1] // 10000
+        gains[:, PLASMA_CANDIDATE] = engine.metal_value(upgraded - current)
+
+        first_planet = engine.mine_levels[:, 0]
+        gains[:, ASTROPHYSICS_CANDIDATE] = tables.production_value[config[:, None], np.arange(3), first_planet].sum(
+            axis=1
+        )
+        return gains
+
+    def payback(self, costs: Optional[np.ndarray] = None) -> np.ndarray:
+        """Days of production every candidate needs to pay for itself.
+
+        Upgrades of planets that do not exist yet, astrophysics once the new
+        planet would exceed ``MAX_PLANETS`` and upgrades past the level tables
+        have an infinite payback.
+        """
+
+        engine = self.engine
+        costs = self.upgrade_costs() if costs is None else costs
+        gains = self.production_gains()
+
+        available = np.ones(costs.shape, dtype=bool)
+        available[:, :PLASMA_CANDIDATE] = np.repeat(engine.planet_mask(), 3, axis=1)
+        available[:, :PLASMA_CANDIDATE] &= engine.mine_levels.reshape(engine.num_envs, -1) < MAX_LEVEL - 1
+        available[:, PLASMA_CANDIDATE] = engine.plasma_technology < MAX_LEVEL
+        available[:, ASTROPHYSICS_CANDIDATE] = (engine.astrophysics + 3) // 2 + 1 <= MAX_PLANETS
+        available &= gains > 0
+
+        payback = np.full(costs.shape, np.inf)
+        np.divide(costs, gains, out=payback, where=available)
+        return payback
+
+    def act(self, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """Engine actions of the next step for every player.
+
+        Players outside ``mask`` finish a pending astrophysics upgrade but do
+        not decide on new upgrades; they proceed to the next day instead.
+        """
+
+        engine = self.engine
+        actions = np.zeros(engine.num_envs, dtype=np.int64)
+
+        pending = self.pending()
+        deciding = ~pending if mask is None else ~pending & mask
+        if deciding.any():
+            costs = self.upgrade_costs()
+            best = self.payback(costs).argmin(axis=1)
+            best_cost = np.take_along_axis(costs, best[:, None], axis=1)[:, 0]
+            affordable = deciding & (best_cost <= engine.resources_value())
+
+            actions = np.where(affordable, best + 3, 0)
+            actions[affordable & (best == PLASMA_CANDIDATE)] = 2
+
+            colonizing = affordable & (best == ASTROPHYSICS_CANDIDATE)
+            self.pending_astrophysics[colonizing] = 2
+            self.pending_mines[colonizing] = engine.mine_levels[colonizing, 0]
+            self.colonized_planet[colonizing] = (engine.astrophysics[colonizing] + 3) // 2
+            pending |= colonizing
+
+        return np.where(pending, self._pending_actions(pending), actions)
+
+    def _pending_actions(self, pending: np.ndarray) -> np.ndarray:
+        astrophysics = pending & (self.pending_astrophysics > 0)
+        self.pending_astrophysics -= astrophysics
+
+        # The mines of the new planet in the order metal, crystal, deuterium.
+        mines = pending & ~astrophysics
+        kind = np.argmax(self.pending_mines > 0, axis=1)
+        self.pending_mines[np.flatnonzero(mines), kind[mines]] -= 1
+
+        return np.where(astrophysics, 1, 3 + 3 * self.colonized_planet + kind)
+
+
+def play(
+    num_envs: int = 1,
+    steps: int = 8000,
+    planet_max_temperature=PLANET_MAX_TEMPERATURE,
+    recorder=None,
+    resource_weights=RESOURCE_WEIGHTS,
+    economy_speed=ECONOMY_SPEED,
+) -> NumpyGameEngine:
+    """Play ``steps`` decisions with a fresh engine and return it.
+
+    As in ``Program.cs`` an astrophysics upgrade bought in the last steps is
+    completed, so points are comparable to the value to beat in the README.
+    The game parameters may differ per player, see ``NumpyGameEngine``.
+    The steps of every player are recorded with the ``TrajectoryRecorder``
+    ``recorder`` if given, the last one as ``done``.
+    """
+
+    engine = NumpyGameEngine(
+        num_envs,
+        max_steps=np.iinfo(np.int64).max,
+        planet_max_temperature=planet_max_temperature,
+        resource_weights=resource_weights,
+        economy_speed=economy_speed,
+    )
+    player = GreedyRoiPlayer(engine)
+    observations = np.zeros((num_envs, OBSERVATION_SIZE), dtype=np.float32)
+
+    while True:
+        # Finished players only proceed, which does not change their points.
+        playing = engine.step_counter < steps
+        active = playing | player.pending()
+        if not active.any():
+            break
+
+        actions = player.act(playing)
+        if recorder is None:
+            engine.step(actions)
+            continue
+
+        engine.write_observation(observations)
+        recorder.observe(observations)
+        rewards, _ = engine.step(actions)
+        done = (engine.step_counter >= steps) & ~player.pending()
+        recorder.record(actions, rewards, done, engine.points / 1000, mask=active)
+
+    return engine
+
+
+def collect_start_states(
+    store,
+    num_envs: int = 256,
+    steps: int = 8000,
+    every: int = 100,
+    epsilon: float = 0.1,
+    seed: int = 1,
+    planet_max_temperature: int = PLANET_MAX_TEMPERATURE,
+):
+    """Append snapshots of ``num_envs`` noisy greedy players to the ``SnapshotStore`` ``store``.
+
+    Deciding players take a random valid action instead of the greedy one
+    with probability ``epsilon``, so the players diverge. All players are
+    snapshotted every ``every`` steps.
+    """
+
+    rng = np.random.default_rng(seed)
+    engine = NumpyGameEngine(
+        num_envs, max_steps=np.iinfo(np.int64).max, planet_max_temperature=planet_max_temperature
+    )
+    player = GreedyRoiPlayer(engine)
+    action_mask = np.zeros((num_envs, NUM_ACTIONS), dtype=bool)
+
+    for step in range(1, steps + 1):
+        exploring = (rng.random(num_envs) < epsilon) & ~player.pending()
+        actions = player.act(~exploring)
+
+        engine.write_action_mask(action_mask)
+        random_actions = np.where(action_mask, rng.random(action_mask.shape), -1.0).argmax(axis=1)
+        engine.step(np.where(exploring, random_actions, actions))
+
+        if step % every == 0:
+            store.append(engine.snapshot())
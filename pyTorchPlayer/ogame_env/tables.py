@@ -0,0 +1,215 @@
+"""Level-indexed cost and production tables for all upgradables.
+
+The C# entities recompute ``Math.Pow`` on every upgrade. The formulas only
+depend on the level and the game parameters (the planet temperature for the
+deuterium synthesizer, the economy speed for all productions and the resource
+weights for metal values), so every quantity is evaluated once per level here
+and stored as ``int64`` arrays. Engines, planners and observation builders
+then answer cost and production queries with array lookups.
+
+Tables are cached in memory per set of game parameters and on disk as
+``.npz`` files in ``$OGAME_ENV_CACHE`` (default ``~/.cache/ogame_env``).
+"""
+
+import functools
+import math
+import os
+import tempfile
+from dataclasses import dataclass, fields
+from typing import Sequence
+
+import numpy as np
+
+MAX_LEVEL = 64
+PLANET_MAX_TEMPERATURE = -115
+RESOURCE_WEIGHTS = np.array([1, 2, 3], dtype=np.int64)
+ECONOMY_SPEED = 1
+
+# Upgradable ids used to index the tables.
+METAL_MINE = 0
+CRYSTAL_MINE = 1
+DEUTERIUM_SYNTHESIZER = 2
+ASTROPHYSICS = 3
+PLASMA_TECHNOLOGY = 4
+
+# Costs are clamped so that a metal value (m + 2c + 3d) never overflows int64.
+# Levels reaching the clamp are unaffordable for any realistic episode.
+COST_LIMIT = 2**59
+
+# Bump when the formulas change to invalidate cached files.
+_TABLES_VERSION = 1
+
+
+@dataclass(frozen=True)
+class LevelTables:
+    """Tables for one set of game parameters.
+
+    Upgrade costs are indexed by ``[upgradable, level]`` with the ids above,
+    mine productions by ``[mine, level]`` with ``mine`` in ``0..2``.
+    ``stack_tables`` stacks the tables of several sets along a leading axis.
+
+    cost: ``(5, MAX_LEVEL, 3)``
+        Resources needed to upgrade from ``level`` to ``level + 1``.
+    cost_value, cost_points: ``(5, MAX_LEVEL)``
+        Metal value of the cost and its resource sum (points in thousandths).
+    cumulative_cost: ``(5, MAX_LEVEL + 1, 3)``
+        Prefix sums of ``cost``, i.e. the resources needed to reach ``level``
+        from level 0. ``cumulative_cost_value`` and ``cumulative_cost_points``
+        are the matching ``(5, MAX_LEVEL + 1)`` sums.
+    production: ``(3, MAX_LEVEL + 1)``
+        Daily production of a mine in its own resource times the economy
+        speed; level 0 is the base production.
+    production_value: ``(3, MAX_LEVEL + 1)``
+        Metal value of ``production``.
+    production_increase, production_increase_value: ``(3, MAX_LEVEL)``
+        Production gained by upgrading from ``level``
+        (``Mine.UpgradeIncreasePerDay``).
+    plasma_modifier: ``(MAX_LEVEL + 1, 3)``
+        Plasma bonus per level in units of 1/10000, so the bonus of a
+        production is ``production * plasma_modifier[level] // 10000``.
+    """
+
+    cost: np.ndarray
+    cost_value: np.ndarray
+    cost_points: np.ndarray
+    cumulative_cost: np.ndarray
+    cumulative_cost_value: np.ndarray
+    cumulative_cost_points: np.ndarray
+    production: np.ndarray
+    production_value: np.ndarray
+    production_increase: np.ndarray
+    production_increase_value: np.ndarray
+    plasma_modifier: np.ndarray
+
+
+def _clamp(value: float) -> int:
+    return min(int(value), COST_LIMIT)
+
+
+def build_tables(
+    planet_max_temperature: int = PLANET_MAX_TEMPERATURE,
+    resource_weights: Sequence[int] = tuple(RESOURCE_WEIGHTS),
+    economy_speed: int = ECONOMY_SPEED,
+) -> LevelTables:
+    """Evaluate the C# cost and production formulas once per level.
+
+    ``math.pow`` calls the same libm ``pow`` as ``Math.Pow`` so the rounded
+    results match the reference bit for bit. The daily production of the C#
+    entities is multiplied by ``economy_speed`` and metal values use
+    ``resource_weights``.
+    """
+
+    average_temperature = planet_max_temperature - 20
+    deut_factor = 0.68 - 0.002 * average_temperature
+
+    cost = np.zeros((5, MAX_LEVEL, 3), dtype=np.int64)
+    production = np.zeros((3, MAX_LEVEL + 1), dtype=np.int64)
+
+    for level in range(MAX_LEVEL):
+        cost[METAL_MINE, level] = (
+            _clamp(math.floor(60 * math.pow(1.5, level))),
+            _clamp(math.floor(15 * math.pow(1.5, level))),
+            0,
+        )
+        cost[CRYSTAL_MINE, level] = (
+            _clamp(math.ceil(48 * math.pow(1.6, level))),
+            _clamp(math.ceil(24 * math.pow(1.6, level))),
+            0,
+        )
+        cost[DEUTERIUM_SYNTHESIZER, level] = (
+            _clamp(round(225 * math.pow(1.5, level))),
+            _clamp(round(75 * math.pow(1.5, level))),
+            0,
+        )
+        astro_common = _clamp(math.floor(4000 * math.pow(1.75, level)))
+        cost[ASTROPHYSICS, level] = (
+            astro_common,
+            _clamp(math.floor(8000 * math.pow(1.75, level))),
+            astro_common,
+        )
+        plasma_factor = int(math.pow(2, level))
+        cost[PLASMA_TECHNOLOGY, level] = (
+            _clamp(2000 * plasma_factor),
+            _clamp(4000 * plasma_factor),
+            _clamp(1000 * plasma_factor),
+        )
+
+    production[METAL_MINE, 0] = 30 * 24
+    production[CRYSTAL_MINE, 0] = 15 * 24
+    for level in range(1, MAX_LEVEL + 1):
+        production[METAL_MINE, level] = round(30 * level * math.pow(1.1, level)) * 24
+        production[CRYSTAL_MINE, level] = math.floor(20 * level * math.pow(1.1, level)) * 24
+        production[DEUTERIUM_SYNTHESIZER, level] = math.floor(20 * level * math.pow(1.1, level) * deut_factor) * 24
+
+    production *= economy_speed
+    weights = np.asarray(resource_weights, dtype=np.int64)
+
+    cumulative_cost = np.zeros((5, MAX_LEVEL + 1, 3), dtype=np.int64)
+    # Saturate instead of overflowing once the clamped costs add up.
+    np.cumsum(np.minimum(cost, COST_LIMIT // MAX_LEVEL), axis=1, out=cumulative_cost[:, 1:])
+    production_increase = production[:, 1:] - production[:, :-1]
+
+    return LevelTables(
+        cost=cost,
+        cost_value=cost @ weights,
+        cost_points=cost.sum(axis=-1),
+        cumulative_cost=cumulative_cost,
+        cumulative_cost_value=cumulative_cost @ weights,
+        cumulative_cost_points=cumulative_cost.sum(axis=-1),
+        production=production,
+        production_value=production * weights[:, None],
+        production_increase=production_increase,
+        production_increase_value=production_increase * weights[:, None],
+        plasma_modifier=np.arange(MAX_LEVEL + 1, dtype=np.int64)[:, None] * np.array([100, 66, 33], dtype=np.int64),
+    )
+
+
+def _cache_path(planet_max_temperature: int, resource_weights: tuple, economy_speed: int) -> str:
+    cache_dir = os.environ.get("OGAME_ENV_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "ogame_env"))
+    name = f"tables_v{_TABLES_VERSION}_levels{MAX_LEVEL}_temperature{planet_max_temperature}"
+    if resource_weights != tuple(RESOURCE_WEIGHTS) or economy_speed != ECONOMY_SPEED:
+        name += f"_weights{'-'.join(map(str, resource_weights))}_speed{economy_speed}"
+    return os.path.join(cache_dir, f"{name}.npz")
+
+
+@functools.lru_cache(maxsize=None)
+def get_tables(
+    planet_max_temperature: int = PLANET_MAX_TEMPERATURE,
+    resource_weights: tuple = tuple(RESOURCE_WEIGHTS),
+    economy_speed: int = ECONOMY_SPEED,
+) -> LevelTables:
+    """Return the tables for a set of game parameters, building them at most once.
+
+    The arrays are read-only since they are shared by every caller.
+    """
+
+    resource_weights = tuple(int(weight) for weight in resource_weights)
+    path = _cache_path(planet_max_temperature, resource_weights, economy_speed)
+    try:
+        with np.load(path) as data:
+            tables = LevelTables(**{field.name: data[field.name] for field in fields(LevelTables)})
+    except (OSError, KeyError, ValueError):
+        tables = build_tables(planet_max_temperature, resource_weights, economy_speed)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), suffix=".npz", delete=False) as file:
+                np.savez(file, **{field.name: getattr(tables, field.name) for field in fields(LevelTables)})
+            os.replace(file.name, path)
+        except OSError:
+            pass
+
+    for field in fields(LevelTables):
+        getattr(tables, field.name).flags.writeable = False
+
+    return tables
+
+
+def stack_tables(tables: Sequence[LevelTables]) -> LevelTables:
+    """Tables with every array of ``tables`` stacked along a new leading axis."""
+
+    stacked = LevelTables(
+        **{field.name: np.stack([getattr(table, field.name) for table in tables]) for field in fields(LevelTables)}
+    )
+    for field in fields(LevelTables):
+        getattr(stacked, field.name).flags.writeable = False
+    return stacked
@@ -0,0 +1,219 @@
+"""Streaming trajectory recording into memory-mapped shards.
+
+``TrajectoryRecorder`` keeps one row per step of each selected env:
+observation, action, reward, done and points. The rollout loop only copies
+the rows of the selected envs into a preallocated chunk; full chunks are
+handed to a background thread that writes them into ``.npy`` shards of
+``shard_size`` rows opened with ``np.memmap``. ``manifest.json`` lists the
+shards and their number of rows and is replaced atomically whenever a shard
+is completed and on ``close``.
+
+``TrajectoryReader`` maps the shards lazily, one at a time, and can
+reassemble episodes.
+
+With gymnasium's ``NEXT_STEP`` autoreset the step after a ``done`` row is
+the reset of the env, which ignores the action. Callers pass a ``mask``
+without these envs to ``record``, like ``ppo.py``, so every episode starts
+with its first observation.
+"""
+
+import json
+import os
+import queue
+import threading
+from typing import Iterator, Optional, Sequence
+
+import numpy as np
+
+
+def trajectory_dtype(observation_size: int) -> np.dtype:
+    return np.dtype(
+        [
+            ("env", np.int32),
+            ("step", np.int64),
+            ("observation", np.float32, (observation_size,)),
+            ("action", np.int64),
+            ("reward", np.float32),
+            ("done", np.bool_),
+            ("points", np.float64),
+        ]
+    )
+
+
+class TrajectoryRecorder:
+    def __init__(
+        self,
+        directory: str,
+        env_indices: Sequence[int],
+        observation_size: int,
+        shard_size: int = 1 << 16,
+        chunk_size: int = 1 << 12,
+        max_pending_chunks: int = 8,
+    ):
+        """Record the envs at ``env_indices`` into shards in ``directory``.
+
+        At most ``max_pending_chunks`` chunks of ``chunk_size`` rows wait for
+        the writer; recording blocks beyond that.
+        """
+
+        self.directory = directory
+        self.env_indices = np.asarray(env_indices, dtype=np.int64)
+        self.dtype = trajectory_dtype(observation_size)
+        self.shard_size = shard_size
+        self.chunk_size = max(chunk_size, len(self.env_indices))
+        os.makedirs(directory, exist_ok=True)
+
+        # Chunks cycle between the recorder (free) and the writer (filled).
+        self._free = queue.Queue()
+        for _ in range(max_pending_chunks + 1):
+            self._free.put(np.zeros(self.chunk_size, dtype=self.dtype))
+        self._filled = queue.Queue()
+        self._chunk = self._free.get()
+        self._rows = 0
+
+        self._observations = np.zeros((len(self.env_indices), observation_size), dtype=np.float32)
+        self._step = 0
+
+        self._shards = []
+        self._shard = None
+        self._shard_rows = 0
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="trajectory-writer", daemon=True)
+        self._thread.start()
+
+    def observe(self, observations: np.ndarray):
+        """Keep the observations the next actions are taken on."""
+
+        np.take(observations, self.env_indices, axis=0, out=self._observations)
+
+    def record(
+        self,
+        actions: np.ndarray,
+        rewards: np.ndarray,
+        dones: np.ndarray,
+        points: Optional[np.ndarray] = None,
+        mask: Optional[np.ndarray] = None,
+    ):
+        """Record a step of all envs given its results.
+
+        ``points`` defaults to NaN. Selected envs outside the boolean
+        ``mask`` are not recorded for this step.
+        """
+
+        select = slice(None) if mask is None else mask[self.env_indices]
+        envs = self.env_indices[select]
+        count = len(envs)
+        if self._rows + count > self.chunk_size:
+            self._submit()
+
+        rows = self._chunk[self._rows : self._rows + count]
+        rows["env"] = envs
+        rows["step"] = self._step
+        rows["observation"] = self._observations[select]
+        rows["action"] = actions[envs]
+        rows["reward"] = rewards[envs]
+        rows["done"] = dones[envs]
+        rows["points"] = np.nan if points is None else points[envs]
+        self._rows += count
+        self._step += 1
+
+    def close(self):
+        """Write the buffered rows and the manifest and stop the writer."""
+
+        if self._rows:
+            self._submit()
+        self._filled.put(None)
+        self._thread.join()
+        self._check()
+
+    def _submit(self):
+        self._check()
+        self._filled.put((self._chunk, self._rows))
+        self._chunk = self._free.get()
+        self._rows = 0
+
+    def _check(self):
+        if self._error is not None:
+            raise RuntimeError("writing trajectories failed") from self._error
+
+    def _run(self):
+        while (item := self._filled.get()) is not None:
+            chunk, rows = item
+            try:
+                if self._error is None:
+                    self._write(chunk[:rows])
+            except BaseException as error:
+                self._error = error
+            finally:
+                self._free.put(chunk)
+
+        try:
+            if self._error is None and self._shard is not None:
+                self._finish_shard()
+        except BaseException as error:
+            self._error = error
+
+    def _write(self, rows: np.ndarray):
+        while len(rows):
+            if self._shard is None:
+                name = f"shard_{len(self._shards):05d}.npy"
+                path = os.path.join(self.directory, name)
+                self._shard = np.lib.format.open_memmap(path, mode="w+", dtype=self.dtype, shape=(self.shard_size,))
+                self._shards.append({"file": name, "rows": 0})
+                self._shard_rows = 0
+
+            count = min(len(rows), self.shard_size - self._shard_rows)
+            self._shard[self._shard_rows : self._shard_rows + count] = rows[:count]
+            self._shard_rows += count
+            rows = rows[count:]
+            if self._shard_rows == self.shard_size:
+                self._finish_shard()
+
+    def _finish_shard(self):
+        self._shard.flush()
+        self._shards[-1]["rows"] = self._shard_rows
+        self._shard = None
+
+        manifest = {"dtype": self.dtype.descr, "shards": self._shards}
+        path = os.path.join(self.directory, "manifest.json")
+        with open(path + ".tmp", "w") as file:
+            json.dump(manifest, file)
+        os.replace(path + ".tmp", path)
+
+
+class TrajectoryReader:
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, "manifest.json")) as file:
+            manifest = json.load(file)
+        self.dtype = np.dtype([tuple(field) for field in manifest["dtype"]])
+        self.shards = manifest["shards"]
+
+    def __len__(self) -> int:
+        return sum(shard["rows"] for shard in self.shards)
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        """Memory-mapped rows of every shard, mapping one shard at a time."""
+
+        for shard in self.shards:
+            rows = np.load(os.path.join(self.directory, shard["file"]), mmap_mode="r")
+            yield rows[: shard["rows"]]
+
+    def episodes(self) -> Iterator[np.ndarray]:
+        """Rows of every finished episode, ordered by step.
+
+        Only the unfinished episodes of the current shard are kept in memory.
+        """
+
+        pending = {}
+        for rows in self:
+            for env in np.unique(rows["env"]):
+                env_rows = rows[rows["env"] == env]
+                ends = np.flatnonzero(env_rows["done"]) + 1
+                start = 0
+                for end in ends:
+                    parts = pending.pop(env, []) + [np.array(env_rows[start:end])]
+                    yield np.concatenate(parts)
+                    start = end
+                if start < len(env_rows):
+                    pending.setdefault(env, []).append(np.array(env_rows[start:]))
@@ -0,0 +1,71 @@
+import glob
+import multiprocessing as mp
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import tyro
+
+from ogame_env.parity import record, replay
+
+
+@dataclass
+class Args:
+    directory: str = "traces"
+    """the directory of the trace files"""
+    record: int = 0
+    """if positive, record this many trace files with the pythonnet env before replaying"""
+    num_traces: int = 32
+    """the number of traces per recorded file"""
+    steps: Optional[int] = None
+    """the maximum number of steps per recorded trace, by default until the episodes terminate"""
+    seed: int = 1
+    """seed of the actions of the first recorded file, incremented per file"""
+    action_mode: str = "step"
+    """the action mode of the recorded traces"""
+    engine: str = "numpy"
+    """the engine to replay the traces on, `numpy` or a `module:class` path"""
+    num_workers: int = 4
+    """the number of processes recording or replaying files"""
+
+
+if __name__ == "__main__":
+    args = tyro.cli(Args)
+    os.makedirs(args.directory, exist_ok=True)
+
+    context = mp.get_context("spawn")
+    if args.record > 0:
+        start_time = time.time()
+        paths = [os.path.join(args.directory, f"trace_{args.seed + i:05d}.npz") for i in range(args.record)]
+        with ProcessPoolExecutor(args.num_workers, mp_context=context) as executor:
+            futures = [
+                executor.submit(record, path, args.num_traces, args.steps, args.seed + i, args.action_mode)
+                for i, path in enumerate(paths)
+            ]
+            for future in futures:
+                future.result()
+        print(f"recorded {args.record * args.num_traces} traces in {time.time() - start_time:.1f}s")
+
+    paths = sorted(glob.glob(os.path.join(args.directory, "*.npz")))
+    start_time = time.time()
+    with ProcessPoolExecutor(args.num_workers, mp_context=context) as executor:
+        results = list(executor.map(replay, paths, [args.engine] * len(paths)))
+    duration = time.time() - start_time
+
+    diverged = 0
+    for path, divergences in zip(paths, results):
+        for divergence in divergences:
+            diverged += 1
+            expected, actual = np.atleast_1d(divergence.expected), np.atleast_1d(divergence.actual)
+            changed = np.flatnonzero(expected != actual)
+            print(
+                f"{os.path.basename(path)} trace {divergence.trace}: {divergence.field} differs after step "
+                f"{divergence.step} at {changed.tolist()}: expected {expected[changed]}, got {actual[changed]}"
+            )
+
+    print(f"{len(paths)} files replayed on {args.engine} in {duration:.1f}s, {diverged} traces diverged")
+    sys.exit(1 if diverged else 0)
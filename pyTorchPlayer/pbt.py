@@ -0,0 +1,40 @@
+from dataclasses import dataclass, field
+
+import tyro
+
+import ppo
+from training.pbt import PopulationBasedTraining
+
+
+@dataclass
+class Args:
+    train: ppo.Args = field(default_factory=lambda: ppo.Args(track=False))
+    """the arguments of every trial, perturbed per trial"""
+    directory: str = "pbt"
+    """the directory of the checkpoints, TensorBoard runs and `pbt.json` summary"""
+    population: int = 8
+    """the number of trials"""
+    cores_per_trial: int = 4
+    """the torch threads of every trial, trials run at once as far as the cores allow"""
+    interval: int = 400
+    """the number of iterations between exploit/explore steps, longer than an episode"""
+    quantile: float = 0.25
+    """the fraction of trials replaced by copies of the best ones after every round"""
+    seed: int = 1
+    """seed of the perturbations"""
+
+
+if __name__ == "__main__":
+    args = tyro.cli(Args)
+
+    pbt = PopulationBasedTraining(
+        args.train,
+        directory=args.directory,
+        population=args.population,
+        cores_per_trial=args.cores_per_trial,
+        interval=args.interval,
+        quantile=args.quantile,
+        seed=args.seed,
+    )
+    for trial in pbt.run():
+        print(f"trial{trial.index}: {trial.points} points, checkpoint {trial.checkpoint}")
@@ -0,0 +1,38 @@
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import tyro
+
+from ogame_env.players.beam_search import BeamSearchPlanner
+from ogame_env.tables import PLANET_MAX_TEMPERATURE
+
+
+@dataclass
+class Args:
+    width: int = 64
+    """the number of nodes kept per step"""
+    steps: int = 8000
+    """the number of steps (days and upgrades) of the plan"""
+    num_workers: int = 0
+    """the number of processes expanding the beam (0 expands in this process)"""
+    planet_max_temperature: int = PLANET_MAX_TEMPERATURE
+    """the max temperature of every planet"""
+    save_path: str = ""
+    """if set, the actions of the best plan are saved to this `.npy` file"""
+
+
+if __name__ == "__main__":
+    args = tyro.cli(Args)
+
+    planner = BeamSearchPlanner(args.width, args.steps, args.planet_max_temperature, args.num_workers)
+    start_time = time.time()
+    result = planner.plan()
+    duration = time.time() - start_time
+
+    print(f"points: {result.points:,.3f}")
+    print(f"upgrades: {int(np.count_nonzero(result.actions))}, steps: {len(result.actions)}")
+    print(f"expanded: {result.expanded}, duration: {duration:.1f}s")
+
+    if args.save_path:
+        np.save(args.save_path, result.actions)
@@ -3,9 +3,9 @@ import os
 import random
 import time
 from dataclasses import dataclass
-import uuid
 
 import gymnasium as gym
+from gymnasium.vector.utils import batch_space
 import ogame_env
 import numpy as np
 import torch
@@ -15,6 +15,13 @@ import tyro
 from torch.distributions.categorical import Categorical
 from torch.utils.tensorboard import SummaryWriter
 
+from ogame_env.trajectories import TrajectoryRecorder
+from training.checkpoint import CheckpointManager, load_checkpoint
+from training.metrics import MetricsLogger
+from training.profiling import PhaseProfiler
+from training.rollout import RolloutBuffer
+from training.update import PPOUpdate
+
 @dataclass
 class Args:
     exp_name: str = os.path.basename(__file__)[: -len(".py")]
@@ -31,14 +38,50 @@ class Args:
     """the wandb's project name"""
     wandb_entity: str = "gpol-none"
     """the entity (team) of wandb's project"""
+    run_name: str = ""
+    """the name of the run, by default built from the hyperparameters"""
+    run_dir: str = "runs"
+    """the directory of the TensorBoard logs, one subdirectory per run"""
     capture_video: bool = False
     """whether to capture videos of the agent performances (check out `videos` folder)"""
     checkpoint_frequency: int = 1000
-    """how often a checkpoint should be saved"""
-    load_checkpoint_path: str = "" # "/home/elsahr/saved_models/" + '0.04_0.98_0.94_0.3_3000_4ba05211-8211-42f8-ba26-75806c7af321'#None 
-    """name of the checkpoint to load"""
+    """how often (in iterations) a checkpoint should be saved"""
+    checkpoint_dir: str = "checkpoints"
+    """the directory of the checkpoints"""
+    checkpoint_keep: int = 3
+    """the number of most recent checkpoints to keep, in addition to the one with the most points"""
+    load_checkpoint_path: str = ""
+    """path of a checkpoint to resume training from"""
+    profile_sync: bool = False
+    """if toggled, the device is synchronized around every timed phase so device time is attributed to its phase"""
+    profile_trace_start: int = 0
+    """if positive, the first iteration recorded with `torch.profiler` (trace in `{run_dir}/{run_name}/trace`)"""
+    profile_trace_iterations: int = 1
+    """the number of iterations recorded with `torch.profiler`"""
+    record_dir: str = ""
+    """if set, the trajectories of the first `record_envs` envs are recorded into `{record_dir}/{run_name}`"""
+    record_envs: int = 16
+    """the number of envs whose trajectories are recorded"""
     env_id: str = "ogame_env/GridWorld-v0"
-    """the id of the environment"""
+    """the id of the environment (`ogame_env/NumpyGame-v0` for the batched NumPy engine)"""
+    game_assembly: str = ""
+    """path of the published C# `Game` assembly of the pythonnet envs (default `OGAME_GAME_ASSEMBLY` or the one of this checkout)"""
+    action_mode: str = "step"
+    """`fast_forward` waits until an unaffordable upgrade is affordable within one step"""
+    action_masking: bool = True
+    """if toggled, actions masked by the env's `action_mask` info are never sampled"""
+    shared_buffer: bool = False
+    """if toggled, pythonnet players are stepped with one .NET call per step into one shared (pinned) float32 buffer"""
+    num_workers: int = 0
+    """if positive, pythonnet envs are split across this many worker processes exchanging data through shared memory"""
+    obs_transform: str = "identity"
+    """the transform applied to observations in the env: `identity`, `log` (log1p) or `scale` (times `obs_scale`)"""
+    obs_scale: float = 1.0
+    """the factor of the `scale` observation transform"""
+    normalize_obs: bool = False
+    """if toggled, observations are standardized with running statistics over all envs"""
+    start_states: str = ""
+    """if set, `ogame_env/NumpyGame-v0` episodes start from snapshots drawn from this store (see `start_states.py`)"""
 
     # Algorithm specific arguments
     total_timesteps: int = 300_000_000
@@ -74,6 +117,11 @@ class Args:
     target_kl: float = None
     """the target KL divergence threshold"""
 
+    torch_threads: int = 24
+    """the number of threads of torch's CPU ops"""
+    max_iterations: int = 0
+    """if positive, stop after this iteration (the LR schedule still follows `total_timesteps`)"""
+
     # to be filled in runtime
     batch_size: int = 0
     """the batch size (computed in runtime)"""
@@ -83,21 +131,79 @@ class Args:
     """the number of iterations (computed in runtime)"""
 
 
-def make_env(env_id, idx, capture_video, run_name):
+def make_env(env_id, idx, capture_video, run_name, action_mode="step"):
     def thunk():
         if capture_video and idx == 0:
-            env = gym.make(env_id, render_mode="rgb_array")
+            env = gym.make(env_id, render_mode="rgb_array", action_mode=action_mode)
             env = gym.wrappers.RecordVideo(env, f"videos/{run_name}")
         else:
-            env = gym.make(env_id)
+            env = gym.make(env_id, action_mode=action_mode)
         env = gym.wrappers.RecordEpisodeStatistics(env)
         return env
 
     return thunk
 
 
+def make_observation_encoder(args):
+    from ogame_env.envs.numpy_game import OBSERVATION_SIZE
+    from ogame_env.envs.observation import ObservationEncoder
+
+    encoder = ObservationEncoder(OBSERVATION_SIZE, args.obs_transform, args.obs_scale, args.normalize_obs)
+    return None if encoder.identity else encoder
+
+
+def make_envs(args, run_name, observation_encoder=None, host_obs=None):
+    if gym.spec(args.env_id).vector_entry_point is not None:
+        kwargs = {}
+        if args.start_states:
+            from ogame_env.envs.snapshots import SnapshotStore
+
+            kwargs["start_states"] = SnapshotStore(args.start_states, mode="r")
+        return gym.make_vec(
+            args.env_id,
+            num_envs=args.num_envs,
+            vectorization_mode="vector_entry_point",
+            action_mode=args.action_mode,
+            observation_encoder=observation_encoder,
+            **kwargs,
+        )
+
+    if args.start_states:
+        raise ValueError("start states are only supported by ogame_env/NumpyGame-v0")
+
+    if args.num_workers > 0:
+        from ogame_env.envs.sharded import ShardedVectorEnv
+
+        return ShardedVectorEnv(
+            args.num_envs, args.num_workers, action_mode=args.action_mode, observation_encoder=observation_encoder
+        )
+
+    if args.shared_buffer:
+        from ogame_env.envs.player_batch import PlayerBatchVectorEnv
+
+        if host_obs is None:
+            host_obs = torch.zeros((args.num_envs, 125), dtype=torch.float32)
+        return PlayerBatchVectorEnv(
+            args.num_envs,
+            action_mode=args.action_mode,
+            observations=host_obs.numpy(),
+            observation_encoder=observation_encoder,
+        )
+
+    envs = gym.vector.SyncVectorEnv(
+        [make_env(args.env_id, i, args.capture_video, run_name, args.action_mode) for i in range(args.num_envs)],
+    )
+    if observation_encoder is not None:
+        # The float64 observations of GridWorldEnv are converted first.
+        envs = gym.wrappers.vector.TransformObservation(
+            envs,
+            lambda observations: observation_encoder.encode(observations.astype(np.float32)),
+            batch_space(observation_encoder.observation_space(), args.num_envs),
+        )
+    return envs
+
+
 def layer_init(layer, std=np.sqrt(2), bias_const=0.0):
-    layer.weight.data = layer.weight.data.to("cuda:0")
     torch.nn.init.orthogonal_(layer.weight, std)
     torch.nn.init.constant_(layer.bias, bias_const)
     return layer
@@ -124,21 +230,30 @@ class Agent(nn.Module):
     def get_value(self, x):
         return self.critic(x)
 
-    def get_action_and_value(self, x, action=None):
+    def get_action_and_value(self, x, action=None, action_mask=None):
         logits = self.actor(x)
-        probs = Categorical(logits=logits)
+        if action_mask is not None:
+            logits = logits.masked_fill(~action_mask, torch.finfo(logits.dtype).min)
+        # Validating the arguments would sync the device on every call.
+        probs = Categorical(logits=logits, validate_args=False)
         if action is None:
             action = probs.sample()
         return action, probs.log_prob(action), probs.entropy(), self.critic(x)
 
 
-if __name__ == "__main__":
-    args = tyro.cli(Args)
-    torch.set_num_threads(24)
+def get_action_mask(args, infos):
+    return infos["action_mask"] if args.action_masking else None
+
+
+def train(args: Args) -> dict:
+    """Train with ``args`` and return a summary of the run."""
+
+    torch.set_num_threads(args.torch_threads)
     args.batch_size = int(args.num_envs * args.num_steps)
     args.minibatch_size = int(args.batch_size // args.num_minibatches)
     args.num_iterations = args.total_timesteps // args.batch_size
-    run_name = f"{args.ent_coef}_{args.gamma}_{args.gae_lambda}_{args.clip_coef}"
+    run_name = args.run_name or f"{args.ent_coef}_{args.gamma}_{args.gae_lambda}_{args.clip_coef}"
+    log_dir = os.path.join(args.run_dir, run_name)
     if args.track:
         import wandb
 
@@ -151,11 +266,12 @@ if __name__ == "__main__":
             monitor_gym=True,
             save_code=True,
         )
-    writer = SummaryWriter(f"runs/{run_name}")
+    writer = SummaryWriter(log_dir)
     writer.add_text(
         "hyperparameters",
         "|param|value|\n|-|-|\n%s" % ("\n".join([f"|{key}|{value}|" for key, value in vars(args).items()])),
     )
+    metrics = MetricsLogger(writer)
 
     # TRY NOT TO MODIFY: seeding
     random.seed(args.seed)
@@ -163,195 +279,179 @@ if __name__ == "__main__":
     torch.manual_seed(args.seed)
     torch.backends.cudnn.deterministic = args.torch_deterministic
 
-    device = torch.device("cuda:0")
+    device = torch.device("cuda:0" if torch.cuda.is_available() and args.cuda else "cpu")
 
     # env setup
-    envs = gym.vector.SyncVectorEnv(
-        [make_env(args.env_id, i, args.capture_video, run_name) for i in range(args.num_envs)],
-    )
+    # --shared-buffer players write their observations straight into the
+    # rollout's pinned staging buffer
+    host_obs = None
+    if args.shared_buffer:
+        host_obs = torch.zeros((args.num_envs, 125), dtype=torch.float32, pin_memory=device.type == "cuda")
+    observation_encoder = make_observation_encoder(args)
+    if args.game_assembly:
+        from ogame_env.envs.dotnet import configure
+
+        configure(args.game_assembly)
+    envs = make_envs(args, run_name, observation_encoder, host_obs)
     assert isinstance(envs.single_action_space, gym.spaces.Discrete), "only discrete action space is supported"
 
     agent = Agent(envs).to(device)
     optimizer = optim.Adam(agent.parameters(), lr=args.learning_rate, eps=1e-5)
+    ppo_update = PPOUpdate(agent, optimizer, args, device)
 
     # ALGO Logic: Storage setup
-    obs = torch.zeros((args.num_steps, args.num_envs) + envs.single_observation_space.shape).to(device)
-    actions = torch.zeros((args.num_steps, args.num_envs) + envs.single_action_space.shape).to(device)
-    logprobs = torch.zeros((args.num_steps, args.num_envs)).to(device)
-    rewards = torch.zeros((args.num_steps, args.num_envs)).to(device)
-    dones = torch.zeros((args.num_steps, args.num_envs)).to(device)
-    values = torch.zeros((args.num_steps, args.num_envs)).to(device)
+    rollout = RolloutBuffer(
+        args.num_steps,
+        args.num_envs,
+        envs.single_observation_space.shape,
+        envs.single_action_space.n,
+        device,
+        host_obs=host_obs,
+    )
 
     # Load checkpoint
+    checkpoints = CheckpointManager(args.checkpoint_dir, run_name, args.checkpoint_keep)
+    start_iteration, global_step = 1, 0
     if args.load_checkpoint_path:
         print("Load checkpoint")
-        checkpoint = torch.load(args.load_checkpoint_path)
-        agent.load_state_dict(checkpoint['model_state_dict'])
-        optimizer.load_state_dict(checkpoint['optimizer_state_dict'])
+        checkpoint = load_checkpoint(args.load_checkpoint_path, agent, optimizer)
+        start_iteration, global_step = checkpoint["iteration"] + 1, checkpoint["global_step"]
+        if observation_encoder is not None and "observation_encoder" in checkpoint:
+            observation_encoder.load_state_dict(checkpoint["observation_encoder"])
+        if not args.anneal_lr:
+            optimizer.param_groups[0]["lr"] = args.learning_rate
+
+    profiler = PhaseProfiler(
+        log_dir, device, args.profile_sync, args.profile_trace_start, args.profile_trace_iterations
+    )
+
+    recorder, engine = None, None
+    if args.record_dir:
+        recorder = TrajectoryRecorder(
+            os.path.join(args.record_dir, run_name),
+            np.arange(min(args.record_envs, args.num_envs)),
+            envs.single_observation_space.shape[0],
+        )
+        # Points are only known step by step for the NumPy engine.
+        engine = getattr(envs.unwrapped, "engine", None)
+        # With NEXT_STEP autoreset the step after a done resets the env and ignores the action.
+        next_step_autoreset = (
+            envs.metadata.get("autoreset_mode", gym.vector.AutoresetMode.NEXT_STEP)
+            == gym.vector.AutoresetMode.NEXT_STEP
+        )
+        autoreset = np.zeros(args.num_envs, dtype=bool)
+
+    def save_checkpoint():
+        extra = {}
+        if observation_encoder is not None:
+            extra["observation_encoder"] = observation_encoder.state_dict()
+        checkpoints.save(iteration, global_step, agent, optimizer, metrics.latest_means.get("points"), **extra)
 
     # TRY NOT TO MODIFY: start the game
-    global_step = 0
+    iteration, start_step = start_iteration - 1, global_step
     start_time = time.time()
-    next_obs, _ = envs.reset(seed=args.seed)
-    next_obs = torch.Tensor(next_obs).to(device)
-    next_done = torch.zeros(args.num_envs).to(device)
+    next_obs, infos = envs.reset(seed=args.seed)
+    rollout.stage(next_obs, action_mask=get_action_mask(args, infos))
 
-    for iteration in range(1, args.num_iterations + 1):
-        # Save a checkpoint
-        if iteration % args.checkpoint_frequency == 0:
-            print("Save checkpoint")
-            torch.save({
-                'model_state_dict': agent.state_dict(),
-                'optimizer_state_dict': optimizer.state_dict()
-                }, f"/home/elsahr/saved_models/{run_name}_{str(iteration)}_{str(uuid.uuid4())}")
+    last_iteration = args.num_iterations
+    if args.max_iterations > 0:
+        last_iteration = min(last_iteration, args.max_iterations)
 
+    for iteration in range(start_iteration, last_iteration + 1):
         # Annealing the rate if instructed to do so.
         if args.anneal_lr:
             frac = 1.0 - (iteration - 1.0) / args.num_iterations
             lrnow = frac * args.learning_rate
             optimizer.param_groups[0]["lr"] = lrnow
 
+        profiler.start_iteration(iteration)
         for step in range(0, args.num_steps):
             global_step += args.num_envs
-            obs[step] = next_obs
-            dones[step] = next_done
 
             # ALGO LOGIC: action logic
-            with torch.no_grad():
-                action, logprob, _, value = agent.get_action_and_value(next_obs)
-                values[step] = value.flatten()
-            actions[step] = action
-            logprobs[step] = logprob
+            with profiler.phase("policy"), torch.no_grad():
+                action, logprob, _, value = agent.get_action_and_value(
+                    rollout.next_obs, action_mask=rollout.next_action_mask
+                )
+                rollout.add(step, action, logprob, value)
 
             # TRY NOT TO MODIFY: execute the game and log data.
-            next_obs, reward, terminations, truncations, infos = envs.step(action.cpu().numpy())
-            next_done = np.logical_or(terminations, truncations)
-            rewards[step] = torch.tensor(reward).to(device).view(-1)
-            next_obs, next_done = torch.Tensor(next_obs).to(device), torch.Tensor(next_done).to(device)
+            with profiler.phase("copy_to_host"):
+                host_action = rollout.actions_to_host(action)
+            if recorder is not None:
+                with profiler.phase("record"):
+                    recorder.observe(next_obs)
+            with profiler.phase("env_step"):
+                next_obs, reward, terminations, truncations, infos = envs.step(host_action)
+            with profiler.phase("copy_to_device"):
+                rollout.stage(next_obs, reward, terminations, truncations, get_action_mask(args, infos), step)
+            if recorder is not None:
+                with profiler.phase("record"):
+                    points = None if engine is None else engine.points / 1000
+                    dones = terminations | truncations
+                    recorder.record(host_action, reward, dones, points, mask=~autoreset)
+                    if next_step_autoreset:
+                        autoreset = dones
 
             if "final_info" in infos:
-                info = infos["final_info"]
-                writer.add_scalar("charts/episodic_length_max", torch.from_numpy(info["episodic_length"]).max(), global_step)
-                writer.add_scalar("charts/episodic_length_mean", torch.from_numpy(info["episodic_length"]).mean(), global_step)
-                writer.add_scalar("charts/episodic_length_min", torch.from_numpy(info["episodic_length"]).min(), global_step)
-
-                writer.add_scalar("points/max", torch.from_numpy(info["points"]).max(), global_step)
-                writer.add_scalar("points/mean", torch.from_numpy(info["points"]).mean(), global_step)
-                writer.add_scalar("points/min", torch.from_numpy(info["points"]).min(), global_step)
-
-                writer.add_scalar("astrophysics/max",  torch.from_numpy(info["astrophysics"]).max(), global_step)
-                writer.add_scalar("astrophysics/mean", torch.from_numpy(info["astrophysics"]).mean(), global_step)
-                writer.add_scalar("astrophysics/min",  torch.from_numpy(info["astrophysics"]).min(), global_step)
-                
-                writer.add_scalar("plasma_technology/max",  torch.from_numpy(info["plasma_technology"]).max(), global_step)
-                writer.add_scalar("plasma_technology/mean", torch.from_numpy(info["plasma_technology"]).mean(), global_step)
-                writer.add_scalar("plasma_technology/min",  torch.from_numpy(info["plasma_technology"]).min(), global_step)
-                
-                writer.add_scalar("metal/max", torch.from_numpy(info["metal_max"]).mean(), global_step)
-                writer.add_scalar("metal/mean", torch.from_numpy(info["metal_mean"]).mean(), global_step)
-                writer.add_scalar("metal/min", torch.from_numpy(info["metal_min"]).mean(), global_step)
-                
-                writer.add_scalar("crystal/max",  torch.from_numpy(info["crystal_max"]).mean(), global_step)
-                writer.add_scalar("crystal/mean", torch.from_numpy(info["crystal_mean"]).mean(), global_step)
-                writer.add_scalar("crystal/min",  torch.from_numpy(info["crystal_min"]).mean(), global_step)
-                
-                writer.add_scalar("deut/max",  torch.from_numpy(info["deut_max"]).mean(), global_step)
-                writer.add_scalar("deut/mean", torch.from_numpy(info["deut_mean"]).mean(), global_step)
-                writer.add_scalar("deut/min",  torch.from_numpy(info["deut_min"]).mean(), global_step)
+                with profiler.phase("metrics"):
+                    metrics.add_episodes(infos["final_info"])
 
         # bootstrap value if not done
-        with torch.no_grad():
-            next_value = agent.get_value(next_obs).reshape(1, -1)
-            advantages = torch.zeros_like(rewards).to(device)
-            lastgaelam = 0
-            for t in reversed(range(args.num_steps)):
-                if t == args.num_steps - 1:
-                    nextnonterminal = 1.0 - next_done
-                    nextvalues = next_value
-                else:
-                    nextnonterminal = 1.0 - dones[t + 1]
-                    nextvalues = values[t + 1]
-                delta = rewards[t] + args.gamma * nextvalues * nextnonterminal - values[t]
-                advantages[t] = lastgaelam = delta + args.gamma * args.gae_lambda * nextnonterminal * lastgaelam
-            returns = advantages + values
-
-        # flatten the batch
-        b_obs = obs.reshape((-1,) + envs.single_observation_space.shape)
-        b_logprobs = logprobs.reshape(-1)
-        b_actions = actions.reshape((-1,) + envs.single_action_space.shape)
-        b_advantages = advantages.reshape(-1)
-        b_returns = returns.reshape(-1)
-        b_values = values.reshape(-1)
-
-        # Optimizing the policy and value network
-        b_inds = np.arange(args.batch_size)
-        clipfracs = []
-        for epoch in range(args.update_epochs):
-            np.random.shuffle(b_inds)
-            for start in range(0, args.batch_size, args.minibatch_size):
-                end = start + args.minibatch_size
-                mb_inds = b_inds[start:end]
-
-                _, newlogprob, entropy, newvalue = agent.get_action_and_value(b_obs[mb_inds], b_actions.long()[mb_inds])
-                logratio = newlogprob - b_logprobs[mb_inds]
-                ratio = logratio.exp()
-
-                with torch.no_grad():
-                    # calculate approx_kl http://joschu.net/blog/kl-approx.html
-                    old_approx_kl = (-logratio).mean()
-                    approx_kl = ((ratio - 1) - logratio).mean()
-                    clipfracs += [((ratio - 1.0).abs() > args.clip_coef).float().mean().item()]
-
-                mb_advantages = b_advantages[mb_inds]
-                if args.norm_adv:
-                    mb_advantages = (mb_advantages - mb_advantages.mean()) / (mb_advantages.std() + 1e-8)
-
-                # Policy loss
-                pg_loss1 = -mb_advantages * ratio
-                pg_loss2 = -mb_advantages * torch.clamp(ratio, 1 - args.clip_coef, 1 + args.clip_coef)
-                pg_loss = torch.max(pg_loss1, pg_loss2).mean()
-
-                # Value loss
-                newvalue = newvalue.view(-1)
-                if args.clip_vloss:
-                    v_loss_unclipped = (newvalue - b_returns[mb_inds]) ** 2
-                    v_clipped = b_values[mb_inds] + torch.clamp(
-                        newvalue - b_values[mb_inds],
-                        -args.clip_coef,
-                        args.clip_coef,
-                    )
-                    v_loss_clipped = (v_clipped - b_returns[mb_inds]) ** 2
-                    v_loss_max = torch.max(v_loss_unclipped, v_loss_clipped)
-                    v_loss = 0.5 * v_loss_max.mean()
-                else:
-                    v_loss = 0.5 * ((newvalue - b_returns[mb_inds]) ** 2).mean()
-
-                entropy_loss = entropy.mean()
-                loss = pg_loss - args.ent_coef * entropy_loss + v_loss * args.vf_coef
-
-                optimizer.zero_grad()
-                loss.backward()
-                nn.utils.clip_grad_norm_(agent.parameters(), args.max_grad_norm)
-                optimizer.step()
-
-            if args.target_kl is not None and approx_kl > args.target_kl:
-                break
-
-        y_pred, y_true = b_values.cpu().numpy(), b_returns.cpu().numpy()
-        var_y = np.var(y_true)
-        explained_var = np.nan if var_y == 0 else 1 - np.var(y_true - y_pred) / var_y
+        with profiler.phase("gae"), torch.no_grad():
+            next_value = agent.get_value(rollout.next_obs)
+            rollout.compute_returns(next_value, args.gamma, args.gae_lambda)
+
+        with profiler.phase("update"):
+            stats = ppo_update.update(rollout.batch())
 
         # TRY NOT TO MODIFY: record rewards for plotting purposes
-        writer.add_scalar("charts/learning_rate", optimizer.param_groups[0]["lr"], global_step)
-        writer.add_scalar("losses/value_loss", v_loss.item(), global_step)
-        writer.add_scalar("losses/policy_loss", pg_loss.item(), global_step)
-        writer.add_scalar("losses/entropy", entropy_loss.item(), global_step)
-        writer.add_scalar("losses/old_approx_kl", old_approx_kl.item(), global_step)
-        writer.add_scalar("losses/approx_kl", approx_kl.item(), global_step)
-        writer.add_scalar("losses/clipfrac", np.mean(clipfracs), global_step)
-        writer.add_scalar("losses/explained_variance", explained_var, global_step)
-        print("SPS:", int(global_step / (time.time() - start_time)))
-        writer.add_scalar("charts/SPS", int(global_step / (time.time() - start_time)), global_step)
+        with profiler.phase("logging"):
+            sps = int((global_step - start_step) / (time.time() - start_time))
+            print("SPS:", sps)
+            scalars = {f"losses/{name}": value for name, value in stats.items()}
+            scalars["charts/learning_rate"] = optimizer.param_groups[0]["lr"]
+            scalars["charts/SPS"] = sps
+            metrics.log(scalars, global_step)
+            metrics.flush(global_step)
+
+        # Save a checkpoint
+        if iteration % args.checkpoint_frequency == 0:
+            with profiler.phase("checkpoint"):
+                save_checkpoint()
+
+        metrics.log(profiler.end_iteration(iteration, args.batch_size), global_step)
+
+    # Save the final state unless it was just saved
+    if iteration >= start_iteration and iteration % args.checkpoint_frequency != 0:
+        save_checkpoint()
 
     envs.close()
-    writer.close()
\ No newline at end of file
+    if recorder is not None:
+        recorder.close()
+    profiler.close(
+        os.path.join(log_dir, "profile.json"),
+        env_id=args.env_id,
+        num_envs=args.num_envs,
+        num_steps=args.num_steps,
+        action_mode=args.action_mode,
+        shared_buffer=args.shared_buffer,
+        num_workers=args.num_workers,
+    )
+    checkpoints.close()
+    metrics.close()
+    writer.close()
+
+    return {
+        "run_name": run_name,
+        "iteration": iteration,
+        "global_step": global_step,
+        "points": metrics.latest_means.get("points"),
+        "checkpoint": checkpoints.latest(),
+        "profile": profiler.summary(),
+    }
+
+
+if __name__ == "__main__":
+    args = tyro.cli(Args)
+    train(args)
\ No newline at end of file
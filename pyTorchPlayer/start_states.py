@@ -0,0 +1,37 @@
+import time
+from dataclasses import dataclass
+
+import tyro
+
+from ogame_env.envs.snapshots import SnapshotStore
+from ogame_env.players.greedy import collect_start_states
+
+
+@dataclass
+class Args:
+    path: str = "start_states.npy"
+    """the snapshot store to create"""
+    capacity: int = 100_000
+    """the number of records of the store, older records are overwritten"""
+    num_envs: int = 256
+    """the number of players played at once"""
+    steps: int = 8000
+    """the number of steps per player"""
+    every: int = 100
+    """the number of steps between snapshots"""
+    epsilon: float = 0.1
+    """the chance of a random valid action instead of the greedy one"""
+    seed: int = 1
+    """seed of the random actions"""
+
+
+if __name__ == "__main__":
+    args = tyro.cli(Args)
+
+    start_time = time.time()
+    store = SnapshotStore(args.path, capacity=args.capacity)
+    collect_start_states(store, args.num_envs, args.steps, args.every, args.epsilon, args.seed)
+    store.flush()
+
+    days = store.records["day"]
+    print(f"{len(store)} snapshots, days {days.min()}..{days.max()}, {time.time() - start_time:.1f}s")
@@ -0,0 +1,12 @@
+import pytest
+
+
+@pytest.fixture
+def grid_world():
+    """The ``ogame_env.envs.grid_world`` module, skipping if the Game assembly cannot be loaded."""
+
+    try:
+        from ogame_env.envs import grid_world
+    except Exception as error:
+        pytest.skip(f"the Game assembly cannot be loaded: {error}")
+    return grid_world
@@ -0,0 +1,41 @@
+import torch
+
+from training.checkpoint import CheckpointManager, load_checkpoint
+
+
+def _to_meta(value):
+    if isinstance(value, torch.Tensor):
+        return value.to("meta")
+    if isinstance(value, dict):
+        return {key: _to_meta(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(_to_meta(item) for item in value)
+    return value
+
+
+def test_load_checkpoint_restores_rng_state_for_non_cpu_training(tmp_path, monkeypatch):
+    agent = torch.nn.Linear(4, 2)
+    optimizer = torch.optim.Adam(agent.parameters())
+    agent(torch.ones(1, 4)).sum().backward()
+    optimizer.step()
+
+    checkpoints = CheckpointManager(str(tmp_path), "run")
+    checkpoints.save(3, 1024, agent, optimizer)
+    checkpoints.close()
+    expected = torch.rand(8)
+
+    # Stand-in for a CUDA map location: tensors mapped anywhere but the CPU
+    # land on the meta device, which torch.set_rng_state rejects like CUDA.
+    load = torch.load
+
+    def load_to_device(path, map_location=None, **kwargs):
+        checkpoint = load(path, map_location="cpu", **kwargs)
+        return checkpoint if map_location == "cpu" else _to_meta(checkpoint)
+
+    monkeypatch.setattr(torch, "load", load_to_device)
+    torch.manual_seed(12345)
+    checkpoint = load_checkpoint(checkpoints.latest(), agent, optimizer)
+
+    assert (checkpoint["iteration"], checkpoint["global_step"]) == (3, 1024)
+    assert torch.equal(torch.rand(8), expected)
+    assert all(state["exp_avg"].device.type == "cpu" for state in optimizer.state.values())
@@ -0,0 +1,37 @@
+import dataclasses
+
+import gymnasium as gym
+import numpy as np
+import pytest
+
+import ppo
+
+ENV_IDS = sorted(env_id for env_id in gym.registry if env_id.startswith("ogame_env/"))
+PYTHONNET_ENV_IDS = {"ogame_env/GridWorld-v0", "ogame_env/PlayerBatch-v0"}
+
+
+def _require_game_assembly():
+    from ogame_env.envs.dotnet import load_game
+
+    try:
+        load_game()
+    except Exception as error:
+        pytest.skip(f"the Game assembly cannot be loaded: {error}")
+
+
+@pytest.mark.parametrize("env_id", ENV_IDS)
+def test_make_envs_builds_every_registered_id(env_id):
+    if env_id in PYTHONNET_ENV_IDS:
+        _require_game_assembly()
+
+    args = dataclasses.replace(ppo.Args(), env_id=env_id, num_envs=2)
+    envs = ppo.make_envs(args, "test")
+    try:
+        observations, infos = envs.reset(seed=1)
+        assert observations.shape == (2,) + envs.single_observation_space.shape
+        action_mask = ppo.get_action_mask(args, infos)
+        actions = np.array([np.flatnonzero(mask)[0] for mask in action_mask])
+        observations, rewards, terminations, truncations, infos = envs.step(actions)
+        assert observations.shape[0] == rewards.shape[0] == terminations.shape[0] == 2
+    finally:
+        envs.close()
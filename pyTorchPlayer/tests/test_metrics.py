@@ -0,0 +1,51 @@
+import numpy as np
+
+from ogame_env.envs.numpy_game import FINAL_INFO_KEYS
+from training.metrics import LEGACY_TAGS, MetricsLogger
+
+
+class _Writer:
+    def __init__(self):
+        self.scalars = {}
+
+    def add_scalar(self, tag, value, step):
+        self.scalars[tag] = (value, step)
+
+
+def _final_info(values: dict, done: np.ndarray) -> dict:
+    info = {}
+    for key in FINAL_INFO_KEYS:
+        info[key] = values.get(key, np.zeros(done.size))
+        info[f"_{key}"] = done
+    return info
+
+
+def test_flush_writes_the_reductions_and_the_legacy_tags():
+    writer = _Writer()
+    metrics = MetricsLogger(writer, percentiles=(50,))
+    done = np.array([True, False, True, True])
+    metrics.add_episodes(
+        _final_info(
+            {
+                "episodic_length": np.array([10.0, 99.0, 20.0, 60.0]),
+                "points": np.array([1.0, 99.0, 2.0, 6.0]),
+                "metal_max": np.array([4.0, 99.0, 8.0, 0.0]),
+            },
+            done,
+        )
+    )
+    metrics.flush(7)
+    metrics.close()
+
+    scalars = {tag: value for tag, (value, step) in writer.scalars.items()}
+    assert {step for value, step in writer.scalars.values()} == {7}
+    assert scalars["charts/episodes"] == 3
+    assert scalars["points/min"] == 1.0
+    assert scalars["points/mean"] == 3.0
+    assert scalars["points/max"] == 6.0
+    assert scalars["points/p50"] == 2.0
+    assert scalars["charts/episodic_length_min"] == 10.0
+    assert scalars["charts/episodic_length_mean"] == 30.0
+    assert scalars["charts/episodic_length_max"] == 60.0
+    assert scalars["metal/max"] == 4.0
+    assert set(LEGACY_TAGS) <= set(scalars)
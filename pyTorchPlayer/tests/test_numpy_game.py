@@ -0,0 +1,182 @@
+import decimal
+
+import numpy as np
+import pytest
+
+from ogame_env.envs.numpy_game import MAX_LEVEL, NUM_ACTIONS, OBSERVATION_SIZE, NumpyGameEngine
+from ogame_env.tables import PLASMA_TECHNOLOGY, RESOURCE_WEIGHTS
+
+
+def _points(player) -> int:
+    from System.Globalization import CultureInfo
+
+    return int(decimal.Decimal(player.Points.ToString(CultureInfo.InvariantCulture)) * 1000)
+
+
+def _random_actions(rng: np.random.Generator, steps: int, num_envs: int) -> np.ndarray:
+    # Mostly proceed, so that some of the random upgrades are affordable.
+    upgrades = rng.integers(NUM_ACTIONS, size=(steps, num_envs))
+    return np.where(rng.random((steps, num_envs)) < 0.7, 0, upgrades)
+
+
+@pytest.mark.parametrize("action_mode", ["step", "fast_forward"])
+def test_engine_matches_grid_world(grid_world, action_mode):
+    num_envs, steps = 4, 400
+    actions = _random_actions(np.random.default_rng(1), steps, num_envs)
+    envs = [grid_world.GridWorldEnv(action_mode=action_mode) for _ in range(num_envs)]
+    for env in envs:
+        env.reset()
+    engine = NumpyGameEngine(num_envs, action_mode=action_mode)
+    observations = np.zeros((num_envs, OBSERVATION_SIZE), dtype=np.float32)
+    action_masks = np.zeros((num_envs, NUM_ACTIONS), dtype=bool)
+
+    for t in range(steps):
+        rewards, terminated = engine.step(actions[t])
+        engine.write_observation(observations)
+        engine.write_action_mask(action_masks)
+        for i, env in enumerate(envs):
+            state, reward, done, _, infos = env.step(actions[t, i])
+            assert infos.get("skipped_days", 0) == engine.skipped_days[i], (t, i)
+            np.testing.assert_array_equal(infos["action_mask"], action_masks[i], err_msg=f"step {t} env {i}")
+            assert np.float32(reward) == rewards[i], (t, i)
+            assert done == terminated[i], (t, i)
+            np.testing.assert_array_equal(state.astype(np.float32), observations[i], err_msg=f"step {t} env {i}")
+            assert _points(env.player) == engine.points[i], (t, i)
+
+
+def test_upgrade_past_the_level_tables_fails_without_cost():
+    engine = NumpyGameEngine(2)
+    engine.resources[:] = 10**15
+    engine.mine_levels[:, 0, 0] = [MAX_LEVEL - 2, MAX_LEVEL - 1]
+    production = engine.mine_production.copy()
+
+    rewards, _ = engine.step(np.array([3, 3]))
+
+    assert rewards[1] == np.float32(-0.1)
+    np.testing.assert_array_equal(engine.mine_levels[:, 0, 0], [MAX_LEVEL - 1, MAX_LEVEL - 1])
+    assert engine.resources[1].tolist() == [10**15] * 3
+    assert engine.points[1] == 0
+    np.testing.assert_array_equal(engine.mine_production[1], production[1])
+    assert engine.points[0] > 0
+
+
+def _action_mask(engine: NumpyGameEngine) -> np.ndarray:
+    action_mask = np.zeros((engine.num_envs, NUM_ACTIONS), dtype=bool)
+    engine.write_action_mask(action_mask)
+    return action_mask
+
+
+def test_action_mask_only_allows_affordable_upgrades():
+    engine = NumpyGameEngine(1)
+    assert _action_mask(engine)[0].tolist() == [True] + [False] * (NUM_ACTIONS - 1)
+
+    for _ in range(5):
+        engine.step(np.array([0]))
+    action_mask = _action_mask(engine)[0]
+
+    assert action_mask[:6].tolist() == [True, False, False, True, True, True]
+    assert not action_mask[6:].any()
+
+
+def test_action_mask_allows_upgrades_of_existing_planets_in_fast_forward_mode():
+    engine = NumpyGameEngine(1, action_mode="fast_forward")
+    engine.astrophysics[:] = 1
+    action_mask = _action_mask(engine)[0]
+
+    assert action_mask[:9].all()
+    assert not action_mask[9:].any()
+
+
+def test_action_mask_limits_planets_and_levels():
+    engine = NumpyGameEngine(4, action_mode="fast_forward")
+    engine.astrophysics[:] = [36, 37, 38, 0]
+    engine.plasma_technology[3] = MAX_LEVEL
+    engine.mine_levels[3, 0] = [MAX_LEVEL - 2, MAX_LEVEL - 1, 0]
+    action_mask = _action_mask(engine)
+
+    assert action_mask[:, 1].tolist() == [True, True, False, True]
+    assert action_mask[:, 2].tolist() == [True, True, True, False]
+    assert action_mask[3, 3:6].tolist() == [True, False, True]
+
+
+def _days_until_affordable(engine: NumpyGameEngine, cost_value: int) -> int:
+    production_value = int(engine.todays_production()[0] @ RESOURCE_WEIGHTS)
+    return -(-(cost_value - int(engine.resources_value()[0])) // production_value)
+
+
+def test_fast_forward_waits_until_the_upgrade_is_affordable():
+    engine = NumpyGameEngine(1, action_mode="fast_forward")
+    days = _days_until_affordable(engine, engine.tables.cost_value[0, PLASMA_TECHNOLOGY, 0])
+
+    rewards, terminated = engine.step(np.array([2]))
+
+    assert days > 1
+    assert engine.skipped_days[0] == days
+    assert engine.day[0] == days
+    assert engine.step_counter[0] == days + 1
+    assert engine.plasma_technology[0] == 1
+    assert rewards[0] > 0 and not terminated[0]
+
+
+def test_fast_forward_charges_the_step_budget():
+    engine = NumpyGameEngine(1, max_steps=5, action_mode="fast_forward")
+
+    rewards, terminated = engine.step(np.array([2]))
+
+    # The wait is cut at the end of the episode and the step proceeds instead.
+    assert engine.skipped_days[0] == 5
+    assert engine.day[0] == 6
+    assert engine.step_counter[0] == 6
+    assert engine.plasma_technology[0] == 0
+    assert terminated[0] and rewards[0] == 0
+
+
+@pytest.mark.parametrize("action_mode", ["step", "fast_forward"])
+def test_per_env_parameters_match_separate_engines(action_mode):
+    parameters = [
+        dict(max_steps=300, planet_max_temperature=40, resource_weights=(1, 3, 4), economy_speed=1),
+        dict(max_steps=200, planet_max_temperature=-20, resource_weights=(1, 2, 3), economy_speed=2),
+        dict(max_steps=300, planet_max_temperature=40, resource_weights=(1, 3, 4), economy_speed=1),
+        dict(max_steps=250, planet_max_temperature=100, resource_weights=(1, 1, 1), economy_speed=5),
+    ]
+    num_envs, steps = len(parameters), 300
+    actions = _random_actions(np.random.default_rng(2), steps, num_envs)
+    engine = NumpyGameEngine(
+        num_envs,
+        action_mode=action_mode,
+        **{name: np.array([p[name] for p in parameters]) for name in parameters[0]},
+    )
+    separate = [NumpyGameEngine(1, action_mode=action_mode, **p) for p in parameters]
+    assert engine.config.tolist() == [1, 0, 1, 2]
+
+    observations = np.zeros((num_envs, OBSERVATION_SIZE), dtype=np.float32)
+    action_masks = np.zeros((num_envs, NUM_ACTIONS), dtype=bool)
+    expected_observations = np.zeros((1, OBSERVATION_SIZE), dtype=np.float32)
+    expected_masks = np.zeros((1, NUM_ACTIONS), dtype=bool)
+    for t in range(steps):
+        rewards, terminated = engine.step(actions[t])
+        engine.write_observation(observations)
+        engine.write_action_mask(action_masks)
+        for i, single in enumerate(separate):
+            expected_rewards, expected_terminated = single.step(actions[t, i : i + 1])
+            single.write_observation(expected_observations)
+            single.write_action_mask(expected_masks)
+            message = f"step {t} env {i}"
+            assert rewards[i] == expected_rewards[0], message
+            assert terminated[i] == expected_terminated[0], message
+            assert engine.points[i] == single.points[0], message
+            np.testing.assert_array_equal(engine.resources[i], single.resources[0], err_msg=message)
+            np.testing.assert_array_equal(observations[i], expected_observations[0], err_msg=message)
+            np.testing.assert_array_equal(action_masks[i], expected_masks[0], err_msg=message)
+        engine.reset(terminated)
+        for i in np.flatnonzero(terminated):
+            separate[i].reset()
+
+
+
+def test_economy_speed_scales_the_production():
+    engine = NumpyGameEngine(2, economy_speed=np.array([1, 2]))
+
+    production = engine.tables.production[engine.config]
+    np.testing.assert_array_equal(production[1], 2 * production[0])
+    np.testing.assert_array_equal(engine.todays_production()[1], 2 * engine.todays_production()[0])
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from ogame_env.envs.numpy_game import OBSERVATION_SIZE, NumpyGameVectorEnv
+from ogame_env.envs.observation import ObservationEncoder
+
+
+def _observations(seed: int, rows: int = 32, size: int = 5) -> np.ndarray:
+    generator = np.random.default_rng(seed)
+    return (generator.random((rows, size)) * 10.0 ** generator.integers(0, 12, size)).astype(np.float32)
+
+
+def test_rejects_unknown_transforms():
+    with pytest.raises(ValueError, match="transform"):
+        ObservationEncoder(5, "sqrt")
+
+
+@pytest.mark.parametrize(
+    "transform, scale, expected",
+    [
+        ("identity", 1.0, lambda raw: raw),
+        ("log", 1.0, np.log1p),
+        ("scale", 1e-3, lambda raw: raw * np.float32(1e-3)),
+        ("scale", np.arange(5), lambda raw: raw * np.arange(5, dtype=np.float32)),
+    ],
+)
+def test_encodes_in_place(transform, scale, expected):
+    raw = _observations(0)
+    observations = raw.copy()
+    encoder = ObservationEncoder(5, transform, scale)
+
+    encoded = encoder.encode(observations)
+
+    assert encoded is observations
+    assert encoded.dtype == np.float32
+    np.testing.assert_allclose(encoded, expected(raw), rtol=1e-6)
+    assert encoder.identity == (transform == "identity")
+
+
+def test_normalize_matches_the_statistics_of_all_batches():
+    batches = [_observations(seed) for seed in range(3)]
+    encoder = ObservationEncoder(5, "log", normalize=True, clip=np.inf)
+    for batch in batches:
+        encoded = encoder.encode(batch.copy())
+
+    history = np.log1p(np.concatenate(batches).astype(np.float64))
+    np.testing.assert_allclose(encoder.mean, history.mean(axis=0), rtol=1e-6)
+    np.testing.assert_allclose(encoder.var, history.var(axis=0), rtol=1e-5)
+    assert encoder.count == len(history)
+    expected = (np.log1p(batches[-1]) - history.mean(axis=0)) / np.sqrt(history.var(axis=0) + encoder.epsilon)
+    np.testing.assert_allclose(encoded, expected, rtol=1e-4, atol=1e-5)
+
+
+def test_normalize_clips_and_updates_only_the_masked_rows():
+    encoder = ObservationEncoder(5, normalize=True, clip=1.0)
+    batch = _observations(0)
+    mask = np.arange(len(batch)) % 2 == 0
+
+    encoded = encoder.encode(batch.copy(), mask)
+
+    np.testing.assert_allclose(encoder.mean, batch[mask].astype(np.float64).mean(axis=0), rtol=1e-6)
+    assert encoder.count == mask.sum()
+    assert np.abs(encoded).max() <= 1.0
+    assert encoder.observation_space().contains(encoded[0])
+
+
+def test_frozen_statistics_and_state_dict_round_trip():
+    encoder = ObservationEncoder(5, "log", normalize=True)
+    encoder.encode(_observations(0))
+    restored = ObservationEncoder(5, "log", normalize=True)
+    restored.load_state_dict(encoder.state_dict())
+    encoder.update_stats = restored.update_stats = False
+
+    batch = _observations(1)
+    np.testing.assert_array_equal(restored.encode(batch.copy()), encoder.encode(batch.copy()))
+    assert restored.count == encoder.count == 32
+
+
+def test_numpy_game_returns_encoded_observations():
+    raw = NumpyGameVectorEnv(4)
+    encoded = NumpyGameVectorEnv(4, observation_encoder=ObservationEncoder(OBSERVATION_SIZE, "log"))
+    raw_observations, _ = raw.reset(seed=0)
+    encoded_observations, _ = encoded.reset(seed=0)
+    np.testing.assert_allclose(encoded_observations, np.log1p(raw_observations), rtol=1e-6)
+
+    actions = np.array([3, 0, 5, 2])
+    raw_observations = raw.step(actions)[0]
+    encoded_observations = encoded.step(actions)[0]
+    np.testing.assert_allclose(encoded_observations, np.log1p(raw_observations), rtol=1e-6)
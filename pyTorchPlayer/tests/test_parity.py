@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from ogame_env.parity import record, replay
+
+
+@pytest.mark.parametrize("action_mode", ["step", "fast_forward"])
+def test_recorded_episodes_replay_on_numpy(grid_world, monkeypatch, tmp_path, action_mode):
+    monkeypatch.setattr(grid_world.GridWorldEnv, "maxSteps", 50)
+    path = str(tmp_path / "trace.npz")
+
+    record(path, num_traces=4, seed=3, action_mode=action_mode)
+
+    with np.load(path) as trace:
+        lengths = trace["lengths"]
+        assert int(trace["max_steps"]) == 50
+        assert trace["actions"].shape == (lengths.max(), 4)
+        assert trace["observations"].shape == (lengths.max() + 1, 4, 125)
+        assert trace["terminated"][lengths - 1, np.arange(4)].all()
+    assert (lengths <= 51).all()
+    if action_mode == "step":
+        assert (lengths == 51).all()
+    assert replay(path) == []
+
+
+def test_replay_reports_the_first_divergence(grid_world, monkeypatch, tmp_path):
+    monkeypatch.setattr(grid_world.GridWorldEnv, "maxSteps", 50)
+    path = str(tmp_path / "trace.npz")
+    record(path, num_traces=2, seed=4)
+
+    with np.load(path) as trace:
+        trace = dict(trace)
+    trace["rewards"][10, 1] += 1
+    np.savez_compressed(path, **trace)
+
+    [divergence] = replay(path)
+    assert (divergence.trace, divergence.step, divergence.field) == (1, 11, "reward")
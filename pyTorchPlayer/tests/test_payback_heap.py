@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from ogame_env.envs.numpy_game import MAX_PLANETS, NumpyGameEngine
+from ogame_env.players.greedy import GreedyRoiPlayer, play
+from ogame_env.players.payback_heap import PaybackHeapPlayer, evaluate
+from ogame_env.tables import MAX_LEVEL
+
+
+@pytest.mark.parametrize(
+    "parameters",
+    [
+        {},
+        dict(planet_max_temperature=60, resource_weights=(1, 1, 1), economy_speed=3),
+    ],
+)
+def test_heap_player_matches_greedy_play(parameters):
+    engine = play(1, 3000, **parameters)
+    player = PaybackHeapPlayer(**parameters).play(3000)
+
+    assert player.points == engine.points[0]
+    assert player.day == engine.day[0]
+    assert player.step_counter == engine.step_counter[0]
+    assert player.astrophysics == engine.astrophysics[0]
+    assert player.plasma_technology == engine.plasma_technology[0]
+    assert player.mine_levels == engine.mine_levels[0].tolist()
+
+
+def test_evaluate_continues_snapshots_like_greedy_play():
+    engine = play(2, 1000)
+    records = engine.snapshot()
+
+    expected = [play(1, 2500).points[0]] * 2
+    np.testing.assert_array_equal(evaluate(records, 2500), expected)
+
+
+def test_capped_upgrades_are_not_candidates():
+    engine = NumpyGameEngine(1, max_steps=np.iinfo(np.int64).max)
+    engine.astrophysics[:] = 2 * (MAX_PLANETS - 1)
+    engine.mine_levels[:] = MAX_LEVEL - 1
+    engine.mine_levels[0, 3, 1] = 10
+    engine.plasma_technology[:] = MAX_LEVEL
+    engine.resources[:] = 10**15
+    engine.restore(engine.snapshot())
+    player = PaybackHeapPlayer.from_snapshot(engine.snapshot()[0])
+
+    greedy = GreedyRoiPlayer(engine)
+    payback = greedy.payback()
+    assert player.best()[0] == 3 * 3 + 1 == payback.argmin()
+    assert np.isinf(np.delete(payback, 3 * 3 + 1)).all()
+
+    # The mine is upgraded to the last level, then the rejected fallback is repeated.
+    player.play(engine.step_counter[0] + 100)
+    while engine.step_counter[0] < player.step_counter:
+        engine.step(greedy.act())
+    assert player.mine_levels == engine.mine_levels[0].tolist()
+    assert player.mine_levels[3][1] == MAX_LEVEL - 1
+    assert player.plasma_technology == engine.plasma_technology[0] == MAX_LEVEL
+    assert player.points == engine.points[0]
+    assert player.resources_value == engine.resources_value()[0]
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from ogame_env.envs.numpy_game import NUM_ACTIONS, NumpyGameVectorEnv
+
+
+@pytest.fixture
+def player_batch(grid_world):
+    from ogame_env.envs import player_batch
+
+    return player_batch
+
+
+def test_unknown_action_mode_is_rejected(player_batch):
+    with pytest.raises(ValueError, match="action mode"):
+        player_batch.PlayerBatchVectorEnv(2, action_mode="wait")
+
+
+@pytest.mark.parametrize("action_mode", ["step", "fast_forward"])
+def test_player_batch_matches_the_numpy_env(player_batch, action_mode):
+    num_envs, steps = 4, 300
+    rng = np.random.default_rng(2)
+    actions = np.where(rng.random((steps, num_envs)) < 0.7, 0, rng.integers(NUM_ACTIONS, size=(steps, num_envs)))
+    envs = player_batch.PlayerBatchVectorEnv(num_envs, action_mode=action_mode, max_steps=200)
+    expected_envs = NumpyGameVectorEnv(num_envs, max_steps=200, action_mode=action_mode)
+
+    observations, infos = envs.reset()
+    expected_observations, expected_infos = expected_envs.reset()
+    np.testing.assert_array_equal(observations, expected_observations)
+    np.testing.assert_array_equal(infos["action_mask"], expected_infos["action_mask"])
+
+    for t in range(steps):
+        observations, rewards, terminations, _, infos = envs.step(actions[t])
+        expected_observations, expected_rewards, expected_terminations, _, expected_infos = expected_envs.step(
+            actions[t]
+        )
+        np.testing.assert_array_equal(observations, expected_observations, err_msg=f"step {t}")
+        np.testing.assert_array_equal(rewards, expected_rewards.astype(np.float32), err_msg=f"step {t}")
+        np.testing.assert_array_equal(terminations, expected_terminations, err_msg=f"step {t}")
+        np.testing.assert_array_equal(infos["action_mask"], expected_infos["action_mask"], err_msg=f"step {t}")
+        if action_mode == "fast_forward":
+            np.testing.assert_array_equal(infos["skipped_days"], expected_infos["skipped_days"], err_msg=f"step {t}")
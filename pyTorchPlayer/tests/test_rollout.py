@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+import torch
+
+from training.rollout import RolloutBuffer
+
+
+def _loop_returns(rollout: RolloutBuffer, next_value: torch.Tensor, gamma: float, gae_lambda: float):
+    """The per-step GAE loop of CleanRL in float64."""
+
+    rewards, values, dones = rollout.rewards.double(), rollout.values.double(), rollout.dones.double()
+    advantages = torch.zeros_like(rewards)
+    lastgaelam = 0
+    for t in reversed(range(rollout.num_steps)):
+        if t == rollout.num_steps - 1:
+            nextnonterminal = 1.0 - rollout.next_done.double()
+            nextvalues = next_value.double()
+        else:
+            nextnonterminal = 1.0 - dones[t + 1]
+            nextvalues = values[t + 1]
+        delta = rewards[t] + gamma * nextvalues * nextnonterminal - values[t]
+        advantages[t] = lastgaelam = delta + gamma * gae_lambda * nextnonterminal * lastgaelam
+    return advantages
+
+
+@pytest.mark.parametrize(
+    "num_steps, gamma, gae_lambda, done_probability",
+    [
+        (128, 0.99, 0.95, 0.05),
+        (7000, 0.95, 0.94, 0.0),
+        (7000, 0.95, 0.94, 0.001),
+        (2000, 1.0, 0.5, 0.0),
+        (2000, 0.5, 0.5, 0.01),
+        (300, 1.0, 1.0, 0.01),
+        (50, 0.0, 0.95, 0.1),
+    ],
+)
+def test_compute_returns_matches_the_loop(num_steps, gamma, gae_lambda, done_probability):
+    num_envs = 8
+    generator = torch.Generator().manual_seed(num_steps)
+    rollout = RolloutBuffer(num_steps, num_envs, (1,), 2, torch.device("cpu"))
+    rollout.rewards.copy_(torch.rand(num_steps, num_envs, generator=generator))
+    rollout.values.copy_(torch.randn(num_steps, num_envs, generator=generator) * 10)
+    rollout.dones.copy_(torch.rand(num_steps, num_envs, generator=generator) < done_probability)
+    rollout.next_done.copy_(torch.rand(num_envs, generator=generator) < 0.5)
+    next_value = torch.randn(num_envs, generator=generator)
+
+    rollout.compute_returns(next_value, gamma, gae_lambda)
+    expected = _loop_returns(rollout, next_value, gamma, gae_lambda)
+
+    assert torch.isfinite(rollout.advantages).all()
+    torch.testing.assert_close(rollout.advantages.double(), expected, rtol=1e-5, atol=1e-4)
+    torch.testing.assert_close(rollout.returns, rollout.advantages + rollout.values)
+
+
+def test_stage_skips_the_copy_of_observations_written_in_place(monkeypatch):
+    host_obs = torch.zeros((4, 3))
+    rollout = RolloutBuffer(2, 4, (3,), 2, torch.device("cpu"), host_obs=host_obs)
+    copied = []
+    copyto = np.copyto
+    monkeypatch.setattr(np, "copyto", lambda dst, src, **kwargs: (copied.append(src), copyto(dst, src, **kwargs)))
+
+    observations = host_obs.numpy()
+    observations[:] = np.arange(12).reshape(4, 3)
+    rollout.stage(observations)
+    assert copied == []
+    torch.testing.assert_close(rollout.next_obs, host_obs)
+
+    other = np.ones((4, 3), dtype=np.float64)
+    rollout.stage(other)
+    assert len(copied) == 1
+    torch.testing.assert_close(rollout.next_obs, torch.ones((4, 3)))
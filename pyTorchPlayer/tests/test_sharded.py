@@ -0,0 +1,8 @@
+import pytest
+
+from ogame_env.envs.sharded import ShardedVectorEnv
+
+
+def test_unknown_action_mode_is_rejected_before_starting_workers():
+    with pytest.raises(ValueError, match="action mode"):
+        ShardedVectorEnv(4, 2, action_mode="wait")
@@ -0,0 +1,60 @@
+import numpy as np
+
+from ogame_env.envs.numpy_game import REWARD_DISTRIBUTION, NumpyGameEngine, NumpyGameVectorEnv
+from ogame_env.envs.snapshots import SnapshotStore
+from ogame_env.players.greedy import GreedyRoiPlayer
+
+
+def test_start_states_keep_their_step_counter():
+    engine = NumpyGameEngine(1, max_steps=20)
+    for _ in range(15):
+        engine.step(np.zeros(1, dtype=np.int64))
+    record = engine.snapshot()
+
+    envs = NumpyGameVectorEnv(2, max_steps=20, start_states=record)
+    envs.reset(seed=0)
+    np.testing.assert_array_equal(envs.engine.step_counter, [15, 15])
+    np.testing.assert_array_equal(envs.engine.day, record["day"].repeat(2))
+
+    for step in range(6):
+        _, _, terminations, truncations, infos = envs.step(np.zeros(2, dtype=np.int64))
+        assert (terminations | truncations).all() == (step == 5)
+    np.testing.assert_array_equal(infos["final_info"]["episodic_length"], [21, 21])
+
+
+def test_restored_player_does_not_claim_exploration_rewards_twice():
+    engine = NumpyGameEngine(1, max_steps=np.iinfo(np.int64).max)
+    player = GreedyRoiPlayer(engine)
+    while engine.points[0] < REWARD_DISTRIBUTION * 1000 or player.pending()[0]:
+        engine.step(player.act())
+    record = engine.snapshot()
+
+    actions, rewards = [], []
+    for _ in range(200):
+        actions.append(player.act())
+        rewards.append(engine.step(actions[-1])[0])
+
+    restored = NumpyGameEngine(1, max_steps=np.iinfo(np.int64).max)
+    restored.restore(record)
+    replayed = [restored.step(action)[0] for action in actions]
+
+    np.testing.assert_array_equal(replayed, rewards)
+    np.testing.assert_array_equal(restored.points, engine.points)
+
+
+def test_reopened_store_overwrites_its_oldest_records(tmp_path):
+    path = str(tmp_path / "start_states.npy")
+    engine = NumpyGameEngine(7)
+    engine.day[:] = np.arange(7)
+
+    store = SnapshotStore(path, capacity=5)
+    store.append(engine.snapshot(slice(0, 4)))
+    store.append(engine.snapshot(slice(4, 7)))
+    store.flush()
+
+    reopened = SnapshotStore(path)
+    assert len(reopened) == 5
+    engine.day[:2] = [7, 8]
+    reopened.append(engine.snapshot(slice(0, 2)))
+
+    assert sorted(SnapshotStore(path).records["day"].tolist()) == [4, 5, 6, 7, 8]
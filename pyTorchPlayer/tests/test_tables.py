@@ -0,0 +1,81 @@
+from dataclasses import fields
+
+import numpy as np
+import pytest
+
+from ogame_env import tables
+from ogame_env.tables import (
+    ASTROPHYSICS,
+    CRYSTAL_MINE,
+    DEUTERIUM_SYNTHESIZER,
+    METAL_MINE,
+    PLASMA_TECHNOLOGY,
+    build_tables,
+    get_tables,
+)
+
+# Expected values of the C# entity tests in Tests/.
+COSTS = [
+    (METAL_MINE, 9, (2306, 576, 0)),
+    (METAL_MINE, 49, (25504860008, 6376215002, 0)),
+    (CRYSTAL_MINE, 19, (362678, 181339, 0)),
+    (CRYSTAL_MINE, 33, (261336858, 130668429, 0)),
+    (DEUTERIUM_SYNTHESIZER, 41, (3731849658, 1243949886, 0)),
+    (ASTROPHYSICS, 3, (21437, 42875, 21437)),
+    (ASTROPHYSICS, 30, (78199045470, 156398090941, 78199045470)),
+    (PLASMA_TECHNOLOGY, 19, (1048576000, 2097152000, 524288000)),
+]
+PRODUCTIONS = [
+    (METAL_MINE, 0, 720),
+    (METAL_MINE, 50, 4226064),
+    (CRYSTAL_MINE, 1, 528),
+    (CRYSTAL_MINE, 34, 416928),
+]
+DEUTERIUM_PRODUCTIONS = [(1, 504, -120), (20, 46488, 0), (42, 529920, 120)]
+
+
+@pytest.mark.parametrize("upgradable, level, expected", COSTS)
+def test_costs_match_the_game(upgradable, level, expected):
+    level_tables = build_tables()
+
+    assert level_tables.cost[upgradable, level].tolist() == list(expected)
+    assert level_tables.cost_value[upgradable, level] == expected[0] + 2 * expected[1] + 3 * expected[2]
+    assert level_tables.cost_points[upgradable, level] == sum(expected)
+    assert level_tables.cumulative_cost[upgradable, level + 1].tolist() == (
+        level_tables.cost[upgradable, : level + 1].sum(axis=0).tolist()
+    )
+
+
+@pytest.mark.parametrize("mine, level, expected", PRODUCTIONS)
+def test_productions_match_the_game(mine, level, expected):
+    assert build_tables().production[mine, level] == expected
+
+
+@pytest.mark.parametrize("level, expected, temperature", DEUTERIUM_PRODUCTIONS)
+def test_deuterium_production_depends_on_the_temperature(level, expected, temperature):
+    level_tables = build_tables(temperature)
+
+    assert level_tables.production[DEUTERIUM_SYNTHESIZER, level] == expected
+    assert level_tables.production_increase[DEUTERIUM_SYNTHESIZER, level - 1] == (
+        expected - level_tables.production[DEUTERIUM_SYNTHESIZER, level - 1]
+    )
+
+
+def test_tables_round_trip_through_the_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("OGAME_ENV_CACHE", str(tmp_path))
+    get_tables.cache_clear()
+    try:
+        built = get_tables(40)
+        assert len(list(tmp_path.glob("*.npz"))) == 1
+
+        get_tables.cache_clear()
+        monkeypatch.setattr(tables, "build_tables", None)
+        loaded = get_tables(40)
+    finally:
+        get_tables.cache_clear()
+
+    expected = build_tables(40)
+    for field in fields(expected):
+        np.testing.assert_array_equal(getattr(built, field.name), getattr(expected, field.name), err_msg=field.name)
+        np.testing.assert_array_equal(getattr(loaded, field.name), getattr(expected, field.name), err_msg=field.name)
+        assert not getattr(loaded, field.name).flags.writeable
@@ -0,0 +1,47 @@
+import numpy as np
+
+from ogame_env.trajectories import TrajectoryReader, TrajectoryRecorder
+
+
+def test_recorded_rows_and_episodes_round_trip(tmp_path):
+    generator = np.random.default_rng(0)
+    recorder = TrajectoryRecorder(str(tmp_path), [0, 2], 3, shard_size=7, chunk_size=4, max_pending_chunks=1)
+
+    expected = []
+    episodes = {0: [], 2: []}
+    finished = []
+    for step in range(20):
+        observations = generator.random((3, 3), dtype=np.float32)
+        actions = generator.integers(0, 10, 3)
+        rewards = generator.random(3, dtype=np.float32)
+        dones = generator.random(3) < 0.2
+        points = generator.random(3)
+        mask = np.array([True, True, step % 5 != 3])
+
+        recorder.observe(observations)
+        recorder.record(actions, rewards, dones, points, mask)
+        for env in (0, 2):
+            if not mask[env]:
+                continue
+            row = (env, step, observations[env], actions[env], rewards[env], dones[env], points[env])
+            expected.append(row)
+            episodes[env].append(row)
+            if dones[env]:
+                finished.append(episodes[env])
+                episodes[env] = []
+    recorder.close()
+
+    reader = TrajectoryReader(str(tmp_path))
+    assert reader.dtype == recorder.dtype
+    assert len(reader) == len(expected)
+    assert [shard["rows"] for shard in reader.shards][:-1] == [7] * (len(reader.shards) - 1)
+
+    rows = np.concatenate(list(reader))
+    np.testing.assert_array_equal(rows, np.array(expected, dtype=reader.dtype))
+
+    # Episodes come out per shard, ordered by env within a shard.
+    read_episodes = sorted(reader.episodes(), key=lambda rows: (rows["step"][-1], rows["env"][-1]))
+    assert len(finished) > 1
+    assert len(read_episodes) == len(finished)
+    for rows, episode in zip(read_episodes, finished):
+        np.testing.assert_array_equal(rows, np.array(episode, dtype=reader.dtype))
@@ -0,0 +1,64 @@
+import math
+from types import SimpleNamespace
+
+import gymnasium as gym
+import pytest
+import torch
+
+from training.rollout import RolloutBuffer
+from training.update import UPDATE_STATS, PPOUpdate
+
+
+def _args(**overrides):
+    args = dict(
+        batch_size=64,
+        minibatch_size=16,
+        update_epochs=2,
+        clip_coef=0.2,
+        norm_adv=True,
+        clip_vloss=True,
+        ent_coef=0.01,
+        vf_coef=0.5,
+        max_grad_norm=0.5,
+        target_kl=None,
+    )
+    args.update(overrides)
+    return SimpleNamespace(**args)
+
+
+def _rollout(device: torch.device) -> RolloutBuffer:
+    generator = torch.Generator().manual_seed(0)
+    rollout = RolloutBuffer(16, 4, (125,), 18, device)
+    rollout.obs.copy_(torch.randn(16, 4, 125, generator=generator))
+    rollout.actions.copy_(torch.randint(18, (16, 4), generator=generator))
+    rollout.logprobs.fill_(-math.log(18))
+    rollout.rewards.copy_(torch.rand(16, 4, generator=generator))
+    rollout.values.copy_(torch.randn(16, 4, generator=generator))
+    rollout.action_masks.fill_(True)
+    rollout.compute_returns(torch.zeros(4, device=device), 0.99, 0.95)
+    return rollout
+
+
+@pytest.mark.skipif(not torch.cuda.is_available(), reason="the Agent of ppo.py needs CUDA")
+def test_update_does_not_sync_the_device():
+    from ppo import Agent
+
+    device = torch.device("cuda:0")
+    envs = SimpleNamespace(
+        single_observation_space=gym.spaces.Box(0, 1, (125,)),
+        single_action_space=gym.spaces.Discrete(18),
+    )
+    agent = Agent(envs).to(device)
+    optimizer = torch.optim.Adam(agent.parameters(), lr=2.5e-4, eps=1e-5)
+    ppo_update = PPOUpdate(agent, optimizer, _args(), device)
+    batch = _rollout(device).batch()
+
+    torch.cuda.synchronize()
+    torch.cuda.set_sync_debug_mode("error")
+    try:
+        stats = ppo_update.optimize(batch)
+    finally:
+        torch.cuda.set_sync_debug_mode("default")
+
+    assert stats.shape == (len(UPDATE_STATS),)
+    assert torch.isfinite(stats).all()
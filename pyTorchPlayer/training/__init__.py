@@ -0,0 +1,6 @@
+from training.checkpoint import CheckpointManager, load_checkpoint
+from training.metrics import MetricsLogger
+from training.pbt import PopulationBasedTraining
+from training.profiling import PhaseProfiler
+from training.rollout import RolloutBuffer
+from training.update import PPOUpdate
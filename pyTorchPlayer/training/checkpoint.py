@@ -0,0 +1,183 @@
+"""Asynchronous checkpoints of ``ppo.py`` with rotation and full resume state.
+
+``CheckpointManager.save`` copies the training state to CPU memory and
+returns; a background thread writes it to a temporary file and atomically
+renames it, so the training loop never waits for the disk. The manager keeps
+the last ``keep_last`` checkpoints plus the one with the most points and
+records them in a JSON index next to the checkpoints, which survives
+restarts.
+
+A checkpoint holds everything needed to continue the exact schedule: model
+and optimizer state, the last finished iteration, ``global_step`` (the LR
+annealing follows from both) and the Python, NumPy and torch RNG states.
+The envs are not part of it, they are reset on resume.
+"""
+
+import json
+import os
+import queue
+import random
+import threading
+from typing import Optional
+
+import numpy as np
+import torch
+
+
+def to_cpu(value):
+    """Copy of ``value`` with every tensor cloned to CPU memory."""
+
+    if isinstance(value, torch.Tensor):
+        return value.detach().to("cpu", copy=True)
+    if isinstance(value, dict):
+        return {key: to_cpu(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(to_cpu(item) for item in value)
+    return value
+
+
+def rng_state() -> dict:
+    state = {
+        "python": random.getstate(),
+        "numpy": np.random.get_state(),
+        "torch": torch.get_rng_state(),
+    }
+    if torch.cuda.is_available():
+        state["cuda"] = torch.cuda.get_rng_state_all()
+    return state
+
+
+def set_rng_state(state: dict):
+    random.setstate(state["python"])
+    np.random.set_state(state["numpy"])
+    torch.set_rng_state(state["torch"])
+    if "cuda" in state and torch.cuda.is_available():
+        torch.cuda.set_rng_state_all(state["cuda"])
+
+
+class CheckpointManager:
+    def __init__(self, directory: str, run_name: str, keep_last: int = 3):
+        self.directory = directory
+        self.run_name = run_name
+        self.keep_last = keep_last
+        os.makedirs(directory, exist_ok=True)
+
+        self._index_path = os.path.join(directory, f"{run_name}.json")
+        # [iteration, points, file name] of every checkpoint on disk, by iteration
+        self._checkpoints = []
+        if os.path.exists(self._index_path):
+            with open(self._index_path) as file:
+                self._checkpoints = json.load(file)
+
+        self._queue = queue.Queue()
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="checkpoint-writer", daemon=True)
+        self._thread.start()
+
+    def save(self, iteration: int, global_step: int, agent, optimizer, points: Optional[float] = None, **extra):
+        """Snapshot the training state after ``iteration`` and write it in the background.
+
+        ``points`` ranks the checkpoint for keeping the best one, usually the
+        mean points of the last finished episodes.
+        """
+
+        self._check()
+        state = {
+            "model_state_dict": to_cpu(agent.state_dict()),
+            "optimizer_state_dict": to_cpu(optimizer.state_dict()),
+            "iteration": iteration,
+            "global_step": global_step,
+            "points": points,
+            "rng_state": rng_state(),
+            **to_cpu(extra),
+        }
+        self._queue.put(state)
+
+    def latest(self) -> Optional[str]:
+        """Path of the newest checkpoint written so far."""
+
+        if not self._checkpoints:
+            return None
+        return os.path.join(self.directory, self._checkpoints[-1][2])
+
+    def best(self) -> Optional[str]:
+        """Path of the checkpoint with the most points."""
+
+        ranked = [checkpoint for checkpoint in self._checkpoints if checkpoint[1] is not None]
+        if not ranked:
+            return None
+        return os.path.join(self.directory, max(ranked, key=lambda checkpoint: checkpoint[1])[2])
+
+    def wait(self):
+        """Block until every queued checkpoint is written."""
+
+        self._queue.join()
+        self._check()
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        self._check()
+
+    def _check(self):
+        if self._error is not None:
+            raise RuntimeError("writing a checkpoint failed") from self._error
+
+    def _run(self):
+        while (state := self._queue.get()) is not None:
+            try:
+                if self._error is None:
+                    self._write(state)
+            except BaseException as error:
+                self._error = error
+            finally:
+                self._queue.task_done()
+
+    def _write(self, state: dict):
+        name = f"{self.run_name}_{state['iteration']:08d}.pt"
+        path = os.path.join(self.directory, name)
+        torch.save(state, path + ".tmp")
+        os.replace(path + ".tmp", path)
+
+        checkpoints = [checkpoint for checkpoint in self._checkpoints if checkpoint[2] != name]
+        checkpoints.append([state["iteration"], state["points"], name])
+        checkpoints.sort(key=lambda checkpoint: checkpoint[0])
+        self._checkpoints = checkpoints
+
+        keep = {checkpoint[2] for checkpoint in checkpoints[-self.keep_last :]}
+        best = self.best()
+        if best is not None:
+            keep.add(os.path.basename(best))
+
+        self._checkpoints = [checkpoint for checkpoint in checkpoints if checkpoint[2] in keep]
+        self._write_index()
+        for checkpoint in checkpoints:
+            if checkpoint[2] not in keep:
+                try:
+                    os.remove(os.path.join(self.directory, checkpoint[2]))
+                except FileNotFoundError:
+                    pass
+
+    def _write_index(self):
+        with open(self._index_path + ".tmp", "w") as file:
+            json.dump(self._checkpoints, file)
+        os.replace(self._index_path + ".tmp", self._index_path)
+
+
+def load_checkpoint(path: str, agent, optimizer) -> dict:
+    """Restore a checkpoint of ``CheckpointManager``, or model and optimizer of an older one.
+
+    The checkpoint is loaded to the CPU, since ``torch.set_rng_state`` only
+    takes a CPU tensor; ``load_state_dict`` copies the model and optimizer
+    tensors to the devices of the parameters. Returns the checkpoint for its
+    ``iteration`` and ``global_step``, both are 0 for older checkpoints.
+    """
+
+    checkpoint = torch.load(path, map_location="cpu", weights_only=False)
+    agent.load_state_dict(checkpoint["model_state_dict"])
+    optimizer.load_state_dict(checkpoint["optimizer_state_dict"])
+    if "rng_state" in checkpoint:
+        set_rng_state(checkpoint["rng_state"])
+    checkpoint.setdefault("iteration", 0)
+    checkpoint.setdefault("global_step", 0)
+    return checkpoint
@@ -0,0 +1,136 @@
+"""Episode statistics of ``final_info`` aggregated per iteration.
+
+The rollout only copies the stats of finished episodes into a preallocated
+ring buffer. Once per iteration the buffered episodes are handed to a
+background thread that reduces them to min, mean, max and percentiles and
+writes the scalars to TensorBoard, so the cost on the rollout does not depend
+on how many envs finish in a step.
+"""
+
+import queue
+import threading
+from typing import Optional, Sequence
+
+import numpy as np
+
+from ogame_env.envs.numpy_game import FINAL_INFO_KEYS
+
+# Tags that ppo.py wrote per step before, as (key, reduction). They are
+# written next to the ``{key}/{reduction}`` tags so that older runs stay
+# comparable in TensorBoard. The points, astrophysics and plasma_technology
+# tags did not change.
+LEGACY_TAGS = {
+    "charts/episodic_length_max": ("episodic_length", "max"),
+    "charts/episodic_length_mean": ("episodic_length", "mean"),
+    "charts/episodic_length_min": ("episodic_length", "min"),
+    **{
+        f"{resource}/{name}": (f"{resource}_{name}", "mean")
+        for resource in ("metal", "crystal", "deut")
+        for name in ("max", "mean", "min")
+    },
+}
+
+
+class MetricsLogger:
+    def __init__(
+        self,
+        writer,
+        capacity: int = 65536,
+        percentiles: Sequence[float] = (5, 25, 50, 75, 95),
+        keys: Sequence[str] = FINAL_INFO_KEYS,
+    ):
+        """Log to the TensorBoard ``writer``.
+
+        At most ``capacity`` episodes are kept per iteration, the oldest ones
+        are overwritten.
+        """
+
+        self.writer = writer
+        self.capacity = capacity
+        self.percentiles = tuple(percentiles)
+        self.keys = tuple(keys)
+
+        self._episodes = np.zeros((capacity, len(self.keys)), dtype=np.float64)
+        # mean of every key over the episodes of the last flush with episodes
+        self.latest_means = {}
+        # episodes added since the last flush
+        self._count = 0
+
+        self._queue = queue.Queue()
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="metrics-writer", daemon=True)
+        self._thread.start()
+
+    def add_episodes(self, final_info: dict):
+        """Buffer the episodes of a vector env's ``final_info``."""
+
+        index = np.flatnonzero(final_info[f"_{self.keys[0]}"])
+        if index.size == 0:
+            return
+
+        rows = (self._count + np.arange(index.size)) % self.capacity
+        for column, key in enumerate(self.keys):
+            self._episodes[rows, column] = final_info[key][index]
+        self._count += index.size
+
+    def log(self, scalars: dict, step: int):
+        """Write ``scalars`` (tag to value) in the background."""
+
+        self._check()
+        self._queue.put((step, scalars, None))
+
+    def flush(self, step: int):
+        """Reduce and write the episodes buffered since the last flush."""
+
+        self._check()
+        if self._count == 0:
+            return
+
+        episodes = self._episodes[: min(self._count, self.capacity)].copy()
+        self.latest_means = dict(zip(self.keys, episodes.mean(axis=0).tolist()))
+        self._queue.put((step, {"charts/episodes": self._count}, episodes))
+        self._count = 0
+
+    def close(self):
+        """Write everything queued and stop the background thread."""
+
+        self._queue.put(None)
+        self._thread.join()
+        self._check()
+
+    def _check(self):
+        if self._error is not None:
+            raise RuntimeError("writing metrics failed") from self._error
+
+    def _run(self):
+        while (item := self._queue.get()) is not None:
+            if self._error is not None:
+                continue
+
+            step, scalars, episodes = item
+            try:
+                if episodes is not None:
+                    scalars = {**scalars, **self._reduce(episodes)}
+                for tag, value in scalars.items():
+                    self.writer.add_scalar(tag, value, step)
+            except BaseException as error:
+                self._error = error
+
+    def _reduce(self, episodes: np.ndarray) -> dict:
+        scalars = {}
+        reductions = {
+            "min": episodes.min(axis=0),
+            "mean": episodes.mean(axis=0),
+            "max": episodes.max(axis=0),
+        }
+        if self.percentiles:
+            for percentile, values in zip(self.percentiles, np.percentile(episodes, self.percentiles, axis=0)):
+                reductions[f"p{percentile:g}"] = values
+
+        for name, values in reductions.items():
+            for key, value in zip(self.keys, values):
+                scalars[f"{key}/{name}"] = float(value)
+        for tag, (key, name) in LEGACY_TAGS.items():
+            if key in self.keys:
+                scalars[tag] = scalars[f"{key}/{name}"]
+        return scalars
@@ -0,0 +1,187 @@
+"""Population based training of ``ppo.py`` on one machine.
+
+The trials of the population train in rounds of ``interval`` iterations.
+Each round every trial resumes from its last checkpoint in a fresh spawned
+process with ``cores_per_trial`` torch threads, and as many trials run at
+once as the core budget allows. After a round the trials are ranked by the
+mean points of their last finished episodes. Every trial in the bottom
+``quantile`` copies the checkpoint and ``Args`` of a random trial of the top
+``quantile`` (exploit) and multiplies each of its ``HYPERPARAMETERS`` by a
+random perturbation factor, clipped to the bounds (explore).
+
+The envs are reset whenever a trial resumes, so a round has to be longer than
+an episode (``max_steps / num_steps`` iterations) to report points.
+"""
+
+import copy
+import json
+import math
+import multiprocessing as mp
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field, replace
+from typing import Optional
+
+import numpy as np
+
+# Perturbed hyperparameters with their bounds.
+HYPERPARAMETERS = {
+    "learning_rate": (1e-5, 1e-2),
+    "ent_coef": (1e-4, 0.5),
+    "gamma": (0.8, 0.999),
+    "gae_lambda": (0.8, 0.999),
+    "clip_coef": (0.05, 0.5),
+}
+
+
+@dataclass
+class Trial:
+    index: int
+    args: object
+    """``ppo.Args`` of the next round"""
+    checkpoint: Optional[str] = None
+    points: Optional[float] = None
+    history: list = field(default_factory=list)
+    """points, hyperparameters and exploited trial of every round"""
+
+
+def _train(args) -> dict:
+    import ppo
+
+    return ppo.train(args)
+
+
+class PopulationBasedTraining:
+    def __init__(
+        self,
+        args,
+        directory: str = "pbt",
+        population: int = 8,
+        cores_per_trial: int = 4,
+        interval: int = 400,
+        quantile: float = 0.25,
+        perturbations: tuple = (0.8, 1.2),
+        seed: int = 1,
+    ):
+        """Train ``population`` trials starting from the ``ppo.Args`` ``args``."""
+
+        self.args = args
+        self.directory = directory
+        self.population = population
+        self.cores_per_trial = cores_per_trial
+        self.interval = interval
+        self.quantile = quantile
+        self.perturbations = perturbations
+        self.rng = np.random.default_rng(seed)
+
+        self.trials = [
+            Trial(
+                index,
+                replace(
+                    args,
+                    seed=args.seed + index,
+                    run_name=f"trial{index}",
+                    run_dir=os.path.join(directory, "runs"),
+                    checkpoint_dir=os.path.join(directory, f"trial{index}"),
+                    torch_threads=cores_per_trial,
+                ),
+            )
+            for index in range(population)
+        ]
+        # The first round starts from different hyperparameters.
+        for trial in self.trials[1:]:
+            self._explore(trial)
+
+    @property
+    def num_workers(self) -> int:
+        """Trials running at once within the core budget."""
+
+        return max(1, min(self.population, (os.cpu_count() or 1) // self.cores_per_trial))
+
+    def run(self) -> list:
+        """Train all rounds and return the trials ranked by points."""
+
+        batch_size = self.args.num_envs * self.args.num_steps
+        num_iterations = self.args.total_timesteps // batch_size
+        rounds = math.ceil(num_iterations / self.interval)
+
+        context = mp.get_context("spawn")
+        for round_index in range(1, rounds + 1):
+            jobs = []
+            for trial in self.trials:
+                trial.args = replace(
+                    trial.args,
+                    max_iterations=min(round_index * self.interval, num_iterations),
+                    load_checkpoint_path=trial.checkpoint or "",
+                )
+                jobs.append(copy.deepcopy(trial.args))
+
+            # A fresh process per round and trial, so every trial gets its own
+            # thread settings and runtime.
+            with ProcessPoolExecutor(self.num_workers, mp_context=context, max_tasks_per_child=1) as executor:
+                summaries = list(executor.map(_train, jobs))
+
+            for trial, summary in zip(self.trials, summaries):
+                trial.checkpoint = summary["checkpoint"]
+                trial.points = summary["points"]
+                trial.history.append(
+                    {
+                        "round": round_index,
+                        "global_step": summary["global_step"],
+                        "points": trial.points,
+                        "hyperparameters": {name: getattr(trial.args, name) for name in HYPERPARAMETERS},
+                    }
+                )
+
+            ranked = self.ranked()
+            print(f"round {round_index}/{rounds}: " + ", ".join(f"trial{t.index} {t.points}" for t in ranked))
+            if round_index < rounds:
+                self._exploit(ranked, round_index)
+            self._write_summary()
+
+        return self.ranked()
+
+    def ranked(self) -> list:
+        return sorted(self.trials, key=lambda trial: -math.inf if trial.points is None else trial.points, reverse=True)
+
+    def _exploit(self, ranked: list, round_index: int):
+        count = max(1, int(len(ranked) * self.quantile))
+        if 2 * count > len(ranked):
+            return
+
+        top, bottom = ranked[:count], ranked[-count:]
+        for trial in bottom:
+            source = top[self.rng.integers(len(top))]
+            if source.checkpoint is None or source.points is None:
+                continue
+
+            # Copy the checkpoint, the source trial may rotate it away.
+            checkpoint = os.path.join(self.directory, f"trial{trial.index}", f"exploit_{round_index:04d}.pt")
+            shutil.copyfile(source.checkpoint, checkpoint)
+            trial.checkpoint = checkpoint
+            trial.args = replace(trial.args, **{name: getattr(source.args, name) for name in HYPERPARAMETERS})
+            trial.history[-1]["exploited"] = source.index
+            self._explore(trial)
+
+    def _explore(self, trial: Trial):
+        values = {}
+        for name, (low, high) in HYPERPARAMETERS.items():
+            factor = self.perturbations[self.rng.integers(len(self.perturbations))]
+            values[name] = float(np.clip(getattr(trial.args, name) * factor, low, high))
+        trial.args = replace(trial.args, **values)
+
+    def _write_summary(self):
+        os.makedirs(self.directory, exist_ok=True)
+        summary = [
+            {
+                "trial": trial.index,
+                "points": trial.points,
+                "checkpoint": trial.checkpoint,
+                "args": asdict(trial.args),
+                "history": trial.history,
+            }
+            for trial in self.ranked()
+        ]
+        with open(os.path.join(self.directory, "pbt.json"), "w") as file:
+            json.dump(summary, file, indent=2)
@@ -0,0 +1,160 @@
+"""Per-phase timing of the ``ppo.py`` training loop.
+
+``PhaseProfiler.phase(name)`` is a reusable context manager around one phase
+of an iteration (env step, policy inference, host/device copies, GAE, update,
+...). It costs two ``perf_counter`` calls unless the profiler synchronizes
+the device at phase boundaries, which attributes asynchronous device work to
+the phase that launched it at the cost of throughput. Without synchronizing,
+device work shows up in the phase that waits for it, usually the copy of the
+actions to the host.
+
+For a window of iterations a ``torch.profiler`` trace can be recorded as
+well, with the phases as named ranges. Per iteration the phase times and the
+SPS each phase alone would allow are returned for TensorBoard; ``close``
+writes the totals of the run to a JSON summary.
+"""
+
+import json
+import os
+import time
+from collections import defaultdict
+from typing import Optional
+
+import torch
+from torch.profiler import ProfilerActivity, profile, record_function, tensorboard_trace_handler
+
+
+class _Phase:
+    __slots__ = ("profiler", "name", "start", "record")
+
+    def __init__(self, profiler: "PhaseProfiler", name: str):
+        self.profiler = profiler
+        self.name = name
+        self.record = None
+
+    def __enter__(self):
+        profiler = self.profiler
+        if profiler.synchronize:
+            profiler._synchronize()
+        if profiler._torch_profiler is not None:
+            self.record = record_function(self.name)
+            self.record.__enter__()
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        profiler = self.profiler
+        if profiler.synchronize:
+            profiler._synchronize()
+        profiler._times[self.name] += time.perf_counter() - self.start
+        if self.record is not None:
+            self.record.__exit__(*exc_info)
+            self.record = None
+
+
+class PhaseProfiler:
+    def __init__(
+        self,
+        log_dir: str,
+        device: torch.device,
+        synchronize: bool = False,
+        trace_start: int = 0,
+        trace_iterations: int = 1,
+    ):
+        """Time phases and trace iterations ``trace_start`` to ``trace_start + trace_iterations - 1``.
+
+        No trace is recorded if ``trace_start`` is 0. Traces are written to
+        ``log_dir/trace`` for the TensorBoard profiler plugin.
+        """
+
+        self.log_dir = log_dir
+        self.device = device
+        self.synchronize = synchronize
+        self.trace_start = trace_start
+        self.trace_end = trace_start + trace_iterations
+
+        self._phases = {}
+        self._times = defaultdict(float)
+        self._totals = defaultdict(float)
+        self._steps = 0
+        self._iterations = 0
+        self._iteration_start = None
+        self._torch_profiler = None
+
+    def phase(self, name: str) -> _Phase:
+        if name not in self._phases:
+            self._phases[name] = _Phase(self, name)
+        return self._phases[name]
+
+    def start_iteration(self, iteration: int):
+        if self.trace_start > 0 and iteration == self.trace_start:
+            activities = [ProfilerActivity.CPU]
+            if self.device.type == "cuda":
+                activities.append(ProfilerActivity.CUDA)
+            self._torch_profiler = profile(
+                activities=activities, on_trace_ready=tensorboard_trace_handler(os.path.join(self.log_dir, "trace"))
+            )
+            self._torch_profiler.__enter__()
+
+        self._times.clear()
+        self._iteration_start = time.perf_counter()
+
+    def end_iteration(self, iteration: int, steps: int) -> dict:
+        """Stop timing the iteration that played ``steps`` env steps.
+
+        Returns the TensorBoard scalars of the iteration: seconds and SPS per
+        phase, where ``other`` is the time outside of every phase.
+        """
+
+        duration = time.perf_counter() - self._iteration_start
+        times = dict(self._times)
+        times["other"] = max(duration - sum(times.values()), 0.0)
+
+        if self._torch_profiler is not None and iteration + 1 >= self.trace_end:
+            self._torch_profiler.__exit__(None, None, None)
+            self._torch_profiler = None
+
+        self._steps += steps
+        self._iterations += 1
+        for name, seconds in times.items():
+            self._totals[name] += seconds
+
+        scalars = {}
+        for name, seconds in times.items():
+            scalars[f"time/{name}"] = seconds
+            if seconds > 0:
+                scalars[f"sps/{name}"] = steps / seconds
+        return scalars
+
+    def summary(self) -> dict:
+        total = sum(self._totals.values())
+        phases = {}
+        for name, seconds in sorted(self._totals.items(), key=lambda item: -item[1]):
+            phases[name] = {
+                "seconds": seconds,
+                "fraction": seconds / total if total > 0 else 0.0,
+                "sps": self._steps / seconds if seconds > 0 else None,
+            }
+        return {
+            "iterations": self._iterations,
+            "steps": self._steps,
+            "seconds": total,
+            "sps": self._steps / total if total > 0 else None,
+            "synchronized": self.synchronize,
+            "phases": phases,
+        }
+
+    def close(self, summary_path: Optional[str] = None, **extra):
+        """Stop a running trace and write the JSON summary with ``extra`` fields."""
+
+        if self._torch_profiler is not None:
+            self._torch_profiler.__exit__(None, None, None)
+            self._torch_profiler = None
+
+        if summary_path is not None:
+            os.makedirs(os.path.dirname(summary_path) or ".", exist_ok=True)
+            with open(summary_path, "w") as file:
+                json.dump({**extra, **self.summary()}, file, indent=2)
+
+    def _synchronize(self):
+        if self.device.type == "cuda":
+            torch.cuda.synchronize(self.device)
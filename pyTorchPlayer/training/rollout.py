@@ -0,0 +1,198 @@
+"""Preallocated rollout storage for ``ppo.py``.
+
+All tensors of a rollout are allocated once on the training device. The env
+outputs of a step are written into pinned host staging buffers and copied to
+the device with non-blocking copies, so the rollout loop does not construct
+tensors or block on host to device copies. The only synchronization per step
+is the device to host copy of the sampled actions, which the envs need
+anyway; it also guarantees that the previous step's copies out of the
+staging buffers have finished before they are overwritten.
+"""
+
+import math
+from types import SimpleNamespace
+from typing import Optional
+
+import numpy as np
+import torch
+
+# Bits of float64 precision that the rescaling within a GAE chunk may cost.
+GAE_RESCALE_BITS = 20
+
+
+def _is_view_of(array, buffer: np.ndarray) -> bool:
+    """Whether ``array`` is ``buffer`` itself or a full view of it."""
+
+    return (
+        isinstance(array, np.ndarray)
+        and array.dtype == buffer.dtype
+        and array.shape == buffer.shape
+        and array.ctypes.data == buffer.ctypes.data
+    )
+
+
+class RolloutBuffer:
+    def __init__(
+        self,
+        num_steps: int,
+        num_envs: int,
+        observation_shape: tuple,
+        num_actions: int,
+        device: torch.device,
+        host_obs: Optional[torch.Tensor] = None,
+    ):
+        """``host_obs`` replaces the observation staging buffer, envs that
+        write their observations into it in place skip the copy in ``stage``.
+        It should be pinned when ``device`` is a GPU.
+        """
+
+        self.num_steps = num_steps
+        self.num_envs = num_envs
+        self.device = device
+
+        def zeros(*shape, dtype=torch.float32):
+            return torch.zeros(shape, dtype=dtype, device=device)
+
+        self.obs = zeros(num_steps, num_envs, *observation_shape)
+        self.actions = zeros(num_steps, num_envs, dtype=torch.long)
+        self.logprobs = zeros(num_steps, num_envs)
+        self.rewards = zeros(num_steps, num_envs)
+        self.dones = zeros(num_steps, num_envs)
+        self.values = zeros(num_steps, num_envs)
+        self.action_masks = zeros(num_steps, num_envs, num_actions, dtype=torch.bool)
+        self.advantages = zeros(num_steps, num_envs)
+        self.returns = zeros(num_steps, num_envs)
+
+        self.next_obs = zeros(num_envs, *observation_shape)
+        self.next_done = zeros(num_envs)
+        self.next_action_mask = torch.ones((num_envs, num_actions), dtype=torch.bool, device=device)
+
+        pin_memory = device.type == "cuda"
+
+        def staging(*shape, dtype=torch.float32):
+            return torch.zeros(shape, dtype=dtype, pin_memory=pin_memory)
+
+        self._host_obs = staging(num_envs, *observation_shape) if host_obs is None else host_obs
+        self._host_rewards = staging(num_envs)
+        self._host_dones = staging(num_envs)
+        self._host_action_mask = staging(num_envs, num_actions, dtype=torch.bool)
+        self._host_actions = staging(num_envs, dtype=torch.long)
+
+        # numpy views of the staging buffers, the envs write into these
+        self._host_obs_np = self._host_obs.numpy()
+        self._host_rewards_np = self._host_rewards.numpy()
+        self._host_dones_np = self._host_dones.numpy()
+        self._host_action_mask_np = self._host_action_mask.numpy()
+        self._host_actions_np = self._host_actions.numpy()
+
+    def stage(self, next_obs, rewards=None, terminations=None, truncations=None, action_mask=None, step=None):
+        """Copy the outputs of ``envs.reset``/``envs.step`` to the device.
+
+        ``rewards`` are stored at ``step`` of the rollout; the observation,
+        dones and action mask become the ``next_*`` tensors.
+        """
+
+        if not _is_view_of(next_obs, self._host_obs_np):
+            np.copyto(self._host_obs_np, next_obs, casting="unsafe")
+        self.next_obs.copy_(self._host_obs, non_blocking=True)
+
+        if rewards is not None:
+            np.copyto(self._host_rewards_np, rewards, casting="unsafe")
+            self.rewards[step].copy_(self._host_rewards, non_blocking=True)
+
+        if terminations is not None:
+            np.logical_or(terminations, truncations, out=self._host_dones_np)
+            self.next_done.copy_(self._host_dones, non_blocking=True)
+
+        if action_mask is not None:
+            np.copyto(self._host_action_mask_np, action_mask)
+            self.next_action_mask.copy_(self._host_action_mask, non_blocking=True)
+
+    def add(self, step: int, action: torch.Tensor, logprob: torch.Tensor, value: torch.Tensor):
+        """Store the policy outputs for the current ``next_*`` tensors at ``step``."""
+
+        self.obs[step] = self.next_obs
+        self.dones[step] = self.next_done
+        self.action_masks[step] = self.next_action_mask
+        self.actions[step] = action
+        self.logprobs[step] = logprob
+        self.values[step] = value.flatten()
+
+    def actions_to_host(self, action: torch.Tensor) -> np.ndarray:
+        """Copy ``action`` into pinned memory and return it as a numpy view.
+
+        The view is overwritten by the next call.
+        """
+
+        self._host_actions.copy_(action)
+        return self._host_actions_np
+
+    def compute_returns(self, next_value: torch.Tensor, gamma: float, gae_lambda: float):
+        """Generalized advantage estimation with a handful of vectorized passes.
+
+        With ``c[t] = gamma * gae_lambda * nonterminal[t + 1]`` the advantages
+        ``A[t] = delta[t] + c[t] * A[t + 1]`` are discounted sums of ``delta``
+        within an episode segment. The steps are split into chunks, and within
+        a chunk the sums are reversed cumulative sums of
+        ``(gamma * gae_lambda) ** k * delta[k]`` minus the sum past the end of
+        each segment. Chunks are short enough that rescaling by
+        ``(gamma * gae_lambda) ** -k`` loses at most ``GAE_RESCALE_BITS`` bits
+        of the float64 sums. A reverse loop over the chunks then adds the
+        discounted advantage of the next chunk to segments that run into it.
+        """
+
+        gamma_lambda = gamma * gae_lambda
+        num_steps, num_envs = self.num_steps, self.num_envs
+        if gamma_lambda >= 1:
+            chunk_size = num_steps
+        elif gamma_lambda > 0:
+            chunk_size = max(1, int(GAE_RESCALE_BITS * math.log(2) / -math.log(gamma_lambda)))
+        else:
+            chunk_size = 1
+        chunk_size = min(chunk_size, num_steps)
+        num_chunks = -(-num_steps // chunk_size)
+        padding = num_chunks * chunk_size - num_steps
+
+        nextnonterminal = 1.0 - torch.cat([self.dones[1:], self.next_done[None]])
+        nextvalues = torch.cat([self.values[1:], next_value.reshape(1, -1)])
+        delta = (self.rewards + gamma * nextvalues * nextnonterminal - self.values).double()
+
+        # Padded steps end a segment and have no advantage.
+        shape = (num_chunks, chunk_size, num_envs)
+        delta = torch.cat([delta, delta.new_zeros(padding, num_envs)]).reshape(shape)
+        nextnonterminal = torch.cat([nextnonterminal, nextnonterminal.new_zeros(padding, num_envs)]).reshape(shape)
+
+        steps = torch.arange(chunk_size, device=self.device)
+        discount = torch.tensor(gamma_lambda, dtype=torch.float64, device=self.device) ** steps
+        weighted = delta * discount[:, None]
+        # suffix[:, t] = sum of weighted[:, t:], with suffix[:, chunk_size] = 0
+        suffix = torch.zeros((num_chunks, chunk_size + 1, num_envs), dtype=torch.float64, device=self.device)
+        suffix[:, :-1] = weighted.flip(1).cumsum(1).flip(1)
+
+        # Last step of the segment of every step within its chunk: the first
+        # k >= t whose successor starts a new episode (or the chunk's last step).
+        boundary = torch.where(nextnonterminal == 0, steps[:, None], chunk_size - 1)
+        segment_end = boundary.flip(1).cummin(1).values.flip(1)
+        advantages = (suffix[:, :-1] - suffix.gather(1, segment_end + 1)) / discount[:, None]
+
+        # Segments continuing into the next chunk add its first advantage.
+        continues = (segment_end == chunk_size - 1) & (nextnonterminal[:, -1:] != 0)
+        carry = torch.where(continues, gamma_lambda * discount.flip(0)[:, None], 0.0)
+        for chunk in range(num_chunks - 2, -1, -1):
+            advantages[chunk] += carry[chunk] * advantages[chunk + 1, 0]
+
+        self.advantages.copy_(advantages.reshape(-1, num_envs)[:num_steps])
+        torch.add(self.advantages, self.values, out=self.returns)
+
+    def batch(self) -> SimpleNamespace:
+        """Views of the rollout flattened over steps and envs."""
+
+        return SimpleNamespace(
+            obs=self.obs.reshape((-1,) + self.obs.shape[2:]),
+            logprobs=self.logprobs.reshape(-1),
+            actions=self.actions.reshape(-1),
+            advantages=self.advantages.reshape(-1),
+            returns=self.returns.reshape(-1),
+            values=self.values.reshape(-1),
+            action_masks=self.action_masks.reshape((-1, self.action_masks.shape[-1])),
+        )
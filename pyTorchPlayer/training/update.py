@@ -0,0 +1,121 @@
+"""PPO update phase of ``ppo.py`` without per-minibatch device syncs.
+
+The minibatch permutations are drawn on the training device and the loss
+statistics stay device tensors, so the host only waits for the device once
+per epoch if ``target_kl`` is set and once per iteration to read the logged
+statistics.
+"""
+
+from types import SimpleNamespace
+
+import torch
+import torch.nn as nn
+
+# Statistics returned by ``PPOUpdate.update``. Losses and KL estimates are the
+# ones of the last minibatch like in cleanrl, clipfrac is the mean over all
+# minibatches.
+UPDATE_STATS = (
+    "value_loss",
+    "policy_loss",
+    "entropy",
+    "old_approx_kl",
+    "approx_kl",
+    "clipfrac",
+    "explained_variance",
+)
+
+
+class PPOUpdate:
+    def __init__(self, agent: nn.Module, optimizer: torch.optim.Optimizer, args, device: torch.device):
+        self.agent = agent
+        self.optimizer = optimizer
+        self.args = args
+        self.device = device
+
+    def update(self, batch: SimpleNamespace) -> dict:
+        """Optimize the policy and value network on one rollout ``batch``.
+
+        ``batch`` holds the flattened device tensors of ``RolloutBuffer.batch``.
+        Returns the ``UPDATE_STATS`` as floats.
+        """
+
+        # The only sync of the iteration without target_kl.
+        return dict(zip(UPDATE_STATS, self.optimize(batch).tolist()))
+
+    def optimize(self, batch: SimpleNamespace) -> torch.Tensor:
+        """``update`` without reading the statistics, returns the
+        ``UPDATE_STATS`` as one device tensor.
+        """
+
+        args = self.args
+        actions = batch.actions.long()
+        clipfrac_sum = torch.zeros((), device=self.device)
+        minibatches = 0
+
+        for epoch in range(args.update_epochs):
+            b_inds = torch.randperm(args.batch_size, device=self.device)
+            for start in range(0, args.batch_size, args.minibatch_size):
+                mb_inds = b_inds[start : start + args.minibatch_size]
+
+                _, newlogprob, entropy, newvalue = self.agent.get_action_and_value(
+                    batch.obs[mb_inds], actions[mb_inds], batch.action_masks[mb_inds]
+                )
+                logratio = newlogprob - batch.logprobs[mb_inds]
+                ratio = logratio.exp()
+
+                with torch.no_grad():
+                    # calculate approx_kl http://joschu.net/blog/kl-approx.html
+                    old_approx_kl = (-logratio).mean()
+                    approx_kl = ((ratio - 1) - logratio).mean()
+                    clipfrac_sum += ((ratio - 1.0).abs() > args.clip_coef).float().mean()
+                    minibatches += 1
+
+                mb_advantages = batch.advantages[mb_inds]
+                if args.norm_adv:
+                    mb_advantages = (mb_advantages - mb_advantages.mean()) / (mb_advantages.std() + 1e-8)
+
+                # Policy loss
+                pg_loss1 = -mb_advantages * ratio
+                pg_loss2 = -mb_advantages * torch.clamp(ratio, 1 - args.clip_coef, 1 + args.clip_coef)
+                pg_loss = torch.max(pg_loss1, pg_loss2).mean()
+
+                # Value loss
+                newvalue = newvalue.view(-1)
+                mb_returns = batch.returns[mb_inds]
+                if args.clip_vloss:
+                    mb_values = batch.values[mb_inds]
+                    v_loss_unclipped = (newvalue - mb_returns) ** 2
+                    v_clipped = mb_values + torch.clamp(newvalue - mb_values, -args.clip_coef, args.clip_coef)
+                    v_loss_clipped = (v_clipped - mb_returns) ** 2
+                    v_loss = 0.5 * torch.max(v_loss_unclipped, v_loss_clipped).mean()
+                else:
+                    v_loss = 0.5 * ((newvalue - mb_returns) ** 2).mean()
+
+                entropy_loss = entropy.mean()
+                loss = pg_loss - args.ent_coef * entropy_loss + v_loss * args.vf_coef
+
+                self.optimizer.zero_grad()
+                loss.backward()
+                nn.utils.clip_grad_norm_(self.agent.parameters(), args.max_grad_norm)
+                self.optimizer.step()
+
+            # The only sync of an epoch.
+            if args.target_kl is not None and approx_kl.item() > args.target_kl:
+                break
+
+        with torch.no_grad():
+            var_y = batch.returns.var(unbiased=False)
+            explained_var = 1 - (batch.returns - batch.values).var(unbiased=False) / var_y
+            explained_var = torch.where(var_y == 0, torch.nan, explained_var)
+
+            return torch.stack(
+                [
+                    v_loss.detach(),
+                    pg_loss.detach(),
+                    entropy_loss.detach(),
+                    old_approx_kl,
+                    approx_kl,
+                    clipfrac_sum / minibatches,
+                    explained_var,
+                ]
+            )